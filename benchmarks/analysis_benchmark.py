@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+# Benchmark log analysis on synthetic logs of increasing length - times each phase of controller log analysis, and whole runs of
+# controller_analyse.py and data_analyse.py, recording wall time and peak memory (RSS) so regressions can be found before deployment
+
+# SYNTAX: ./analysis_benchmark.py [--days <days>[,<days>...]] [--channels <number>] [--interval <seconds>] [--switches <per day>]
+#                                 [--workdir <directory>] [--results <results CSV>] [--threshold <percent>] [--no-plots] [--no-data]
+
+# EXAMPLE CALLS
+# ./analysis_benchmark.py
+# ./analysis_benchmark.py --days 1,365,1826 --channels 4 --results ~/analysis_benchmark.csv
+
+# INPUTS (all arguments are optional)
+# --days comma separated numbers of days analysed (default 1,30,365) - 1826 days is 5 years.  Synthetic logs are 2 days longer, since
+#   analysis starts at midnight after the first switching event and ends at midnight before the last log line
+# --channels, --interval and --switches are passed to generate_logs.py (defaults 1 channel, 10 s interval, 24 switching cycles per day)
+# --workdir directory for synthetic logs and analysis outputs (default /tmp/analysis-benchmark) - logs are only generated if not already there
+# --results CSV file results are appended to - if it already holds results of same benchmark, change in time is shown and any phase more than
+#   --threshold % slower (default 20) is reported as a regression
+# --no-plots skips plot rendering, --no-data skips data log analysis (data_analyse.py)
+
+# OUTPUTS
+# Table of wall time and peak RSS for each log length, phase and whole run printed to STDOUT.  Phases (timed by analysis_phases.py in a
+# separate process for each log) are parse, scan (midnight state pass, including parse), totals (per-day totals), csv and plot
+# Peak RSS of phases is the high-water mark of the process so far, so includes earlier phases
+# Exits with status 1 if any regression was found
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Sidecar day indexes removed before each run, so analysis runs include building index
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import csv
+import time
+import calendar
+import argparse
+import subprocess
+from time import gmtime, strftime
+from timeit import default_timer
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), "scripts")
+START_DATE = "2020-01-01"
+RESULTS_HEADER = ["Date", "Commit", "Benchmark", "Days", "Phase", "Time (s)", "Peak RSS (MB)"]
+
+# Run command - returns wall time (s), peak RSS of process (MB) and STDOUT.  Exits if command fails
+def run(command):
+  start = default_timer()
+  process = subprocess.Popen([sys.executable] + command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+  output = process.stdout.read()
+  process.stdout.close()
+  pid, status, usage = os.wait4(process.pid, 0)
+  elapsed = default_timer() - start
+  if os.waitstatus_to_exitcode(status) != 0:
+    print(output)
+    print("ERROR: %s failed" % ' '.join(command))
+    sys.exit(1)
+  return elapsed, usage.ru_maxrss / 1024, output
+
+# Git commit of repo being benchmarked ("unknown" if not a git repo)
+def git_commit():
+  try:
+    return subprocess.check_output(["git", "-C", BENCHMARK_DIR, "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+  except (OSError, subprocess.CalledProcessError):
+    return "unknown"
+
+# Previous time of each (benchmark, days, phase) in results file - latest result of each is used
+def previous_results(results_file):
+  previous = {}
+  if results_file and os.path.isfile(results_file):
+    with open(results_file, 'r') as f:
+      for row in csv.DictReader(f):
+        previous[(row["Benchmark"], row["Days"], row["Phase"])] = float(row["Time (s)"])
+  return previous
+
+parser = argparse.ArgumentParser(description='Benchmark log analysis on synthetic logs, recording wall time and peak RSS of each phase')
+parser.add_argument('--days', '-n', default="1,30,365", help='Comma separated numbers of days analysed - default: 1,30,365')
+parser.add_argument('--channels', '-c', type=int, default=1, help='Number of temperature sensors in data log - default: 1')
+parser.add_argument('--interval', '-i', type=int, default=10, metavar='SECONDS', help='Control cycle interval (s) - default: 10')
+parser.add_argument('--switches', '-w', type=float, default=24, metavar='PER_DAY', help='Mean switching cycles per day - default: 24')
+parser.add_argument('--workdir', '-d', default="/tmp/analysis-benchmark", help='Directory for synthetic logs and outputs - default: /tmp/analysis-benchmark')
+parser.add_argument('--results', '-r', help='CSV file to append results to, and compare with previous results')
+parser.add_argument('--threshold', '-t', type=float, default=20, metavar='PERCENT', help='Slow down reported as regression (%%) - default: 20')
+parser.add_argument('--no-plots', '-p', action='store_true', help='Skip plot rendering')
+parser.add_argument('--no-data', '-x', action='store_true', help='Skip data log analysis')
+args = parser.parse_args()
+
+try:
+  spans = [int(days) for days in args.days.split(",")]
+except ValueError:
+  print("ERROR: --days must be comma separated list of whole days")
+  sys.exit(1)
+
+date = strftime("%Y-%m-%d %H:%M:%S", gmtime())
+commit = git_commit()
+previous = previous_results(args.results)
+results = []
+print("Benchmarking log analysis at commit %s" % commit)
+print("%-30s %6s %-8s %10s %10s %10s" % ("Benchmark", "Days", "Phase", "Time (s)", "RSS (MB)", "Change"))
+regressions = 0
+for days in spans:
+  # Generate logs for this length, unless already generated with same settings
+  log_days = days + 2
+  log_dir = os.path.join(args.workdir, "logs_%dd_%dch_%ds_%gsw" % (log_days, args.channels, args.interval, args.switches))
+  log_file = os.path.join(log_dir, "control_temp.log")
+  data_file = os.path.join(log_dir, "temperature_data.csv")
+  if not os.path.isfile(data_file):
+    print("Generating %d days of synthetic logs in %s" % (log_days, log_dir))
+    run([os.path.join(BENCHMARK_DIR, "generate_logs.py"), "--start", START_DATE, "--days", str(log_days), "--channels", str(args.channels), "--interval", str(args.interval),
+         "--switches", str(args.switches), log_dir])
+  output_dir = os.path.join(log_dir, "outputs")
+  os.makedirs(output_dir, exist_ok=True)
+  end_date = strftime("%Y-%m-%d", gmtime(calendar.timegm(time.strptime(START_DATE, "%Y-%m-%d")) + log_days * 86400))
+
+  # Each phase of controller log analysis, then complete runs of analysis scripts
+  measurements = []
+  command = [os.path.join(BENCHMARK_DIR, "analysis_phases.py"), log_file, output_dir]
+  if args.no_plots:
+    command.append("--no-plots")
+  elapsed, rss, output = run(command)
+  for line in output.splitlines():
+    fields = line.split()
+    if len(fields) == 3:
+      measurements.append(("controller_phases", fields[0], float(fields[1]), int(fields[2]) / 1024))
+  # Sidecar day indexes left by a previous run are removed, so runs are timed with index built from scratch (first analysis of a log)
+  for index_file in [log_file + ".idx", data_file + ".idx"]:
+    if os.path.isfile(index_file):
+      os.remove(index_file)
+  command = [os.path.join(SCRIPT_DIR, "controller_analyse.py"), log_file, START_DATE, end_date, output_dir]
+  if args.no_plots:
+    command.insert(1, "--no-plots")
+  elapsed, rss, output = run(command)
+  measurements.append(("controller_analyse" + (" --no-plots" if args.no_plots else ""), "total", elapsed, rss))
+  if not args.no_data:
+    elapsed, rss, output = run([os.path.join(SCRIPT_DIR, "data_analyse.py"), data_file, START_DATE, end_date, output_dir])
+    measurements.append(("data_analyse", "total", elapsed, rss))
+
+  for benchmark, phase, elapsed, rss in measurements:
+    change = ""
+    previous_time = previous.get((benchmark, str(days), phase))
+    # Very short phases are too noisy to compare
+    if previous_time and max(previous_time, elapsed) >= 0.05:
+      change = "%+.0f%%" % ((elapsed / previous_time - 1) * 100)
+      if elapsed > previous_time * (1 + args.threshold / 100):
+        change += " REGRESSION"
+        regressions += 1
+    print("%-30s %6d %-8s %10.3f %10.1f %10s" % (benchmark, days, phase, elapsed, rss, change))
+    results.append([date, commit, benchmark, days, phase, "%.6f" % elapsed, "%.1f" % rss])
+
+if args.results:
+  new_file = not os.path.isfile(args.results)
+  with open(args.results, 'a') as f:
+    writer = csv.writer(f, lineterminator="\n")
+    if new_file:
+      writer.writerow(RESULTS_HEADER)
+    writer.writerows(results)
+  print("Results appended to %s" % args.results)
+if regressions:
+  print("WARNING: %d phase(s) more than %g%% slower than previous results" % (regressions, args.threshold))
+  sys.exit(1)
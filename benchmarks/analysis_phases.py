@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Time each phase of controller log analysis (as run by controller_analyse.py) on one log - used by analysis_benchmark.py
+
+# SYNTAX: ./analysis_phases.py [--no-plots] [--dpi <dpi>] [--format <png|svg|pdf|jpg>] <full filename and path of log> <output directory>
+
+# EXAMPLE CALLS
+# ./analysis_phases.py /tmp/synthetic/control_temp.log /tmp/benchmark-outputs
+
+# INPUTS
+# <full filename and path of log> controller log to analyse - all full days in log are analysed
+# <output directory> directory for CSV and plots written by csv and plot phases
+# --no-plots skips plot phase, --dpi / --format as for controller_analyse.py (default 300 dpi PNG)
+
+# OUTPUTS
+# One line per phase printed to STDOUT: phase name, time (s) and peak RSS of this process at end of phase (kB) separated by spaces
+# Phases:  parse - read log and parse timestamp of every line
+#          scan - single streaming pass of log carrying status over each midnight (includes parsing - controller_log.scan_log())
+#          totals - seconds on for each day analysed (controller_log.daily_on_time())
+#          csv - write CSV of results
+#          plot - render bar chart and line chart
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import argparse
+import resource
+from time import gmtime, strftime
+from timeit import default_timer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "scripts"))
+import controller_log
+import analysis_plots
+
+# Print time and peak RSS of phase started at start
+def report(phase, start):
+  print("%s %.6f %d" % (phase, default_timer() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+  sys.stdout.flush()
+
+parser = argparse.ArgumentParser(description='Time each phase of controller log analysis on one log')
+parser.add_argument('log_file', help='Full filename and path of log')
+parser.add_argument('output_dir', help='Output directory for CSV and plots')
+parser.add_argument('--no-plots', '-p', action='store_true', help='Skip plot phase')
+parser.add_argument('--dpi', '-d', type=int, default=300, help='Resolution of plots (dots per inch) - default: 300')
+parser.add_argument('--format', '-f', choices=analysis_plots.FORMATS, default='png', help='File format of plots - default: png')
+args = parser.parse_args()
+
+start = default_timer()
+with open(args.log_file, 'rb') as f:
+  for offset, line, line_time in controller_log.log_lines(f):
+    pass
+report("parse", start)
+
+start = default_timer()
+state = controller_log.new_checkpoint(args.log_file)
+log_tail = controller_log.scan_log(args.log_file, state)
+report("scan", start)
+if state["first_switch_day"] == None or state["day"] - state["first_switch_day"] < 2 * 86400:
+  print("ERROR: log must contain at least one full day after first switching event")
+  sys.exit(1)
+
+start = default_timer()
+start_time = state["first_switch_day"] + 86400
+num_days = int((state["day"] - start_time) / 86400)
+time_on = controller_log.daily_on_time(state, log_tail, start_time, num_days)
+datestamps = [strftime("%Y%m%d", gmtime(start_time + ii * 86400)) for ii in range(0, num_days)]
+time_on_hours = [float(x)/3600 for x in time_on]
+duty_cycle = [float(x)/864 for x in time_on]
+report("totals", start)
+
+start = default_timer()
+controller_log.write_daily_csv(os.path.join(args.output_dir, "controller_analysis.csv"), datestamps, time_on_hours, duty_cycle)
+report("csv", start)
+
+if not args.no_plots:
+  start = default_timer()
+  plot_file = os.path.join(args.output_dir, "controller_log_plot")
+  analysis_plots.render([
+    (analysis_plots.daily_bar_chart, (datestamps, time_on_hours, "Benchmark", 'Time ON each day (hours)', plot_file+"_bar."+args.format, args.dpi, args.format)),
+    (analysis_plots.daily_line_chart, (datestamps, time_on_hours, "Benchmark", 'Time ON each day (hours)', plot_file+"."+args.format, args.dpi, args.format))])
+  report("plot", start)
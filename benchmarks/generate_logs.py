@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+# Generate synthetic controller log and temperature data log of any length, for benchmarking and testing log analysis scripts
+
+# SYNTAX: ./generate_logs.py [--days <days>] [--start <YYYY-MM-DD>] [--interval <seconds>] [--channels <number>] [--switches <per day>]
+#                            [--setpoints <per day>] [--legacy <fraction>] [--noise <per day>] [--dropouts <fraction>] [--gaps <number>]
+#                            [--gaplength <hours>] [--dataformat <csv|binary|none>] [--seed <seed>] <output directory>
+
+# EXAMPLE CALLS
+# ./generate_logs.py /tmp/synthetic
+# ./generate_logs.py --days 1826 --channels 4 --switches 48 --legacy 0.2 --gaps 10 /tmp/synthetic-5y
+
+# INPUTS
+# <output directory> directory for generated logs - created if it does not exist, existing logs are overwritten
+# --days length of logs, from 1 day to 5 years (1826 days) or more (default 30), starting at midnight on --start (default 2020-01-01)
+# --interval control cycle interval in seconds (default 10) - one data log row per cycle, switching events happen on a cycle
+# --channels number of temperature sensors in data log (default 1) - first is the control sensor
+# --switches mean number of on/off switching cycles per day (default 24) - duty cycle varies with season
+# --setpoints mean number of setpoint changes per day (default 1)
+# --legacy fraction of controller log (from start) with legacy "YYYY-MM-DD-HH-MM-SS" timestamps (default 0)
+# --noise mean number of ERROR/WARNING messages per day (default 2), including failed control sensor reads which switch the system off
+# --dropouts fraction of failed sensor reads in data log (default 0.001)
+# --gaps number of times the controller is stopped (default 0) for --gaplength hours (default 6) - nothing is logged while stopped
+# --dataformat data log format (default csv), or none to only generate controller log
+# --seed random seed (default 1) - same arguments and seed always generate identical logs
+
+# OUTPUTS
+# control_temp.log - controller log in the format written by control_temp.py and settemp (setpoint changes, switching events, errors and warnings)
+# temperature_data.csv (or temperature_data.bin) - data log in the format written by control_temp.py, consistent with the controller log
+# Total seconds on in generated logs printed to STDOUT, to check analysis results.  Logs are generated one day at a time, so memory used
+# does not depend on length of logs
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Binary data log written from same millidegree readings as CSV data log
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import math
+import time
+import calendar
+import argparse
+from time import gmtime, strftime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "scripts"))
+import data_log
+import numpy as np
+
+HYSTERESIS = 0.1
+SETPOINTS = [18.0, 19.0, 20.0, 20.5, 21.0, 22.0, 24.0, 27.0, 28.0]
+SETPOINT_FILE = "/etc/controller-setpoints/setpoint"
+
+# Time of day strings for every second of a day, in current and legacy log formats
+TIMES_OF_DAY = ["%02d:%02d:%02d" % (ii // 3600, ii // 60 % 60, ii % 60) for ii in range(86400)]
+LEGACY_TIMES_OF_DAY = [x.replace(":", "-") for x in TIMES_OF_DAY]
+
+# Temperature as read from DS18B20 (1/16 C resolution, reported in whole millidegrees) - returns array of int64
+def to_millidegrees(temps):
+  return (np.round(temps * 16) * 62.5).astype(np.int64)
+
+# Temperature as read from DS18B20 formatted as by control_temp.py - returns array of strings
+def format_temperatures(temps):
+  values, index = np.unique(to_millidegrees(temps), return_inverse=True)
+  strings = np.array([str(value / 1000) for value in values], dtype=object)
+  return strings[index.reshape(-1)]
+
+# Random times of n events in [start, end), on control cycles - sorted
+def random_times(rng, n, start, end, interval):
+  return np.sort(start + (rng.uniform(0, end - start, n) // interval * interval).astype(np.int64))
+
+# Temperature sensor label(s) as used by control_temp.py
+def sensor_labels(channels):
+  if channels == 1:
+    return ["Current"]
+  return ["28-0300a279f%03x" % ii for ii in range(channels)]
+
+# Noise messages - (message, True if control sensor failed and system is switched off)
+def noise_message(rng, sensors, setpoint):
+  kind = rng.integers(4)
+  if kind == 0:
+    return "WARNING: Cannot get current temperature from sensor "+sensors[rng.integers(len(sensors))]+" - check 1-wire driver enabled, sensor is connected correctly and (if set) --sensorid is correct", False
+  if kind == 1:
+    return "WARNING: "+SETPOINT_FILE+" cannot be found/opened or does not contain a valid setpoint - keeping setpoint "+str(setpoint), False
+  if kind == 2:
+    return "ERROR: Requested demand status 1 but actual status 0 - failed to set demand signal!", False
+  return "ERROR: Cannot get current temperature from control channel, cannot run control cycle", True
+
+print(strftime("%Y-%m-%d-%H:%M:%S: Starting synthetic log generation", gmtime()))
+parser = argparse.ArgumentParser(description='Generate synthetic controller log and temperature data log for benchmarking log analysis')
+parser.add_argument('output_dir', help='Output directory')
+parser.add_argument('--days', '-n', type=float, default=30, help='Length of logs (days) - default: 30')
+parser.add_argument('--start', '-s', default="2020-01-01", metavar='YYYY-MM-DD', help='First day of logs - default: 2020-01-01')
+parser.add_argument('--interval', '-i', type=int, default=10, metavar='SECONDS', help='Control cycle interval (s) - default: 10')
+parser.add_argument('--channels', '-c', type=int, default=1, help='Number of temperature sensors in data log - default: 1')
+parser.add_argument('--switches', '-w', type=float, default=24, metavar='PER_DAY', help='Mean switching cycles per day - default: 24')
+parser.add_argument('--setpoints', '-p', type=float, default=1, metavar='PER_DAY', help='Mean setpoint changes per day - default: 1')
+parser.add_argument('--legacy', '-l', type=float, default=0, metavar='FRACTION', help='Fraction of controller log with legacy timestamps - default: 0')
+parser.add_argument('--noise', '-e', type=float, default=2, metavar='PER_DAY', help='Mean ERROR/WARNING messages per day - default: 2')
+parser.add_argument('--dropouts', '-d', type=float, default=0.001, metavar='FRACTION', help='Fraction of failed sensor reads - default: 0.001')
+parser.add_argument('--gaps', '-g', type=int, default=0, help='Number of times controller is stopped - default: 0')
+parser.add_argument('--gaplength', '-t', type=float, default=6, metavar='HOURS', help='Time controller is stopped each time (hours) - default: 6')
+parser.add_argument('--dataformat', '-o', choices=['csv', 'binary', 'none'], default='csv', help='Data log format - default: csv')
+parser.add_argument('--seed', '-r', type=int, default=1, help='Random seed - default: 1')
+args = parser.parse_args()
+
+if args.days <= 0 or args.interval < 1 or args.channels < 1 or args.switches <= 0:
+  print("ERROR: --days, --interval, --channels and --switches must be greater than zero")
+  sys.exit(1)
+
+rng = np.random.default_rng(args.seed)
+start = calendar.timegm(time.strptime(args.start, "%Y-%m-%d"))
+end = start + int(args.days * 86400)
+legacy_end = start + int(args.legacy * (end - start))
+labels = sensor_labels(args.channels)
+os.makedirs(args.output_dir, exist_ok=True)
+log_file = os.path.join(args.output_dir, "control_temp.log")
+
+# Controller stopped between each gap start and end
+gap_starts = random_times(rng, args.gaps, start, end, args.interval)
+gap_ends = gap_starts + int(args.gaplength * 3600) // args.interval * args.interval
+
+# Status changes (time, status, control temperature) - carried over from previous day to generate data log rows
+change_times = [start]
+change_status = [0]
+change_temps = [SETPOINTS[0]]
+setpoint = SETPOINTS[0]
+setpoint_times = [start]
+setpoint_values = [setpoint]
+status = 0
+next_cycle = start + int(rng.uniform(0, 86400 / args.switches)) // args.interval * args.interval
+pending = []
+total_on = 0
+num_lines = 0
+num_rows = 0
+
+if args.dataformat == "csv":
+  data_file = open(os.path.join(args.output_dir, "temperature_data.csv"), "w")
+  data_file.write("Timestamp,Setpoint (C),"+"".join([label+" Temperature (C)," for label in labels])+"Demand Status (0/1)\n")
+elif args.dataformat == "binary":
+  data_file = open(os.path.join(args.output_dir, "temperature_data.bin"), "wb")
+  data_file.write(data_log.binary_header(labels))
+  record_dtype = np.dtype([('timestamp', '<i8'), ('setpoint', '<f4'), ('temps', '<f4', (args.channels,)), ('demand', 'u1')])
+
+with open(log_file, "w") as log:
+  for day in range(start, end, 86400):
+    day_end = min(day + 86400, end)
+    # Events of this day - (time, order, kind, value) sorted by time, starting with events carried from previous day
+    events = pending
+    # Switching cycles - duty cycle higher in winter than summer, on and off on control cycles
+    duty = 0.5 + 0.4 * math.cos(2 * math.pi * ((day - start) / 86400 + 10) / 365.25) + rng.uniform(-0.1, 0.1)
+    duty = min(max(duty, 0.02), 0.98)
+    while next_cycle < day_end:
+      period = 86400 / args.switches * rng.uniform(0.5, 1.5)
+      off_time = next_cycle + max(args.interval, int(period * duty) // args.interval * args.interval)
+      events.append((next_cycle, 1, "switch", 1))
+      events.append((off_time, 1, "switch", 0))
+      next_cycle += max(2 * args.interval, int(period) // args.interval * args.interval)
+    for event_time in random_times(rng, rng.poisson(args.setpoints * (day_end - day) / 86400), day, day_end, args.interval):
+      events.append((int(event_time), 0, "setpoint", SETPOINTS[rng.integers(len(SETPOINTS))]))
+    for event_time in random_times(rng, rng.poisson(args.noise * (day_end - day) / 86400), day, day_end, args.interval):
+      events.append((int(event_time), 2, "noise", None))
+    for gap_start in gap_starts[(gap_starts >= day) & (gap_starts < day_end)]:
+      events.append((int(gap_start), 3, "stop", None))
+    events.sort(key=lambda event: event[0:2])
+
+    # Write controller log lines for day - events after end of day (off of last cycle) are carried to next day
+    prefix = strftime("%Y-%m-%d-", gmtime(day))
+    messages = []
+    pending = [event for event in events if event[0] >= day_end]
+    for event_time, order, kind, value in events:
+      if event_time >= day_end:
+        continue
+      if kind != "stop" and np.any((event_time >= gap_starts) & (event_time < gap_ends)):
+        continue
+      if kind == "setpoint":
+        if value != setpoint:
+          setpoint = value
+          setpoint_times.append(event_time)
+          setpoint_values.append(setpoint)
+          messages.append((event_time, "Setpoint: "+str(setpoint)))
+        continue
+      new_status = status
+      if kind == "switch" and value != status:
+        new_status = value
+        if value == 1:
+          temp = setpoint - HYSTERESIS - abs(rng.normal(0, 0.03))
+          messages.append((event_time, "Setpoint=%s, Actual=%s - Switching system on" % (setpoint, format_temperatures(np.array([temp]))[0])))
+        else:
+          temp = setpoint + abs(rng.normal(0, 0.03))
+          messages.append((event_time, "Setpoint=%s, Actual=%s - Switching system off" % (setpoint, format_temperatures(np.array([temp]))[0])))
+      elif kind == "noise":
+        message, control_failed = noise_message(rng, labels if args.channels > 1 else ["28-0300a279f011"], setpoint)
+        messages.append((event_time, message))
+        if control_failed:
+          messages.append((event_time, "Switching system off and waiting for retry next cycle"))
+          new_status = 0
+          temp = setpoint
+      elif kind == "stop":
+        messages.append((event_time, "Keyboard interrupt - Switching system off and exiting"))
+        new_status = 0
+        temp = setpoint
+      if new_status != status:
+        if status == 1:
+          total_on += event_time - change_times[-1]
+        status = new_status
+        change_times.append(event_time)
+        change_status.append(status)
+        change_temps.append(temp)
+    for event_time, message in messages:
+      if event_time < legacy_end:
+        log.write(prefix+LEGACY_TIMES_OF_DAY[event_time - day]+": "+message+"\n")
+      else:
+        log.write(prefix+TIMES_OF_DAY[event_time - day]+": "+message+"\n")
+    num_lines += len(messages)
+
+    # Write data log rows for day - one per control cycle while controller running
+    if args.dataformat != "none":
+      timestamps = np.arange(day + (-(day - start) % args.interval), day_end, args.interval, dtype=np.int64)
+      running = np.ones(len(timestamps), dtype=bool)
+      for gap_start, gap_end in zip(gap_starts, gap_ends):
+        running &= (timestamps < gap_start) | (timestamps >= gap_end)
+      timestamps = timestamps[running]
+      times = np.array(change_times)
+      index = np.searchsorted(times, timestamps, side='right') - 1
+      demand = np.array(change_status)[index]
+      setpoint_index = np.searchsorted(np.array(setpoint_times), timestamps, side='right') - 1
+      setpoints = np.array(setpoint_values)[setpoint_index]
+      # Control temperature rises while on and falls while off between switching temperatures, other sensors follow ambient temperature
+      rate = np.where(demand == 1, 1, -1) * 2 * HYSTERESIS / (86400 / args.switches)
+      control = np.array(change_temps)[index] + rate * (timestamps - times[index])
+      control = np.clip(control, setpoints - 3, setpoints + 1) + rng.normal(0, 0.02, len(timestamps))
+      ambient = 15 + 5 * np.sin(2 * np.pi * (timestamps % 86400) / 86400) + rng.normal(0, 0.05, len(timestamps))
+      temps = np.vstack([control] + [ambient - ii for ii in range(1, args.channels)])
+      failed = rng.random(temps.shape) < args.dropouts
+      if args.dataformat == "csv":
+        prefix = strftime("%Y-%m-%d ", gmtime(day))
+        columns = [[prefix + TIMES_OF_DAY[ii] for ii in timestamps - day], np.array([str(x) for x in setpoint_values], dtype=object)[setpoint_index]]
+        for ii in range(args.channels):
+          column = format_temperatures(temps[ii])
+          column[failed[ii]] = ""
+          columns.append(column)
+        columns.append(np.array(["0", "1"], dtype=object)[demand])
+        data_file.write("".join([",".join(row) + "\n" for row in zip(*columns)]))
+      else:
+        records = np.zeros(len(timestamps), dtype=record_dtype)
+        records['timestamp'] = timestamps
+        records['setpoint'] = setpoints
+        # Same millidegree readings as CSV data log, so binlog_export.py output matches CSV generated with same seed
+        records['temps'] = np.where(failed, np.nan, to_millidegrees(temps) / 1000).T
+        records['demand'] = demand
+        data_file.write(records.tobytes())
+      num_rows += len(timestamps)
+
+    # Only status changes since start of day are needed for next day
+    keep = max(0, len(change_times) - 1)
+    change_times, change_status, change_temps = change_times[keep:], change_status[keep:], change_temps[keep:]
+    keep = max(0, len(setpoint_times) - 1)
+    setpoint_times, setpoint_values = setpoint_times[keep:], setpoint_values[keep:]
+
+if status == 1:
+  total_on += end - change_times[-1]
+if args.dataformat != "none":
+  data_file.close()
+print("Controller log: %s (%d lines)" % (log_file, num_lines))
+if args.dataformat != "none":
+  print("Data log: %s (%d rows, %d channels)" % (data_file.name, num_rows, args.channels))
+print("Total %d seconds on from %s to %s" % (total_on, strftime("%Y-%m-%d-%H:%M:%S", gmtime(start)), strftime("%Y-%m-%d-%H:%M:%S", gmtime(end))))
+print(strftime("%Y-%m-%d-%H:%M:%S: Completed synthetic log generation", gmtime()))
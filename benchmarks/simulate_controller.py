@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+# Run control_temp.py against a simulated thermal plant in accelerated (simulated) time - measures cost of each control cycle off a Pi,
+# and shows control performance, switching and log output over days of simulated time in seconds
+
+# SYNTAX: ./simulate_controller.py [--days <days>] [--interval <seconds>] [--sensors <number>] [--setpoint <temperature>] [--hysteresis <temperature>]
+#                                  [--cooler] [--sweep <serial|threaded|bulk>] [--logformat <csv|binary>] [--schedule <schedule file>]
+#                                  [--resolution <bits>...] [--adaptive <temperature>] [--logevery <cycles>] [--gain <C/hour>] [--tau <hours>]
+#                                  [--ambient <temperature>] [--swing <temperature>] [--drift <C/sqrt(hour)>] [--noise <temperature>]
+#                                  [--dropouts <probability>] [--quirk <probability>] [--seed <seed>] [--workdir <directory>] [--tail <lines>]
+
+# EXAMPLE CALLS
+# ./simulate_controller.py
+# ./simulate_controller.py --days 7 --sensors 4 --sweep bulk --workdir /tmp/simulation
+# ./simulate_controller.py --cooler --setpoint 12 --ambient 20 --quirk 0.5
+# ./simulate_controller.py --days 7 --schedule ../config/schedule.conf
+# ./simulate_controller.py --sensors 8 --resolution 12 9 --adaptive 1 --logevery 6
+
+# INPUTS (all arguments are optional)
+# --days simulated time to run (default 1), starting at midnight on --start (default 2020-01-01)
+# --interval, --setpoint, --hysteresis, --cooler, --sweep and --logformat are passed to control_temp.py (defaults 10 s, 20 C, 0.1 C, heater,
+#   serial, csv) with --sensors simulated 1-wire sensors (default 1) - first sensor is used for control
+# --schedule setpoint schedule file passed to control_temp.py - setpoint then follows schedule from start (times in local time of this process)
+# --resolution (one per sensor, or one for all), --adaptive and --logevery are passed to control_temp.py (default all sensors 12 bit, every cycle) -
+#   with two resolutions and more than two sensors the second is used for every logging-only sensor
+# --gain, --tau, --ambient, --swing, --drift, --noise, --dropouts and --quirk set the plant and sensor model (see thermal_plant.py)
+# --workdir directory for simulated sysfs tree and logs - if not specified a temporary directory is used and removed afterwards
+# --tail number of lines at end of controller log to show (default 10)
+
+# OUTPUTS
+# Summary printed to STDOUT: simulated and real time, number of cycles and real time per cycle (latency percentiles - time taken by
+# control_temp.py, not including plant model), switching events (from controller log and demand signal), control temperature statistics,
+# sensor read faults injected, sensor reads and conversion time, WARNING/ERROR counts and end of controller log.  In --workdir the controller log (control_temp.log) and data log
+# (temperature_data.csv or .bin) are kept, and can be analysed with controller_analyse.py / data_analyse.py
+# control_temp.py runs in this process with clock.py replaced by a simulated clock, so every sleep() returns immediately - the simulation is
+# stopped at the end as if by Ctrl-C, so the controller switches off and exits normally
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Added --schedule
+# 10/2026 - Added --resolution, --adaptive and --logevery, estimated sensor conversion time saved shown in summary
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import time
+import runpy
+import shutil
+import calendar
+import argparse
+import tempfile
+import contextlib
+from time import perf_counter
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), "scripts")
+sys.path.insert(0, SCRIPT_DIR)
+import clock
+import message_log
+import thermal_plant
+
+GPIO_OUTPUT = 17
+
+# Value at percentile of sorted list
+def percentile(values, percent):
+  return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+# Times control cycles of controller - real time between end of one cycle sleep and start of the next, excluding time spent in plant model
+class CycleTimer:
+  def __init__(self, plant, interval):
+    self.plant = plant
+    self.interval = interval
+    self.cycle_start = None
+    self.plant_time = 0
+    self.latencies = []
+
+  def step(self, previous, now):
+    start = perf_counter()
+    # Only end of cycle sleeps mark a new cycle - short sleeps (relay settle, bulk conversion poll) are part of the cycle
+    if now - previous >= self.interval / 2:
+      if self.cycle_start != None:
+        self.latencies.append(start - self.cycle_start - self.plant_time)
+      self.plant.step(previous, now)
+      self.plant_time = 0
+      self.cycle_start = perf_counter()
+    else:
+      self.plant.step(previous, now)
+      self.plant_time += perf_counter() - start
+
+parser = argparse.ArgumentParser(description='Run control_temp.py against a simulated thermal plant in accelerated time')
+parser.add_argument('--days', '-n', type=float, default=1, help='Simulated time (days) - default: 1')
+parser.add_argument('--start', default="2020-01-01", metavar='YYYY-MM-DD', help='Start of simulation - default: 2020-01-01')
+parser.add_argument('--interval', '-i', type=float, default=10, metavar='SECONDS', help='Control cycle interval (s) - default: 10')
+parser.add_argument('--sensors', '-s', type=int, default=1, help='Number of simulated 1-wire sensors - default: 1')
+parser.add_argument('--setpoint', '-p', type=float, default=20, metavar='TEMPERATURE', help='Setpoint (C) - default: 20')
+parser.add_argument('--hysteresis', '-t', type=float, default=0.1, metavar='TEMPERATURE', help='Hysteresis (C) - default: 0.1')
+parser.add_argument('--cooler', '-c', action='store_true', help='Demand signal cools plant instead of heating')
+parser.add_argument('--sweep', '-w', choices=['serial', 'threaded', 'bulk'], default='serial', help='Sensor read mode - default: serial')
+parser.add_argument('--logformat', '-o', choices=['csv', 'binary'], default='csv', help='Data log format - default: csv')
+parser.add_argument('--schedule', metavar='FILENAME', help='Setpoint schedule file (see config/schedule.conf) - default: fixed --setpoint')
+parser.add_argument('--resolution', type=int, nargs='+', metavar='BITS', help='Sensor resolution(s) (9-12 bit) - default: 12')
+parser.add_argument('--adaptive', type=float, metavar='TEMPERATURE', help='Adaptive control sensor resolution margin (C) - default: not adaptive')
+parser.add_argument('--logevery', type=int, default=1, metavar='CYCLES', help='Read logging-only sensors every CYCLES cycles - default: 1')
+parser.add_argument('--gain', type=float, default=2.0, metavar='C/HOUR', help='Heating/cooling rate at full demand (C/hour) - default: 2')
+parser.add_argument('--tau', type=float, default=6.0, metavar='HOURS', help='Time constant of heat loss to ambient (hours) - default: 6')
+parser.add_argument('--ambient', type=float, default=12.0, metavar='TEMPERATURE', help='Mean ambient temperature (C) - default: 12')
+parser.add_argument('--swing', type=float, default=4.0, metavar='TEMPERATURE', help='Amplitude of daily ambient temperature cycle (C) - default: 4')
+parser.add_argument('--drift', type=float, default=0.2, metavar='C/SQRT(HOUR)', help='Random drift of ambient temperature - default: 0.2')
+parser.add_argument('--noise', type=float, default=0.05, metavar='TEMPERATURE', help='Standard deviation of sensor noise (C) - default: 0.05')
+parser.add_argument('--dropouts', type=float, default=0.001, metavar='PROBABILITY', help='Probability of failed sensor read each cycle - default: 0.001')
+parser.add_argument('--quirk', type=float, default=0.05, metavar='PROBABILITY', help='Probability of empty first sensor read (kernel v5.10) - default: 0.05')
+parser.add_argument('--seed', type=int, default=1, help='Random seed - default: 1')
+parser.add_argument('--workdir', '-d', help='Directory for simulated sysfs tree and logs - default: temporary directory, removed afterwards')
+parser.add_argument('--tail', type=int, default=10, metavar='LINES', help='Lines at end of controller log to show - default: 10')
+args = parser.parse_args()
+
+if args.days <= 0 or args.interval <= 0 or args.sensors < 1:
+  print("ERROR: --days, --interval and --sensors must be greater than zero")
+  sys.exit(1)
+
+workdir = args.workdir or tempfile.mkdtemp(prefix="controller-simulation-")
+sysroot = os.path.join(workdir, "sysroot")
+controller_log_file = os.path.join(workdir, "control_temp.log")
+data_log_file = os.path.join(workdir, "temperature_data." + ("bin" if args.logformat == "binary" else "csv"))
+for filename in [controller_log_file, data_log_file]:
+  if os.path.exists(filename):
+    os.remove(filename)
+start = calendar.timegm(time.strptime(args.start, "%Y-%m-%d"))
+stop = start + args.days * 86400
+sensors = ["28-00000000%04x" % ii for ii in range(args.sensors)]
+
+plant = thermal_plant.ThermalPlant(sysroot, sensors, GPIO_OUTPUT, start, setpoint=args.setpoint, gain=args.gain, cooler=args.cooler, tau=args.tau,
+                                   ambient=args.ambient, swing=args.swing, drift=args.drift, noise=args.noise, dropouts=args.dropouts, quirk=args.quirk, seed=args.seed)
+timer = CycleTimer(plant, args.interval)
+clock.use(clock.SimulatedClock(start, stop=stop, listener=timer.step))
+
+# Run controller in this process, with its output discarded (all messages are also written to controller log)
+sys.argv = [os.path.join(SCRIPT_DIR, "control_temp.py"), str(args.setpoint), "-i", str(args.interval), "-t", str(args.hysteresis), "-s"] + sensors + [
+            "-g", str(GPIO_OUTPUT), "-l", data_log_file, "-o", args.logformat, "-m", controller_log_file, "-w", args.sweep, "--sysroot", sysroot]
+if args.cooler:
+  sys.argv.append("-c")
+if args.schedule:
+  sys.argv += ["--schedule", os.path.abspath(args.schedule)]
+if args.resolution:
+  resolutions = args.resolution
+  if len(resolutions) == 2 and args.sensors > 2:
+    resolutions = resolutions + resolutions[1:] * (args.sensors - 2)
+  sys.argv += ["--resolution"] + [str(bits) for bits in resolutions]
+if args.adaptive != None:
+  sys.argv += ["--adaptive", str(args.adaptive)]
+sys.argv += ["--logevery", str(args.logevery)]
+print("Simulating %g days of control with %d sensor(s) in %s" % (args.days, args.sensors, workdir))
+real_start = perf_counter()
+exit_code = 0
+with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+  try:
+    runpy.run_path(sys.argv[0], init_globals={"open": plant.open}, run_name="__main__")
+  except SystemExit as e:
+    exit_code = e.code
+  except KeyboardInterrupt:
+    # Simulation ended during a short sleep within a cycle
+    pass
+real_time = perf_counter() - real_start
+# Controller log is written in background - make sure all messages are written, even if controller stopped within a cycle
+message_log.close_all()
+clock.use(clock.SystemClock())
+plant.close()
+
+try:
+  with open(controller_log_file, 'r') as f:
+    log_lines = f.readlines()
+except OSError:
+  log_lines = []
+if not timer.latencies:
+  print("ERROR: controller did not complete any control cycles (exit code %s)" % exit_code)
+  print(''.join(log_lines[-args.tail:]), end="")
+  sys.exit(1)
+
+latencies = sorted(timer.latencies)
+simulated_time = plant.now - start
+print("Simulated %.1f hours in %.2f s real time (%.0fx)" % (simulated_time / 3600, real_time, simulated_time / real_time))
+print("Control cycles: %d" % len(latencies))
+print("Cycle latency (ms): p50 %.3f  p90 %.3f  p99 %.3f  max %.3f  mean %.3f" % (percentile(latencies, 50) * 1000, percentile(latencies, 90) * 1000,
+      percentile(latencies, 99) * 1000, latencies[-1] * 1000, sum(latencies) / len(latencies) * 1000))
+print("Switching events logged: %d on, %d off (demand signal changed %d times, on %.1f%% of time)" % (sum(["Switching system on" in line for line in log_lines]),
+      sum(["Switching system off" in line for line in log_lines]), plant.switches, plant.heating_seconds / max(1, simulated_time) * 100))
+print("Control temperature: min %.2f C  max %.2f C  mean %.2f C  mean error from setpoint %.3f C" % (plant.min_temp, plant.max_temp,
+      plant.temp_seconds / max(1, plant.total_seconds), plant.error_seconds / max(1, plant.total_seconds)))
+print("Sensor read faults injected: %d empty first reads, %d failed reads" % (plant.empty_reads, plant.dropouts))
+print("Sensor reads: %d, estimated conversion time per cycle %.3f s (%.3f s saved compared with 12 bit read of every sensor)" % (plant.sensor_reads,
+      plant.conversion_seconds / len(latencies), 0.75 * args.sensors - plant.conversion_seconds / len(latencies)))
+print("Controller log: %d lines, %d WARNING, %d ERROR" % (len(log_lines), sum(["WARNING:" in line for line in log_lines]), sum(["ERROR:" in line for line in log_lines])))
+if args.tail > 0:
+  print("Last %d lines of controller log:" % min(args.tail, len(log_lines)))
+  print(''.join(log_lines[-args.tail:]), end="")
+if args.workdir:
+  print("Logs kept in %s" % workdir)
+else:
+  shutil.rmtree(workdir)
@@ -0,0 +1,216 @@
+# Simulated 1-wire sensors, GPIO and thermal plant for temperature controller - used by simulate_controller.py to run control_temp.py without hardware
+
+# SYNTAX: import thermal_plant
+#         plant = thermal_plant.ThermalPlant(<root>, <sensor IDs>, <GPIO output>, <start>, [<options>...])
+
+# EXAMPLE CALLS
+# plant = thermal_plant.ThermalPlant("/tmp/sim", ["28-0000000000a0", "28-0000000000a1"], 17, 1577836800)
+# clock.use(clock.SimulatedClock(1577836800, stop=1577923200, listener=plant.step))
+# runpy.run_path("control_temp.py", init_globals={"open": plant.open}, run_name="__main__")
+
+# INPUTS
+# <root> directory in which simulated sysfs tree is created (use as --sysroot of control_temp.py)
+# <sensor IDs> 1-wire sensor IDs - first sensor measures temperature of controlled space, all others measure ambient temperature
+# <GPIO output> demand signal GPIO - heating (or cooling) is applied while its value is 1
+# <start> unix timestamp at start of simulation
+# Options (keyword arguments):
+#   gain - rate of heating or cooling at full demand (C/hour, default 2), cooler - True if demand cools (default False)
+#   tau - time constant of heat loss to ambient (hours, default 6)
+#   ambient - mean ambient temperature (C, default 12), swing - amplitude of daily ambient cycle (C, default 4, coldest at midnight)
+#   drift - random walk of ambient temperature (C per square root of hour, default 0.2)
+#   noise - standard deviation of sensor noise (C, default 0.05) - readings are also quantised as by DS18B20 to resolution set in sensor 'resolution'
+#     file (1/16 C at 12 bit, 0.5 C at 9 bit)
+#   dropouts - probability of a sensor failing both read attempts in a cycle (CRC error or all-zero response, default 0.001)
+#   quirk - probability of first read attempt of a sensor returning empty (kernel v5.10 1-wire issue - retry succeeds, default 0.05)
+#   seed - random seed (default 1)
+
+# OUTPUTS
+# Simulated sysfs tree under <root>: sys/devices/w1_bus_master1/<sensor ID>/w1_slave, resolution (12) and therm_bulk_read, linked from sys/bus/w1/devices,
+#   and sys/class/gpio/gpio<GPIO output>/direction and value (exported as output, value 0)
+# step(previous, now) - listener for clock.SimulatedClock: advances plant to simulated time now, with demand read from GPIO value file,
+#   then writes new sensor readings to w1_slave files
+# open() - replacement for open() passed to control_temp.py: returns empty response for first read of a sensor (quirk) and failed
+#   responses (dropouts) - all other files are opened normally.  A static file cannot give a different response to the retry read, so read faults are injected here
+# close() - close simulated sysfs files held open by plant
+# Counters: switches (demand signal changes), heating_seconds, empty_reads, dropouts, sensor_reads and conversion_seconds (DS18B20 conversion time
+#   of each sensor read at its resolution, 750 ms at 12 bit), and temperature min/max/mean and mean absolute error from setpoint
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Added sensor resolution
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import io
+import os
+import math
+import random
+import builtins
+
+W1_MASTER = "sys/devices/w1_bus_master1"
+W1_DEVICES = "sys/bus/w1/devices"
+GPIO_ROOT = "sys/class/gpio"
+
+# w1_slave responses - scratchpad bytes, CRC status line, temperature line
+CRC_ERROR = "50 05 4b 46 7f ff 0c 10 1c : crc=00 NO\n50 05 4b 46 7f ff 0c 10 1c t=85000\n"
+NULL_RESPONSE = "00 00 00 00 00 00 00 00 00 : crc=00 YES\n00 00 00 00 00 00 00 00 00 t=0\n"
+
+# w1_slave response of DS18B20 reading temperature - raw value is in 1/16 C, with low bits zero below 12 bit resolution
+def w1_slave_response(temp, bits=12):
+  raw = int(round(temp * 16))
+  raw -= raw % (1 << (12 - bits))
+  scratchpad = "%02x %02x 4b 46 7f ff 0c 10 %02x" % (raw & 0xff, (raw >> 8) & 0xff, (raw * 7) & 0xff)
+  return "%s : crc=%s YES\n%s t=%d\n" % (scratchpad, scratchpad[-2:], scratchpad, int(raw * 62.5))
+
+class ThermalPlant:
+  def __init__(self, root, sensors, gpio_output, start, setpoint=None, gain=2.0, cooler=False, tau=6.0, ambient=12.0, swing=4.0, drift=0.2,
+               noise=0.05, dropouts=0.001, quirk=0.05, seed=1):
+    self.root = root
+    self.sensors = sensors
+    self.setpoint = setpoint
+    self.gain = -gain if cooler else gain
+    self.tau = tau * 3600
+    self.ambient = ambient
+    self.swing = swing
+    self.drift_rate = drift
+    self.noise = noise
+    self.dropout_rate = dropouts
+    self.quirk_rate = quirk
+    self.random = random.Random(seed)
+    self.drift = 0
+    self.demand = 0
+    # Plant starts at setpoint (if given), otherwise at ambient temperature
+    self.temp = self.ambient_temp(start) if setpoint == None else setpoint
+    # Read faults decided for each sensor at current simulated time
+    self.faults = {}
+    self.now = start
+    self.switches = 0
+    self.heating_seconds = 0
+    self.empty_reads = 0
+    self.dropouts = 0
+    self.sensor_reads = 0
+    self.conversion_seconds = 0
+    self.min_temp = self.temp
+    self.max_temp = self.temp
+    self.temp_seconds = 0
+    self.error_seconds = 0
+    self.total_seconds = 0
+
+    master = os.path.join(root, W1_MASTER)
+    devices = os.path.join(root, W1_DEVICES)
+    os.makedirs(devices, exist_ok=True)
+    for sensor in sensors:
+      os.makedirs(os.path.join(master, sensor), exist_ok=True)
+    # Sensor and bus master directories are linked from devices directory as in sysfs
+    for name in sensors + [os.path.basename(W1_MASTER)]:
+      link = os.path.join(devices, name)
+      if not os.path.islink(link):
+        os.symlink(os.path.relpath(os.path.join(master, name) if name in sensors else master, devices), link)
+    with builtins.open(os.path.join(master, "therm_bulk_read"), 'w') as f:
+      f.write("0\n")
+    self.gpio_value = os.path.join(root, GPIO_ROOT, "gpio"+str(gpio_output), "value")
+    os.makedirs(os.path.dirname(self.gpio_value), exist_ok=True)
+    with builtins.open(os.path.join(root, GPIO_ROOT, "export"), 'w') as f:
+      pass
+    with builtins.open(os.path.join(os.path.dirname(self.gpio_value), "direction"), 'w') as f:
+      f.write("out\n")
+    with builtins.open(self.gpio_value, 'w') as f:
+      f.write("0\n")
+    # Files are held open, since plant is updated several times each control cycle
+    self.gpio_fd = os.open(self.gpio_value, os.O_RDONLY)
+    self.sensor_fds = [os.open(os.path.join(master, sensor, "w1_slave"), os.O_WRONLY | os.O_CREAT, 0o644) for sensor in sensors]
+    for sensor in sensors:
+      with builtins.open(os.path.join(master, sensor, "resolution"), 'w') as f:
+        f.write("12\n")
+    self.resolution_fds = [os.open(os.path.join(master, sensor, "resolution"), os.O_RDONLY) for sensor in sensors]
+    self.write_sensors()
+
+  # Ambient temperature at time - daily cycle plus random drift
+  def ambient_temp(self, now):
+    return self.ambient - self.swing * math.cos(2 * math.pi * (now % 86400) / 86400) + self.drift
+
+  # Resolution (bits) set for sensor - 12 if not valid
+  def resolution(self, ii):
+    try:
+      bits = int(os.pread(self.resolution_fds[ii], 16, 0))
+    except (OSError, ValueError):
+      return 12
+    return bits if 9 <= bits <= 12 else 12
+
+  # Write current reading of every sensor to its w1_slave file
+  def write_sensors(self):
+    for ii, fd in enumerate(self.sensor_fds):
+      temp = self.temp if ii == 0 else self.ambient_temp(self.now) - 0.5 * ii
+      response = w1_slave_response(temp + self.random.gauss(0, self.noise), self.resolution(ii)).encode()
+      os.pwrite(fd, response, 0)
+      os.ftruncate(fd, len(response))
+
+  # Advance plant from previous to now (simulated unix timestamps) with current demand signal
+  def step(self, previous, now):
+    dt = now - previous
+    if dt <= 0:
+      return
+    try:
+      demand = int(os.pread(self.gpio_fd, 16, 0).strip() or 0)
+    except (OSError, ValueError):
+      demand = 0
+    if demand != self.demand:
+      self.switches += 1
+      self.demand = demand
+    self.heating_seconds += demand * dt
+    self.drift += self.random.gauss(0, self.drift_rate * math.sqrt(dt / 3600))
+    # Exact solution for constant ambient temperature and demand over step
+    equilibrium = self.ambient_temp(now) + self.gain * self.tau / 3600 * demand
+    self.temp = equilibrium + (self.temp - equilibrium) * math.exp(-dt / self.tau)
+    self.now = now
+    self.min_temp = min(self.min_temp, self.temp)
+    self.max_temp = max(self.max_temp, self.temp)
+    self.temp_seconds += self.temp * dt
+    if self.setpoint != None:
+      self.error_seconds += abs(self.temp - self.setpoint) * dt
+    self.total_seconds += dt
+    self.faults = {}
+    self.write_sensors()
+
+  # open() for control_temp.py - w1_slave reads may be empty (first attempt only) or fail (both attempts) in each cycle
+  def open(self, file, mode='r', *args, **kwargs):
+    if isinstance(file, str) and file.endswith("/w1_slave") and 'r' in mode:
+      sensor = os.path.basename(os.path.dirname(file))
+      fault = self.faults.get(sensor)
+      if fault == None:
+        if sensor in self.sensors:
+          self.sensor_reads += 1
+          self.conversion_seconds += 0.75 / 2 ** (12 - self.resolution(self.sensors.index(sensor)))
+        if self.random.random() < self.dropout_rate:
+          fault = self.random.choice([CRC_ERROR, NULL_RESPONSE])
+          self.dropouts += 1
+        elif self.random.random() < self.quirk_rate:
+          fault = ""
+          self.empty_reads += 1
+        else:
+          fault = False
+        self.faults[sensor] = fault
+        if fault != False:
+          return io.StringIO(fault)
+      elif fault != False and fault != "":
+        # Dropout - retry fails as well
+        return io.StringIO(fault)
+    return builtins.open(file, mode, *args, **kwargs)
+
+  # Close simulated sensor and GPIO files
+  def close(self):
+    for fd in self.sensor_fds + self.resolution_fds + [self.gpio_fd]:
+      os.close(fd)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Micro-benchmark of controller log timestamp parsing - compares log_timestamps.py with time.strptime() (as used by previous log analysis)
+
+# SYNTAX: ./timestamp_benchmark.py [<full filename and path of log> <repeats>]
+
+# EXAMPLE CALLS
+# ./timestamp_benchmark.py
+# ./timestamp_benchmark.py /var/log/temperature-controller/control_temp.log 3
+
+# INPUTS (all arguments are optional)
+# If <full filename and path of log> is not specified default examples/control_temp.log in repo
+# If <repeats> is not specified default 5 - best time of all repeats is reported
+
+# OUTPUTS
+# Time to parse timestamp of every line in log, lines per second and speedup for each parser printed to STDOUT
+# Exits with error if parsers give different results for any line
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import time
+import calendar
+from timeit import default_timer
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "scripts"))
+import log_timestamps
+
+# Timestamp parsing used by controller_analyse.py before log_timestamps.py
+def strptime_timestamp(line):
+  try:
+    return calendar.timegm(time.strptime(line[0:19], "%Y-%m-%d-%H:%M:%S"))
+  except ValueError:
+    try:
+      return calendar.timegm(time.strptime(line[0:19], "%Y-%m-%d-%H-%M-%S"))
+    except ValueError:
+      return None
+
+# Best time of repeats to parse all lines
+def time_parser(parser, lines, repeats):
+  best = None
+  for ii in range(repeats):
+    start = default_timer()
+    for line in lines:
+      parser(line)
+    elapsed = default_timer() - start
+    if best == None or elapsed < best:
+      best = elapsed
+  return best
+
+if len(sys.argv) < 2:
+  log_file = os.path.join(REPO_DIR, "examples", "control_temp.log")
+else:
+  log_file = sys.argv[1]
+if len(sys.argv) < 3:
+  repeats = 5
+else:
+  repeats = int(sys.argv[2])
+
+with open(log_file, "r") as f:
+  lines = list(f)
+print("Parsing timestamps of %d lines from %s (best of %d)" % (len(lines), log_file, repeats))
+
+for line in lines:
+  if log_timestamps.parse_log_timestamp(line) != strptime_timestamp(line):
+    print("ERROR: parsers give different results for line: " + line.rstrip())
+    sys.exit(1)
+
+strptime_time = time_parser(strptime_timestamp, lines, repeats)
+fast_time = time_parser(log_timestamps.parse_log_timestamp, lines, repeats)
+print("time.strptime():  %.3f s (%.0f lines/s)" % (strptime_time, len(lines) / strptime_time))
+print("log_timestamps:   %.3f s (%.0f lines/s)" % (fast_time, len(lines) / fast_time))
+print("Speedup:          %.1fx" % (strptime_time / fast_time))
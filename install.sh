@@ -83,8 +83,8 @@ echo "Installing dependencies - this requires an internet connection and may tak
 apt-get update
 handle_warning $? "Could not update apt repo"
 # Note libatlas-base-dev required to solve missing dependency with matplotlib installed using pip on Raspberry Pi - https://numpy.org/devdocs/user/troubleshooting-importerror.html
-apt-get install -y bc python3-pip libatlas-base-dev awscli
-handle_warning $? "Could not install dependencies: bc python3-pip awscli"
+apt-get install -y bc python3-pip libatlas-base-dev awscli python3-boto3
+handle_warning $? "Could not install dependencies: bc python3-pip awscli python3-boto3"
 # Note it is acceptable to install legit modules such as matplotlib as root with pip - it must be available for all users
 pip3 install matplotlib
 handle_warning $? "Could not install dependencies: Python module matplotlib"
@@ -155,6 +155,11 @@ else
   handle_warning $? "Couldn't edit config file"
   sed -i -e "/ANALYSIS_OUTDIR=/c\ANALYSIS_OUTDIR=\/var\/log\/temperature-controller" /etc/controller.conf
   handle_warning $? "Couldn't edit config file"
+  # Runtime directory is created by systemd service (RuntimeDirectory)
+  sed -i -e "/CONTROL_SOCKET=/c\CONTROL_SOCKET=\/run\/temperature-controller\/controller.sock" /etc/controller.conf
+  handle_warning $? "Couldn't edit config file"
+  sed -i -e "/STATUS_FILE=/c\STATUS_FILE=\/run\/temperature-controller\/status.json" /etc/controller.conf
+  handle_warning $? "Couldn't edit config file"
 fi
 # Ensure correct owner and permissions whether or not file already existed
 chown tempctl:tempctl /etc/controller.conf
@@ -0,0 +1,95 @@
+# Plots of daily analysis results for temperature controller - used by controller_analyse.py to render charts, in parallel where possible
+
+# SYNTAX: import analysis_plots
+#         analysis_plots.render([(<plot function>, <arguments>), ...])
+
+# EXAMPLE CALLS
+# analysis_plots.render([(analysis_plots.daily_bar_chart, (["20200629", "20200630"], [13.26, 14.22], "Title", "Hours", "plot_bar.png", 300, "png")),
+#                        (analysis_plots.daily_line_chart, (["20200629", "20200630"], [13.26, 14.22], "Title", "Hours", "plot.png", 300, "png"))])
+
+# INPUTS
+# Each plot function takes list of days (YYYYMMDD), value for each day, title, y axis label, output filename, DPI and format (any format
+# supported by matplotlib e.g. png, svg, pdf)
+
+# OUTPUTS
+# Plot files.  Matplotlib is only imported by the process rendering each plot, so it is not loaded at all if no plots are rendered
+# render() renders plots in a pool of worker processes (one per plot, up to number of CPUs), or one after another on a single CPU system
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2015, 2020, 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+FORMATS = ['png', 'svg', 'pdf', 'jpg']
+
+# Import matplotlib for file output (no display required)
+def _pyplot():
+  import matplotlib
+  matplotlib.use('Agg')
+  import matplotlib.pyplot as plt
+  return plt
+
+# Matplotlib date numbers (days since 1970-01-01) of list of days in YYYYMMDD format
+def _datenums(datestamps):
+  import datetime as DT
+  from matplotlib.dates import date2num
+  return [date2num(DT.datetime.strptime(x, "%Y%m%d")) for x in datestamps]
+
+# Set up date axis with up to 12 ticks, title and y axis label, and save figure
+def _finish_daily_chart(plt, fig, ax, title, ylabel, filename, dpi, fmt):
+  import matplotlib.dates
+  loc = ax.xaxis.get_major_locator()
+  loc.maxticks[matplotlib.dates.DAILY] = 12
+  plt.title(title)
+  plt.ylabel(ylabel)
+  fig.autofmt_xdate(bottom=0.15)
+  ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter('%Y-%m-%d'))
+  plt.savefig(filename, format=fmt, dpi=dpi)
+  plt.close('all')
+
+# Bar chart of value each day
+def daily_bar_chart(datestamps, values, title, ylabel, filename, dpi, fmt):
+  plt = _pyplot()
+  fig, ax = plt.subplots(1)
+  plt.bar(_datenums(datestamps), values)
+  ax.xaxis_date()
+  fig.set_size_inches(8,6)
+  _finish_daily_chart(plt, fig, ax, title, ylabel, filename, dpi, fmt)
+
+# Line chart of value each day, with marker for each day
+def daily_line_chart(datestamps, values, title, ylabel, filename, dpi, fmt):
+  plt = _pyplot()
+  fig, ax = plt.subplots(1)
+  plt.plot(_datenums(datestamps), values, 'r-o')
+  ax.xaxis_date()
+  _finish_daily_chart(plt, fig, ax, title, ylabel, filename, dpi, fmt)
+
+# Render list of (plot function, arguments) - in worker processes if more than one plot and more than one CPU, unless jobs is specified
+def render(plots, jobs=None):
+  if jobs == None:
+    jobs = min(len(plots), os.cpu_count() or 1)
+  if jobs <= 1:
+    for function, arguments in plots:
+      function(*arguments)
+    return
+  with ProcessPoolExecutor(max_workers=jobs) as pool:
+    futures = [pool.submit(function, *arguments) for function, arguments in plots]
+    # Raise any exception from worker
+    for future in futures:
+      future.result()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+# Convert binary temperature data log produced by control_temp.py (--logformat binary) to Excel-friendly CSV
+
+# SYNTAX: ./binlog_export.py <binary data log> [<output CSV>]
+
+# EXAMPLE CALLS
+# ./binlog_export.py /var/log/temperature-controller/temperature_data.bin
+# ./binlog_export.py /var/log/temperature-controller/temperature_data.bin /tmp/temperature_data.csv
+
+# INPUTS
+# <binary data log> must be specified - full path and filename of binary data log
+# If <output CSV> is not specified, CSV is written to STDOUT
+
+# OUTPUTS
+# CSV in same format as CSV data log written by control_temp.py - header with channel labels, Excel-friendly UTC timestamps,
+# setpoint, temperature of every channel (empty if sensor read failed) and demand status
+# Note values are stored as float32 in binary log, so are rounded to 3 d.p. (1-wire sensor resolution is 0.001 C) to match CSV data log
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import sys
+import os
+import math
+from time import gmtime, strftime
+import data_log
+
+# Allow all group users to write to files created by this script
+oldmask = os.umask(0o002)
+
+# Format float32 value as written to CSV data log - empty if failed sensor read
+def format_value(value):
+  if math.isnan(value):
+    return ""
+  return str(round(value, 3))
+
+if len(sys.argv) < 2:
+  print("ERROR: binary data log must be specified - SYNTAX: ./binlog_export.py <binary data log> [<output CSV>]", file=sys.stderr)
+  os.umask(oldmask)
+  sys.exit(1)
+
+try:
+  labels, records = data_log.read_binary_log(sys.argv[1])
+except (OSError, ValueError) as e:
+  print("ERROR: Cannot read binary data log "+sys.argv[1]+" - "+str(e), file=sys.stderr)
+  os.umask(oldmask)
+  sys.exit(1)
+
+if len(sys.argv) > 2:
+  out = open(sys.argv[2], 'w')
+else:
+  out = sys.stdout
+
+CSV_header = "Timestamp,Setpoint (C),"
+for label in labels:
+  CSV_header += label+" Temperature (C),"
+CSV_header += "Demand Status (0/1)\n"
+out.write(CSV_header)
+for timestamp, setpoint, temps, demand in records:
+  if demand == data_log.BINARY_UNKNOWN_DEMAND:
+    demand = None
+  out.write("%s,%s,%s,%s\n" % (strftime("%Y-%m-%d %H:%M:%S", gmtime(timestamp)), format_value(setpoint), ','.join(map(format_value, temps)), demand))
+
+if out != sys.stdout:
+  out.close()
+# Put back umask
+os.umask(oldmask)
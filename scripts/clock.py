@@ -0,0 +1,88 @@
+# Time source for temperature controller - used by control_temp.py and data_log.py, so the control loop can be run against simulated time
+
+# SYNTAX: import clock
+#         clock.time() / clock.monotonic() / clock.sleep(<seconds>)
+#         clock.use(<clock object>)
+
+# EXAMPLE CALLS
+# timestamp = clock.time()
+# clock.sleep(10)
+# clock.use(clock.SimulatedClock(1577836800, stop=1577923200))
+
+# INPUTS
+# <clock object> any object with time(), monotonic() and sleep(seconds) methods - replaces system clock for all users of this module
+# SimulatedClock(<start>, [<stop>, <listener>]) starts at <start> (unix timestamp).  sleep() returns immediately, advancing simulated time
+# <listener> is called with (previous time, new time) every time simulated time advances (e.g. to step a plant model)
+# If <stop> is given, sleep() raises KeyboardInterrupt once simulated time reaches <stop> (as if controller was stopped with Ctrl-C)
+
+# OUTPUTS
+# time() - unix timestamp (s), monotonic() - seconds from arbitrary start which never goes backwards, sleep() - wait (or advance simulated time)
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import time as _time
+
+# Real time
+class SystemClock:
+  def time(self):
+    return _time.time()
+
+  def monotonic(self):
+    return _time.monotonic()
+
+  def sleep(self, seconds):
+    _time.sleep(seconds)
+
+# Simulated time - only moves forward when sleep() is called
+class SimulatedClock:
+  def __init__(self, start, stop=None, listener=None):
+    self.start = start
+    self.now = start
+    self.stop = stop
+    self.listener = listener
+
+  def time(self):
+    return self.now
+
+  def monotonic(self):
+    return self.now - self.start
+
+  def sleep(self, seconds):
+    previous = self.now
+    self.now += max(0, seconds)
+    if self.listener:
+      self.listener(previous, self.now)
+    if self.stop != None and self.now >= self.stop:
+      raise KeyboardInterrupt
+
+_clock = SystemClock()
+
+# Replace clock used by all users of this module
+def use(clock):
+  global _clock
+  _clock = clock
+
+def time():
+  return _clock.time()
+
+def monotonic():
+  return _clock.monotonic()
+
+def sleep(seconds):
+  _clock.sleep(seconds)
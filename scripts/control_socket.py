@@ -0,0 +1,132 @@
+# Local control socket for temperature controller - control_temp.py serves requests on a UNIX domain socket, controller_ctl.py sends them
+
+# SYNTAX: import control_socket
+#         server = control_socket.ControlServer(<socket path>, <handlers>)
+#         response = control_socket.request(<socket path>, <request>)
+
+# EXAMPLE CALLS
+# server = control_socket.ControlServer("/run/temperature-controller/controller.sock", {"get": get_status, "set": set_setpoint})
+# server.close()
+# response = control_socket.request("/run/temperature-controller/controller.sock", {"command": "set", "setpoint": 20.5})
+
+# INPUTS
+# <socket path> filename of UNIX domain socket - a stale socket left by a controller which has exited is replaced, but if another controller is
+#   still serving on the socket ControlServer raises OSError (errno.EADDRINUSE)
+# <handlers> dictionary of command name: function - each function is called with the request (dictionary) and returns the response (dictionary)
+#   and may raise ValueError if the request is invalid.  Handlers run in a server thread, not the thread that created the server
+# <request> dictionary with at least "command" - e.g. {"command": "get"} or {"command": "set", "setpoint": 20.5, "channel": "Fermenter"}
+
+# OUTPUTS
+# Protocol - each connection carries one request and one response, each a single line of JSON.  Successful responses have "ok": true and the
+#   fields returned by the handler, failed requests {"ok": false, "error": <message>}
+# request() returns response dictionary - raises OSError if no controller is listening on socket (or it does not respond within timeout), or
+#   ValueError if response is not valid
+# Socket file permissions follow umask, so with controller umask 002 any user in controller group can connect
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import stat
+import errno
+import socket
+import threading
+import socketserver
+
+# Socket used by controller_ctl.py if none is given (CONTROL_SOCKET in default config)
+DEFAULT_SOCKET = "/run/temperature-controller/controller.sock"
+# Longest request accepted - requests are a few tens of bytes
+MAX_REQUEST = 65536
+# Time a client may take to send its request, so a stalled client cannot hold a server thread
+CLIENT_TIMEOUT = 5
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  daemon_threads = True
+
+class _Handler(socketserver.StreamRequestHandler):
+  timeout = CLIENT_TIMEOUT
+
+  def handle(self):
+    try:
+      line = self.rfile.readline(MAX_REQUEST)
+    except OSError:
+      return
+    try:
+      request = json.loads(line.decode())
+      if not isinstance(request, dict):
+        raise ValueError("Request must be a JSON object")
+      handler = self.server.handlers.get(request.get("command"))
+      if handler == None:
+        raise ValueError("Unknown command "+str(request.get("command"))+" - must be one of "+', '.join(sorted(self.server.handlers)))
+      response = {"ok": True}
+      response.update(handler(request))
+    except (ValueError, UnicodeDecodeError) as e:
+      response = {"ok": False, "error": str(e)}
+    try:
+      self.wfile.write((json.dumps(response)+"\n").encode())
+    except OSError:
+      pass
+
+class ControlServer:
+  def __init__(self, path, handlers):
+    self.path = path
+    _remove_stale_socket(path)
+    self.server = _Server(path, _Handler)
+    self.server.handlers = handlers
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+  # Stop serving and remove socket file
+  def close(self):
+    self.server.shutdown()
+    self.server.server_close()
+    try:
+      os.remove(self.path)
+    except OSError:
+      pass
+
+# Remove socket file left by a controller which has exited - raises OSError if a controller is still listening on it
+def _remove_stale_socket(path):
+  try:
+    if not stat.S_ISSOCK(os.stat(path).st_mode):
+      raise OSError(errno.EEXIST, "Not a socket", path)
+  except FileNotFoundError:
+    return
+  try:
+    request(path, {"command": "get"}, timeout=1)
+  except (OSError, ValueError):
+    os.remove(path)
+    return
+  raise OSError(errno.EADDRINUSE, "Another controller is serving on socket", path)
+
+# Send request to controller and return response
+def request(path, request, timeout=5):
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+    sock.settimeout(timeout)
+    sock.connect(path)
+    sock.sendall((json.dumps(request)+"\n").encode())
+    response = b""
+    while not response.endswith(b"\n"):
+      data = sock.recv(MAX_REQUEST)
+      if not data:
+        break
+      response += data
+  response = json.loads(response.decode())
+  if not isinstance(response, dict) or "ok" not in response:
+    raise ValueError("Invalid response from controller")
+  return response
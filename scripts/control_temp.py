@@ -3,31 +3,92 @@
 # Simple binary temperature controller for Raspberry Pi and 1-wire sensors with logging of control and data
 
 # SYNTAX: ./control_temp.py <Setpoint> [<optional arguments...>]
+#         ./control_temp.py --channels <channel definition file> [<optional arguments...>]
 
 # EXAMPLE CALLS
 # ./control_temp.py 27
 # ./control_temp.py setpoint --verbose --logfile mylog.csv -s 28-0300a2796e9e 28-0300a279f011 -n "Channel 1" "Channel 2" -i 10 -t 0.2 -m /var/log/temperature-controller/control_temp.log
+# ./control_temp.py setpoint -s 28-0300a2796e9e 28-0300a279f011 28-0300a279f022 -i 10 --sweep threaded --readtimeout 2
+# ./control_temp.py --channels /etc/controller-channels.conf -i 10 --sweep threaded
+# ./control_temp.py /etc/controller-setpoints/setpoint --schedule /etc/controller-setpoints/schedule -i 10
 
 # INPUTS:
-# <Setpoint> must be specified - may be either a Temperature in (C) or a string containing path to a file containing this value
+# <Setpoint> must be specified (unless --channels or --schedule is used) - may be either a Temperature in (C) or a string containing path to a file containing this value
 # All other input arguments are optional
 # ./control_temp.py -h for a list of supported input arguments
 
 # OUTPUTS:
 # Demand signal will be set on selected GPIO pin
 # Timestamped logfile with setpoint, all measured temperature(s) and demand status.  Default is Excel friendly CSV with optionally user specified channel labels in header
+#   or with --logformat binary a compact fixed size record format (see data_log.py) which can be converted back to CSV with binlog_export.py
 # All changes in status to STDOUT, and if specified also to controller logfile
 # Note: The controller logfile can be analysed with controller_analyse.py to create daily plots of demand/stats
 # Note: messages to controller log/STDOUT are tagged with WARNING:/ERROR: for non-critical/critical exceptions respectively, and DEBUG: for additional messages in --verbose mode
 
 # If multiple temperature sensors (--sensorid) are specified, the first sensor in the list will always be used for control, but all will be read and logged
+# The control sensor is always read first and the control decision made before the remaining (logging only) sensors are collected
+# --sweep selects how sensors are read each cycle: 'serial' (default) reads one after another, 'threaded' starts all reads at once in separate reader threads,
+#   'bulk' uses the w1_therm therm_bulk_read trigger to convert all sensors simultaneously then reads back results.  In 'threaded' mode any sensor
+#   not returning a value within --readtimeout seconds is logged as empty without stalling the cycle, in 'bulk' mode the conversion is abandoned after --readtimeout
+# DS18B20 conversion takes 94, 188, 375 or 750 ms at 9, 10, 11 or 12 bit resolution - --resolution sets resolution of each sensor (w1_therm 'resolution'
+#   attribute - kept by the sensor until power-off, so read at start, set if different and restored on exit), e.g. lower for logging-only sensors.
+#   With --adaptive the control sensor is read at 9 bit (0.5 C) while its
+#   last reading is more than the given margin outside the hysteresis band of every channel it controls, and --logevery reads logging-only sensors
+#   every N cycles (last reading is logged in between).  Estimated bus time spent converting and saved each cycle (compared with a 12 bit read of
+#   every sensor) is recorded in metrics and status snapshot
 # If labels (--label) are also specified, the number of labels specified must match the number of sensors (--sensorid)
-# For multi-channel temperature control (multiple outputs), run a separate instance of this script for each channel, specifying appropriate temperature sensor input and GPIO output, logfile, optionally channel name, etc for each channel
+# After the demand signal of a channel is switched, the controller waits (up to --feedbacktimeout) for the feedback GPIO to follow, using edge events
+#   on the feedback input (polling its value if the pin has no edge interrupt) - the relay switching time and contact bounces are logged and recorded
+#   in metrics.  Cycles where nothing switched read feedback once without waiting
+# In continuous mode, changes to a setpoint file are applied at the start of the next cycle (logged as "Setpoint: <value>") and SIGHUP reloads configuration
+#   (channel definition file in multi-channel mode) without restarting the controller - if the new configuration is invalid the current configuration is kept
+# With --schedule the setpoint follows a weekly setpoint schedule (see setpoint_schedule.py and config/schedule.conf) - the schedule is compiled once at
+#   start (and on SIGHUP) and the scheduled setpoint looked up each cycle, with changes logged as "Setpoint: <value>".  A setpoint set by hand (setpoint
+#   file or control socket) is kept until the next scheduled change - i.e. until the target setpoint of the rule in force changes, so steps of a ramp
+#   do not replace it
+# For multi-channel temperature control (multiple outputs), either run a separate instance of this script for each channel, specifying appropriate temperature sensor input and GPIO output, logfile, optionally channel name, etc for each channel
+# or (preferred) give a channel definition file with --channels - a single process then reads every sensor on the bus once per cycle and runs the control logic for all channels against those readings
+# Channel definition file is INI format, with one [section] per channel (section name is channel name) and optional [DEFAULT] section with values applied to all channels.  Keys per channel:
+#   setpoint (required unless schedule is given), logfile (required, unique), sensorid, label, gpioout (required, unique), gpiofeedback, hysteresis, cooler,
+#   messagelog, schedule, resolution
+#   with same meaning as the equivalent command line arguments - multiple sensor IDs / labels are separated by spaces, with labels containing spaces in quotes
+#   See config/channels.conf for an example
+# In continuous mode cycles start on a fixed time grid (multiples of --interval in unix time, timed with monotonic clock) whatever time each cycle takes,
+#   so data logs are evenly spaced and controllers with same interval sample at the same times.  A cycle taking longer than --interval is logged
+#   as a WARNING, and with --overrun the missed cycles are either skipped (default) or coalesced into one cycle started immediately (see cycle_scheduler.py)
+# Timing of each cycle (sensor read time and retries, GPIO write/read back time, feedback mismatches, data log write time, total cycle time and lag behind
+#   schedule) is recorded in histograms and counters, exported in Prometheus text format with --metricsfile (e.g. to node_exporter textfile collector
+#   directory - rewritten every cycle, so best kept on tmpfs) and/or --metricsport (HTTP endpoint, see controller_metrics.py)
+# In continuous mode with --socket, the controller serves requests on a UNIX domain socket (see control_socket.py / controller_ctl.py) - 'get' returns
+#   the latest readings, setpoint and demand of every channel and timing of last cycle without reading sensors again, 'set' applies a new setpoint
+#   immediately (and writes it to the setpoint file, if setpoint is a file)
+# With --statusfile a JSON snapshot of the controller state (the same as returned by 'get' on the control socket) is written after every cycle, replacing
+#   the previous snapshot atomically - per channel the latest reading and read time of every sensor, setpoint, demand, feedback and last error/warning,
+#   and timing of the cycle.  Other programs can poll it at any rate without reading the 1-wire bus or parsing logs (check "pid" is still running)
+# Messages are written to controller log(s) by a background thread from a bounded queue, with each log kept open (re-opened if rotated) - all queued
+#   messages are written before the controller exits (see message_log.py)
+# --sysroot runs the controller against a sysfs tree under another directory (e.g. simulated sensors and GPIO made by benchmarks/thermal_plant.py) - all timing
+#   (timestamps, cycle sleeps) is taken from clock.py, so benchmarks/simulate_controller.py can run the control loop over days of simulated time in seconds
 
 # CHANGELOG
 # 11/2014 - First Version
 # 06/2020 - Removed hard-coded inputs and changed to arguments, changed default logging to CSV, added python3 compatibility, added optional continuous mode with configurable cycle interval, added support for multiple temperature sensors, added support for coolers
 # 01/2021 - Workaround for kernel v5.10 w1 read issues - retry read from 1-wire sensor if empty response
+# 10/2026 - Added concurrent sensor sweep modes (threaded / bulk read), control sensor read first with per-sensor read timeout
+# 10/2026 - Added multi-channel mode - multiple output channels controlled by single process sharing one sensor sweep per cycle
+# 10/2026 - GPIO access through pluggable backends (gpio_backend.py) - persistent sysfs file descriptors, optional libgpiod, fake pins for testing
+# 10/2026 - Setpoint file changes applied live each cycle, and configuration reloaded on SIGHUP, without restarting controller
+# 10/2026 - Data logs kept open with buffered writes (data_log.py) - configurable flush / fsync policy, re-opened after logrotate
+# 10/2026 - Added optional compact binary data log format (--logformat binary)
+# 10/2026 - Added --sysroot to run against simulated sysfs tree, time taken from clock.py so control loop can be run in simulated time
+# 10/2026 - Cycles scheduled on fixed deadlines (cycle_scheduler.py) instead of sleeping for interval after each cycle, added --overrun
+# 10/2026 - Added timing metrics of each cycle, exported in Prometheus text format with --metricsfile / --metricsport
+# 10/2026 - Added control socket (--socket) serving latest readings and live setpoint changes
+# 10/2026 - Added status snapshot file (--statusfile) written after every cycle
+# 10/2026 - Controller log written asynchronously from queue by message_log.py, instead of re-opening log for every message
+# 10/2026 - Added weekly setpoint schedule (--schedule) applied by controller each cycle, replacing cron setpoint changes
+# 10/2026 - Feedback confirmed with GPIO edge events after a switch (--feedbacktimeout) instead of fixed 0.1 s sleep every cycle, relay switching time logged
+# 10/2026 - Added per-sensor resolution (--resolution), adaptive control sensor resolution (--adaptive) and reduced logging sensor read rate (--logevery)
 
 # Copyright (C) 2014, 2020-21 Aaron Lockton
 
@@ -47,82 +108,172 @@
 import sys
 import os
 import glob
-from time import sleep, gmtime, strftime, time
+import errno
+from time import gmtime, strftime
 import argparse
+import json
+import threading
+import configparser
+import shlex
+import signal
+import gpio_backend
+import data_log
+import clock
+import cycle_scheduler
+import controller_metrics
+import control_socket
+import message_log
+import setpoint_schedule
 
 # Allow all group users to write to files created by this script
 oldmask = os.umask(0o002)
 
-# Exit if an error occurs, attempt to switch off demand signal
+# DS18B20 conversion time (s) at each resolution (bits) - sensors without resolution attribute (older kernels) are assumed to be at 12 bit (power-on default)
+CONVERSION_TIME = {9: 0.09375, 10: 0.1875, 11: 0.375, 12: 0.75}
+# Resolution of control sensor while far from hysteresis band with --adaptive (0.5 C steps)
+ADAPTIVE_RESOLUTION = 9
+
+# Outputs of all channels, switched off if an error occurs - populated as soon as outputs are known since used in all error handling
+gpio_outputs = []
+
+# Timing of each part of control cycle - always collected, exported with --metricsfile / --metricsport
+metrics = controller_metrics.Registry()
+sensor_read_time = metrics.histogram("sensor_read_seconds", "Time to read 1-wire sensor, including retry", [0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 5], ["sensor"])
+sensor_retries = metrics.counter("sensor_read_retries_total", "Sensor reads retried after failed first attempt", ["sensor"])
+sensor_failures = metrics.counter("sensor_read_failures_total", "Sensor reads failed or timed out", ["sensor"])
+gpio_write_time = metrics.histogram("gpio_write_seconds", "Time to set GPIO output", [0.00001, 0.0001, 0.001, 0.01, 0.1], ["gpio"])
+gpio_read_time = metrics.histogram("gpio_read_seconds", "Time to read back GPIO", [0.00001, 0.0001, 0.001, 0.01, 0.1], ["gpio"])
+feedback_mismatches = metrics.counter("feedback_mismatch_total", "Cycles where feedback GPIO did not match requested demand", ["channel"])
+relay_switch_time = metrics.histogram("relay_switch_seconds", "Time from setting demand output until feedback GPIO settled", [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5], ["channel"])
+conversion_time = metrics.counter("sensor_conversion_seconds_total", "Estimated 1-wire bus time converting temperatures, from resolution of sensors read")
+conversion_saved = metrics.counter("sensor_conversion_saved_seconds_total", "Estimated 1-wire bus time saved by lower resolution and skipped reads, compared with 12 bit read of every sensor")
+relay_bounces = metrics.counter("relay_bounces_total", "Extra feedback GPIO edges (contact bounce) seen while relay switched", ["channel"])
+log_write_time = metrics.histogram("data_log_write_seconds", "Time to write row to data log", [0.0001, 0.001, 0.01, 0.1, 1], ["channel"])
+cycle_time = metrics.histogram("cycle_seconds", "Time taken by control cycle", [0.1, 0.25, 0.5, 1, 2, 5, 10, 30])
+schedule_lag = metrics.histogram("schedule_lag_seconds", "Time control cycle started after its scheduled time", [0.001, 0.01, 0.1, 1, 10])
+cycle_overruns = metrics.counter("cycle_overruns_total", "Control cycles taking longer than interval")
+cycles_skipped = metrics.counter("cycles_skipped_total", "Scheduled control cycles missed due to overrun")
+
+# Controller message logs are written by a background thread, so a slow SD card cannot delay control decisions
+message_logger = message_log.MessageLogger()
+
+# Control socket server (continuous mode with --socket) - setpoint changes from socket and setpoint file are applied under lock
+control_server = None
+setpoint_lock = threading.Lock()
+# Timing of last completed cycle and last error/warning not specific to a channel - included in status snapshot
+cycle_stats = {}
+# Resolution and last reading of every sensor - kept when configuration is reloaded
+sensor_states = {}
+last_error = None
+shut_down = False
+
+# Exit if an error occurs, attempt to switch off demand signal of all channels
 def exit_on_error():
-  set_gpio(gpio_output,"0")
+  for gpio_output in gpio_outputs:
+    set_gpio(gpio_output,"0")
+  shutdown()
+  sys.exit(1)
+
+# Put back sensor resolutions, write buffered data and messages and close logs and control socket before exit - only runs once, as also called
+# from finally of main loop.  Not called from SIGTERM handler, since closing message logger waits on its queue (deadlock if signal arrives while
+# main thread is putting a message)
+def shutdown():
+  global shut_down
+  if shut_down:
+    return
+  shut_down = True
+  # Do not interrupt shutdown with repeated SIGTERM
+  signal.signal(signal.SIGTERM, signal.SIG_IGN)
+  restore_resolutions()
+  close_data_logs(channels)
+  close_control_socket()
+  # Ensure all messages (including switch off) are written before exit
+  message_logger.close()
   # Put back umask
   os.umask(oldmask)
-  sys.exit(1)
 
-# Format and print/log message
-def format_print(message,verbose=None):
+# Format and print/log message - if channel is given message relates to that channel only, otherwise to all channels
+def format_print(message,verbose=None,channel=None):
   if not verbose:
     # Messages always printed - status changes, ERROR/WARNING
-    message_print=("%s: %s" % (strftime("%Y-%m-%d-%H:%M:%S", gmtime()), message))
+    message_print=("%s: %s" % (message_log.timestamp(clock.time()), message))
   elif args.verbose:
     # Only print DEBUG messages in verbose mode
-    message_print=("%s: DEBUG: %s" % (strftime("%Y-%m-%d-%H:%M:%S", gmtime()), message))
+    message_print=("%s: DEBUG: %s" % (message_log.timestamp(clock.time()), message))
   else:
     # Ignore DEBUG messages unless in verbose mode
     return 0
-  print(message_print)
-  # Optionally write all messages to file as well as STDOUT
-  if args.messagelog:
-    try:
-      with open(args.messagelog, 'a') as f:
-        f.write(message_print+"\n")
-    except:
-      print("%s: WARNING: Cannot write to specified logfile %s - check correct path/filename and permissions" % (strftime("%Y-%m-%d-%H:%M:%S", gmtime()), args.messagelog))
+  if message.startswith("ERROR:") or message.startswith("WARNING:"):
+    record_error(message, channel)
+  if channel and args.channels:
+    # In multi-channel mode identify channel on STDOUT - channel message logs are kept in same format as single channel for controller_analyse.py
+    print("%s: [%s] %s" % (message_print[0:19], channel["name"], message_print[21:]))
+  else:
+    print(message_print)
+  # Optionally write all messages to file as well as STDOUT - queued and written in background
+  message_logger.write(message_logs(channel), message_print+"\n")
 
-# Configure GPIO specified and set direction specified, if not already configured
+# Record last error/warning of channel (or of controller if not channel specific) for status snapshot
+def record_error(message, channel=None):
+  global last_error
+  error = {"time": clock.time(), "message": message}
+  if channel:
+    channel["last_error"] = error
+  else:
+    last_error = error
+
+# List of message logs a message is written to - channel log for channel messages, or all logs for general messages
+def message_logs(channel=None):
+  if channel:
+    messagelogs = [channel["messagelog"]]
+  else:
+    messagelogs = [args.messagelog] + [channel["messagelog"] for channel in channels]
+  # Remove unset and duplicate logs, preserving order
+  return [messagelog for ii, messagelog in enumerate(messagelogs) if messagelog and messagelog not in messagelogs[:ii]]
+
+# Configure GPIO specified and set direction specified, if not already configured - raises ValueError if GPIO cannot be configured
 def configure_gpio(gpionum,direction):
   if direction != "in" and direction != "out":
     return None
   gpionum = str(gpionum)
   # Export GPIO to allow it to be used
-  if not os.path.exists('/sys/class/gpio/gpio'+gpionum+'/'):
+  if not gpio.exported(gpionum):
     format_print("GPIO "+gpionum+" is not configured - exporting", "verbose")
-    export_status = os.WEXITSTATUS(os.system('echo '+gpionum+' > /sys/class/gpio/export 2>/dev/null'))
+    export_status = gpio.export(gpionum)
     if export_status != 0:
-      format_print("ERROR: Cannot configure GPIO "+gpionum+" is this a valid GPIO number?")
-      # If error occurs, still attempt to switch off - GPIO out may already be configured if failure is setting GPIO feedback
-      exit_on_error()
+      raise ValueError("Cannot configure GPIO "+gpionum+" is this a valid GPIO number? ("+os.strerror(export_status)+")")
   # Set GPIO direction
-  with open('/sys/class/gpio/gpio'+gpionum+'/direction', 'r') as f:
-    current_direction = f.readline().rstrip()
-    format_print("Current GPIO "+gpionum+" setting: " + current_direction, "verbose")
+  current_direction = gpio.get_direction(gpionum)
+  format_print("Current GPIO "+gpionum+" setting: " + str(current_direction), "verbose")
   if current_direction != direction:
-    # If direction is not correct, may have only just been exported, need delay to prevent failure due to first-run permissions issue in Raspbian
-    sleep(1)
+    if args.gpiobackend == "sysfs":
+      # If direction is not correct, may have only just been exported, need delay to prevent failure due to first-run permissions issue in Raspbian
+      clock.sleep(1)
     format_print("Setting GPIO "+gpionum+" direction to "+direction, "verbose")
-    direction_status = os.WEXITSTATUS(os.system('echo '+direction+' > /sys/class/gpio/gpio'+gpionum+'/direction 2>/dev/null'))
+    direction_status = gpio.set_direction(gpionum, direction)
     if direction_status != 0:
-      format_print("ERROR: Cannot set direction of GPIO "+gpionum)
-      # If error occurs, still attempt to switch off - GPIO out may already be configured if failure is setting GPIO feedback
-      exit_on_error()
+      raise ValueError("Cannot set direction of GPIO "+gpionum+" ("+os.strerror(direction_status)+")")
 
-# Read GPIO value from specified GPIO
+# Read GPIO value from specified GPIO - returns None on error
 def get_gpio(gpionum):
-  gpionum = str(gpionum)
-  with open('/sys/class/gpio/gpio'+gpionum+'/value', 'r') as f:
-    status = int(f.readline())
-    return status
+  start = controller_metrics.timer()
+  status = gpio.get(gpionum)
+  gpio_read_time.observe(controller_metrics.timer() - start, gpio=gpionum)
+  if status == None:
+    format_print("ERROR: Cannot read GPIO "+str(gpionum)+" - check GPIO is exported and user has permissions (in gpio group)")
+  return status
 
-# Set specified GPIO to specified value
+# Set specified GPIO to specified value - returns 0 on success or error code
 def set_gpio(gpionum,value):
   gpionum = str(gpionum)
   if value != "0" and value != "1":
     return None
-  try:
-    os.system('echo '+value+' > /sys/class/gpio/gpio'+gpionum+'/value')
-  except:
-    format_print("ERROR: Failed to set GPIO "+gpionum+" to value "+value+" - check GPIO is exported and user has permissions (in gpio group)")
+  start = controller_metrics.timer()
+  set_status = gpio.set(gpionum, value)
+  gpio_write_time.observe(controller_metrics.timer() - start, gpio=gpionum)
+  if set_status != 0:
+    format_print("ERROR: Failed to set GPIO "+gpionum+" to value "+value+" - check GPIO is exported and user has permissions (in gpio group) ("+os.strerror(set_status)+")")
+  return set_status
 
 # Read temperature from 1-wire sensor on GPIO7 -returns None on error, or the temperature as a float
 def get_temp(devicefile):
@@ -152,10 +303,587 @@ def get_temp(devicefile):
   else:
     return None
 
+# Write any buffered data log rows and close data logs of channels
+def close_data_logs(channels):
+  for channel in channels:
+    try:
+      channel["writer"].close()
+    except OSError:
+      format_print("WARNING: Cannot write buffered data to logfile "+channel["logfile"]+" - data lost", channel=channel)
+
+# Signal handler for SIGTERM (e.g. systemctl stop/restart) - exit main loop, data logs are flushed by shutdown() in its finally
+# Note demand is deliberately not switched off, to prevent brief dropout in demand on restart
+def terminate(signum, frame):
+  sys.exit(0)
+
+# Read setpoint - either a temperature in (C) or path to file containing setpoint - returns None if not valid
+def read_setpoint(setarg):
+  try:
+    # If we can convert to float use directly...
+    return float(setarg)
+  except:
+    # ...Otherwise assume it is path of setpoint file
+    try:
+      with open(setarg, 'r') as f:
+        return float(f.readline())
+    except:
+      return None
+
+# Get modification signature of setpoint file (None if setpoint is not a file) - used to detect setpoint changes with a single stat() per cycle
+def setpoint_signature(setarg):
+  if setarg == None:
+    return None
+  try:
+    float(setarg)
+    return None
+  except ValueError:
+    try:
+      stat = os.stat(setarg)
+      return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    except OSError:
+      return ()
+
+# Check setpoint file of channel for changes and apply new setpoint without restarting - if force is set always re-read
+def check_setpoint(channel, force=False):
+  with setpoint_lock:
+    signature = setpoint_signature(channel["setarg"])
+    if signature == None or (signature == channel["setpoint_signature"] and not force):
+      return
+    channel["setpoint_signature"] = signature
+    new_setpoint = read_setpoint(channel["setarg"])
+    if new_setpoint == None:
+      format_print("WARNING: "+channel["setarg"]+" cannot be found/opened or does not contain a valid setpoint - keeping setpoint "+str(channel["setpoint"]), channel=channel)
+    elif new_setpoint != channel["setpoint"]:
+      channel["setpoint"] = new_setpoint
+      # Same form as setpoint changes logged by settemp
+      format_print("Setpoint: "+str(new_setpoint), channel=channel)
+
+# Apply scheduled setpoint of channel (if it has a schedule) when it changes - a setpoint set by hand is kept until the next scheduled change
+# (change of target setpoint), so ramp steps are only applied while setpoint is still the last scheduled setpoint
+def check_schedule(channel):
+  if channel["schedule"] == None:
+    return
+  scheduled_setpoint, target = channel["schedule"].lookup(clock.time())
+  with setpoint_lock:
+    if target == channel["scheduled_target"] and (scheduled_setpoint == channel["scheduled_setpoint"] or channel["setpoint"] != channel["scheduled_setpoint"]):
+      return
+    channel["scheduled_setpoint"] = scheduled_setpoint
+    channel["scheduled_target"] = target
+    if scheduled_setpoint != channel["setpoint"]:
+      channel["setpoint"] = scheduled_setpoint
+      # Same form as setpoint changes logged by settemp
+      format_print("Setpoint: "+str(scheduled_setpoint), channel=channel)
+
+# Snapshot of controller state - latest readings, setpoint, demand, feedback and last error of every channel from last cycle, and cycle timing
+def status_snapshot():
+  return {"time": clock.time(), "pid": os.getpid(), "cycle": cycle_stats, "last_error": last_error,
+    "channels": [dict(channel.get("readings", {}), name=channel["name"], setpoint=channel["setpoint"], hysteresis=channel["hysteresis"],
+      cooler=channel["cooler"], gpio_output=channel["gpio_output"], gpio_feedback=channel["gpio_feedback"], scheduled_setpoint=channel["scheduled_setpoint"],
+      last_error=channel.get("last_error"))
+      for channel in channels]}
+
+# Readings of channel from this cycle for status snapshot - replaced (not modified) each cycle, since also read from control socket thread
+def channel_readings(channel, sweep, current_temps, demand, feedback):
+  return {"time": clock.time(), "control_temperature": current_temps[0] if current_temps[0] != "" else None, "demand": demand, "feedback": feedback,
+    "sensors": [{"id": temp_sensor, "label": label, "temperature": temp if temp != "" else None, "time": sweep["times"].get(temp_sensor),
+      "resolution": sensor_states[temp_sensor]["applied"] or 12}
+      for temp_sensor, label, temp in zip(channel["sensors"], channel["labels"], current_temps)]}
+
+# Write status snapshot to status file (if set) - replaced atomically, so readers never see a partly written file
+def publish_status():
+  if not args.statusfile:
+    return
+  temp_file = args.statusfile+".tmp"
+  try:
+    with open(temp_file, 'w') as f:
+      json.dump(status_snapshot(), f)
+    os.replace(temp_file, args.statusfile)
+  except OSError as e:
+    format_print("WARNING: Cannot write status file "+args.statusfile+" ("+str(e)+")")
+
+# Control socket "get" request - status snapshot (no sensors are read)
+def socket_get(request):
+  return status_snapshot()
+
+# Control socket "set" request - apply new setpoint to channel (may be omitted if only one channel) immediately, and write to setpoint file if
+# setpoint is given as a file so it is kept if the controller restarts
+def socket_set(request):
+  try:
+    new_setpoint = float(request.get("setpoint"))
+  except (TypeError, ValueError):
+    raise ValueError("Setpoint must be a number")
+  if new_setpoint != new_setpoint or new_setpoint in [float("inf"), float("-inf")]:
+    raise ValueError("Setpoint must be a number")
+  if request.get("channel") != None:
+    matches = [channel for channel in channels if channel["name"] == request.get("channel")]
+    if not matches:
+      raise ValueError("Unknown channel "+str(request.get("channel"))+" - channels are: "+', '.join([channel["name"] for channel in channels]))
+    channel = matches[0]
+  elif len(channels) == 1:
+    channel = channels[0]
+  else:
+    raise ValueError("Channel must be specified - channels are: "+', '.join([channel["name"] for channel in channels]))
+  with setpoint_lock:
+    persistent = channel["setpoint_signature"] != None
+    if persistent:
+      try:
+        with open(channel["setarg"], 'w') as f:
+          f.write(str(new_setpoint)+"\n")
+      except OSError as e:
+        raise ValueError("Cannot write setpoint file "+channel["setarg"]+" ("+str(e)+")")
+      channel["setpoint_signature"] = setpoint_signature(channel["setarg"])
+    if new_setpoint != channel["setpoint"]:
+      channel["setpoint"] = new_setpoint
+      # Same form as setpoint changes logged by settemp
+      format_print("Setpoint: "+str(new_setpoint), channel=channel)
+  return {"channel": channel["name"], "setpoint": new_setpoint, "persistent": persistent}
+
+# Stop serving control socket (if started) and remove socket file
+def close_control_socket():
+  if control_server:
+    control_server.close()
+
+# Find all temperature sensors on 1-wire bus - raises ValueError if none found
+def find_sensors():
+  # Find list of /sys/bus/w1/devices/28-*/w1_slave
+  sensor_list = glob.glob(os.path.join(args.sysroot, 'sys/devices/w1_bus_master1/28*/w1_slave'))
+  if not sensor_list:
+    raise ValueError("Cannot find any temperature sensors on 1-wire bus, ensure temperature sensor(s) are properly connected and 1-wire driver loaded")
+  return [os.path.basename(os.path.dirname(ele)) for ele in sensor_list]
+
+# Validate settings for a control channel and create channel dictionary - raises ValueError if settings are invalid
+def make_channel(name, setarg, hysteresis, cooler, sensorids, labels, gpio_output, gpio_feedback, logfile, messagelog, schedule_file=None, resolutions=None):
+  channel = {"name": name, "setarg": setarg, "hysteresis": hysteresis, "cooler": cooler, "gpio_output": gpio_output,
+    "logfile": logfile, "messagelog": messagelog, "schedule_file": schedule_file, "schedule": None, "scheduled_setpoint": None, "scheduled_target": None}
+
+  channel["setpoint_signature"] = setpoint_signature(setarg)
+  if schedule_file:
+    # Scheduled setpoint applies from start - setpoint file (if given) is only read again when it changes
+    channel["schedule"] = setpoint_schedule.load_schedule(schedule_file)
+    channel["scheduled_setpoint"], channel["scheduled_target"] = channel["schedule"].lookup(clock.time())
+    channel["setpoint"] = channel["scheduled_setpoint"]
+    format_print("Setpoint schedule "+schedule_file+": "+str(len(channel["schedule"].transitions))+" transition(s) per week, "+str(len(channel["schedule"].holidays))+" holiday(s)", "verbose", channel)
+  else:
+    channel["setpoint"] = read_setpoint(setarg)
+    if channel["setpoint"] == None:
+      raise ValueError(str(setarg)+" cannot be found/opened or does not contain a valid setpoint")
+
+  if hysteresis < 0:
+    raise ValueError("hysteresis cannot be negative!")
+
+  if sensorids:
+    # set temp_sensor(s) to specified list - handle errors later when list iterated
+    channel["sensors"] = sensorids
+  else:
+    channel["sensors"] = find_sensors()
+
+  if labels:
+    channel["labels"] = labels
+  else:
+    if len(channel["sensors"]) == 1:
+      channel["labels"] = ["Current"]
+    else:
+      channel["labels"] = channel["sensors"]
+
+  if len(channel["labels"]) != len(channel["sensors"]):
+    raise ValueError("Number of label(s) (--label) must match number of sensor(s) (--sensorid) if both arguments are specified")
+
+  # Resolution of each sensor - a single resolution applies to all sensors
+  if not resolutions:
+    resolutions = [12]
+  if len(resolutions) == 1:
+    resolutions = resolutions * len(channel["sensors"])
+  if len(resolutions) != len(channel["sensors"]):
+    raise ValueError("Number of resolution(s) (--resolution) must be one, or match number of sensor(s)")
+  if [bits for bits in resolutions if bits not in CONVERSION_TIME]:
+    raise ValueError("Sensor resolution must be one of "+', '.join(map(str, CONVERSION_TIME))+" bits")
+  channel["resolutions"] = resolutions
+
+  if gpio_feedback:
+    channel["gpio_feedback"] = gpio_feedback
+  else:
+    channel["gpio_feedback"] = gpio_output
+
+  format_print("Setpoint: "+str(channel["setpoint"])+"  Hysteresis: "+str(hysteresis)+"  Temperature sensor(s): "+','.join(channel["sensors"])+"  Channel label(s): "+','.join(channel["labels"]), "verbose", channel)
+
+  # Prepare CSV file header for data log
+  channel["CSV_header"] = "Timestamp,Setpoint (C),"
+  for temp_label in channel["labels"]:
+    channel["CSV_header"] += temp_label+" Temperature (C),"
+  channel["CSV_header"] += "Demand Status (0/1)\n"
+  format_print("CSV header: "+channel["CSV_header"], "verbose", channel)
+
+  # Data log is kept open and rows buffered according to flush settings - header only written to new/empty file
+  warn = lambda message: format_print(message, channel=channel)
+  if args.logformat == "legacy":
+    channel["writer"] = data_log.DataLogWriter(logfile, None, args.flushrows, args.flushinterval, args.fsync, warn=warn)
+  elif args.logformat == "binary":
+    channel["writer"] = data_log.DataLogWriter(logfile, data_log.binary_header(channel["labels"]), args.flushrows, args.flushinterval, args.fsync, binary=True,
+                                               warn=warn)
+  else:
+    channel["writer"] = data_log.DataLogWriter(logfile, channel["CSV_header"], args.flushrows, args.flushinterval, args.fsync, warn=warn)
+  return channel
+
+# Load channel definitions from INI-style channel definition file - raises ValueError if file is invalid
+# GPIO outputs of all channels are added to outputs list first, so they can be switched off even if a later channel is invalid
+def load_channels(channels_file, outputs):
+  config = configparser.ConfigParser(interpolation=None)
+  try:
+    with open(channels_file, 'r') as f:
+      config.read_file(f)
+  except (OSError, configparser.Error) as e:
+    raise ValueError("Cannot read channel definition file "+channels_file+" - "+str(e))
+  if not config.sections():
+    raise ValueError("No channels defined in channel definition file "+channels_file)
+  try:
+    for name in config.sections():
+      outputs.append(config.getint(name, 'gpioout'))
+  except (ValueError, configparser.Error) as e:
+    raise ValueError("Invalid or missing GPIO output (gpioout) in channel definition file - "+str(e))
+  if len(set(outputs)) != len(outputs):
+    raise ValueError("Each channel must use a different GPIO output (gpioout)")
+  loaded_channels = []
+  for name in config.sections():
+    section = config[name]
+    try:
+      if not (section.get('setpoint') or section.get('schedule')) or not section.get('logfile'):
+        raise ValueError("setpoint (or schedule) and logfile must be specified for every channel")
+      loaded_channels.append(make_channel(name, section.get('setpoint'), section.getfloat('hysteresis', 0.1), section.getboolean('cooler', False),
+        shlex.split(section.get('sensorid', '')), shlex.split(section.get('label', '')), section.getint('gpioout'), section.getint('gpiofeedback'),
+        section.get('logfile'), section.get('messagelog', args.messagelog), section.get('schedule'),
+        [int(bits) for bits in section.get('resolution', '').split()] or args.resolution))
+    except ValueError as e:
+      raise ValueError("Invalid settings for channel ["+name+"] in channel definition file - "+str(e))
+  logfiles = [channel["logfile"] for channel in loaded_channels]
+  if len(set(logfiles)) != len(logfiles):
+    raise ValueError("Each channel must use a different data logfile (logfile)")
+  return loaded_channels
+
+# Set up GPIOs for channel - raises ValueError if a GPIO cannot be configured
+def configure_channel(channel):
+  configure_gpio(channel["gpio_output"],"out")
+  if channel["gpio_output"] != channel["gpio_feedback"]:
+    configure_gpio(channel["gpio_feedback"],"in")
+    if args.gpiobackend == "fake":
+      # Simulate relay feedback contacts following output
+      gpio.link(channel["gpio_feedback"], channel["gpio_output"])
+    # Feedback is confirmed with edge events after a switch - otherwise polled
+    events_status = gpio.enable_events(channel["gpio_feedback"])
+    if events_status != 0:
+      format_print("WARNING: Cannot enable edge events on feedback GPIO "+str(channel["gpio_feedback"])+" - feedback will be polled after switching ("+os.strerror(events_status)+")", channel=channel)
+
+# List every sensor used by any channel - control sensors first so control decisions are not delayed by logging-only sensors
+def sweep_sensors(channels):
+  temp_sensors = []
+  for temp_sensor in [channel["sensors"][0] for channel in channels] + [temp_sensor for channel in channels for temp_sensor in channel["sensors"][1:]]:
+    if temp_sensor not in temp_sensors:
+      temp_sensors.append(temp_sensor)
+  return temp_sensors
+
+# Set resolution of sensors to resolution of any channel using them (highest if more than one) - sensor state is created for new sensors
+def update_sensor_states(channels):
+  resolutions = {}
+  for channel in channels:
+    for temp_sensor, bits in zip(channel["sensors"], channel["resolutions"]):
+      resolutions[temp_sensor] = max(bits, resolutions.get(temp_sensor, 0))
+  for temp_sensor, bits in resolutions.items():
+    # applied - current resolution of sensor (None until read at first sweep), writable - False once setting resolution has failed
+    sensor_states.setdefault(temp_sensor, {"applied": None, "writable": True, "temp": "", "time": None})["resolution"] = bits
+
+# Current resolution (bits) of sensor from w1_therm resolution attribute - returns None if it cannot be read
+def get_resolution(temp_sensor):
+  try:
+    with open(os.path.join(args.sysroot, 'sys/bus/w1/devices', temp_sensor, 'resolution'), 'r') as f:
+      return int(f.readline())
+  except (OSError, ValueError):
+    return None
+
+# Set resolution (bits) of sensor with w1_therm resolution attribute - returns 0 on success or error code
+def set_resolution(temp_sensor, bits):
+  try:
+    with open(os.path.join(args.sysroot, 'sys/bus/w1/devices', temp_sensor, 'resolution'), 'w') as f:
+      f.write(str(bits)+"\n")
+  except OSError as e:
+    return e.errno if e.errno else errno.EIO
+  return 0
+
+# Put back configured resolution of sensors lowered by --adaptive - called on exit, since sensor keeps resolution until power-off
+def restore_resolutions():
+  for temp_sensor, state in sensor_states.items():
+    if state["writable"] and state["applied"] != None and state["applied"] != state["resolution"]:
+      if set_resolution(temp_sensor, state["resolution"]) == 0:
+        state["applied"] = state["resolution"]
+
+# True if last reading of control sensor of channel is within --adaptive margin of hysteresis band (or there is no reading)
+# Readings at 9 bit are rounded down by up to 0.5 C - the margin is widened by this below the band, and above the band when changing to low
+# resolution, so resolution does not change every cycle
+def near_band(channel):
+  state = sensor_states[channel["sensors"][0]]
+  if state["temp"] == "":
+    return True
+  if channel["cooler"]:
+    low, high = channel["setpoint"], channel["setpoint"] + channel["hysteresis"]
+  else:
+    low, high = channel["setpoint"] - channel["hysteresis"], channel["setpoint"]
+  high_margin = args.adaptive if state["applied"] != None and state["applied"] <= ADAPTIVE_RESOLUTION else args.adaptive + 0.5
+  return low - args.adaptive - 0.5 <= state["temp"] <= high + high_margin
+
+# Choose sensors read this cycle and set their resolution - control sensors every cycle (at low resolution while far from hysteresis band with
+# --adaptive), logging-only sensors every --logevery cycles.  Returns list of sensors to read and estimated bus time converting them (s)
+def plan_sweep(cycle):
+  control_sensors = {}
+  for channel in channels:
+    control_sensors[channel["sensors"][0]] = control_sensors.get(channel["sensors"][0], False) or args.adaptive == None or near_band(channel)
+  read_sensors = []
+  conversion_times = []
+  for temp_sensor in temp_sensors:
+    if temp_sensor not in control_sensors and cycle % args.logevery != 0:
+      continue
+    state = sensor_states[temp_sensor]
+    bits = state["resolution"]
+    if control_sensors.get(temp_sensor) == False:
+      bits = min(bits, ADAPTIVE_RESOLUTION)
+    if state["applied"] == None:
+      # Resolution may have been left changed by a previous run (kept until sensor loses power)
+      state["applied"] = get_resolution(temp_sensor)
+      if state["applied"] not in CONVERSION_TIME:
+        state["applied"] = 12
+    if state["writable"] and bits != state["applied"]:
+      resolution_status = set_resolution(temp_sensor, bits)
+      if resolution_status == 0:
+        format_print("Sensor "+temp_sensor+" resolution set to "+str(bits)+" bit", "verbose")
+        state["applied"] = bits
+      else:
+        state["writable"] = False
+        format_print("WARNING: Cannot set resolution of sensor "+temp_sensor+" - reading at current resolution ("+os.strerror(resolution_status)+")")
+    read_sensors.append(temp_sensor)
+    conversion_times.append(CONVERSION_TIME[state["applied"]])
+  if args.sweep == "bulk":
+    # All sensors convert at once
+    return read_sensors, max(conversion_times, default=0)
+  return read_sensors, sum(conversion_times)
+
+# Reload configuration without restarting (SIGHUP) - channel definition file in multi-channel mode, otherwise setpoint and setpoint schedule
+# If the new configuration is invalid the current configuration is kept
+def reload_config():
+  global temp_sensors
+  format_print("Reloading configuration", "verbose")
+  if not args.channels:
+    for channel in channels:
+      check_setpoint(channel, force=True)
+      if channel["schedule_file"]:
+        try:
+          channel["schedule"] = setpoint_schedule.load_schedule(channel["schedule_file"])
+        except ValueError as e:
+          format_print("ERROR: "+str(e)+" - keeping current schedule", channel=channel)
+          continue
+        # Scheduled setpoint is applied again from next cycle, as at start
+        channel["scheduled_setpoint"] = channel["scheduled_target"] = None
+    return
+  # New configuration is validated and its GPIOs set up before any running channel is switched off or replaced
+  new_outputs = []
+  try:
+    new_channels = load_channels(args.channels, new_outputs)
+    for channel in new_channels:
+      configure_channel(channel)
+  except ValueError as e:
+    format_print("ERROR: "+str(e)+" - keeping current configuration")
+    return
+  for channel in channels:
+    if channel["gpio_output"] not in new_outputs:
+      # Note for controller analyse must contain exact string "Switching system off"
+      format_print("Channel removed from configuration - Switching system off", channel=channel)
+      set_gpio(channel["gpio_output"],"0")
+  close_data_logs(channels)
+  channels[:] = new_channels
+  gpio_outputs[:] = new_outputs
+  temp_sensors = sweep_sensors(channels)
+  update_sensor_states(channels)
+  format_print("Reloaded channel definition file "+args.channels+" - "+str(len(channels))+" channel(s)")
+
+# Signal handler for SIGHUP - configuration is reloaded at start of next cycle
+def request_reload(signum, frame):
+  global reload_requested
+  reload_requested = True
+
+# Read temperature from specified sensor ID, retrying once on empty response - returns None on error, or the temperature as a float
+def read_sensor(temp_sensor):
+  devicefile = os.path.join(args.sysroot, 'sys/bus/w1/devices', temp_sensor, 'w1_slave')
+  start = controller_metrics.timer()
+  tempvalue = get_temp(devicefile)
+  if tempvalue == None:
+    # Retry read - note kernel v5.10 frequently appears to give empty response on first attempt - workaround
+    sensor_retries.inc(sensor=temp_sensor)
+    tempvalue = get_temp(devicefile)
+  sensor_read_time.observe(controller_metrics.timer() - start, sensor=temp_sensor)
+  return tempvalue
+
+# Trigger simultaneous conversion on all sensors on bus and wait for completion - returns True if bulk conversion completed before timeout
+def bulk_convert(timeout):
+  bulk_file = os.path.join(args.sysroot, 'sys/bus/w1/devices/w1_bus_master1/therm_bulk_read')
+  try:
+    with open(bulk_file, 'w') as f:
+      f.write("trigger\n")
+  except:
+    return False
+  # therm_bulk_read reads -1 while conversion in progress, 1 when all sensors have converted and 0 if no bulk read pending
+  deadline = clock.time() + timeout
+  while clock.time() < deadline:
+    try:
+      with open(bulk_file, 'r') as f:
+        bulk_status = f.readline().strip()
+    except:
+      return False
+    if bulk_status != "-1":
+      return True
+    clock.sleep(0.05)
+  return False
+
+# Read sensor in a background (daemon) thread so a blocked read cannot stall the control cycle or prevent exit
+def start_read(temp_sensor):
+  read = {"done": threading.Event(), "value": None}
+  def read_worker():
+    read["value"] = read_sensor(temp_sensor)
+    read["done"].set()
+  threading.Thread(target=read_worker, daemon=True).start()
+  return read
+
+# Start reading all sensors in list for this cycle - returns sweep dictionary used to collect results with collect_temp()
+def start_sweep(temp_sensors):
+  sweep = {"deadline": clock.time() + args.readtimeout, "reads": {}, "temps": {}, "times": {}}
+  if args.sweep == "bulk":
+    if not bulk_convert(args.readtimeout):
+      format_print("WARNING: 1-wire bulk conversion failed or timed out - reading sensors individually")
+  elif args.sweep == "threaded":
+    # Control sensor is started first so it is first to start converting
+    for temp_sensor in temp_sensors:
+      previous_read = pending_reads.get(temp_sensor)
+      if previous_read and not previous_read["done"].is_set():
+        # Previous read of this sensor is still blocked - do not start another behind it
+        sweep["reads"][temp_sensor] = None
+      else:
+        pending_reads[temp_sensor] = start_read(temp_sensor)
+        sweep["reads"][temp_sensor] = pending_reads[temp_sensor]
+  return sweep
+
+# Collect temperature of a sensor from sweep - returns the temperature as a float or "" on error/timeout
+# Each sensor is only collected once per sweep, even if used by multiple channels
+def collect_temp(sweep, temp_sensor):
+  if temp_sensor not in sweep["temps"]:
+    sweep["temps"][temp_sensor] = read_sweep_sensor(sweep, temp_sensor)
+    sweep["times"][temp_sensor] = clock.time()
+    sensor_states[temp_sensor].update(temp=sweep["temps"][temp_sensor], time=sweep["times"][temp_sensor])
+  return sweep["temps"][temp_sensor]
+
+def read_sweep_sensor(sweep, temp_sensor):
+  if args.sweep == "threaded":
+    read = sweep["reads"].get(temp_sensor)
+    if read == None:
+      format_print("WARNING: Previous read of sensor "+temp_sensor+" has not completed - skipping this cycle")
+      sensor_failures.inc(sensor=temp_sensor)
+      return ""
+    if not read["done"].wait(max(0, sweep["deadline"] - clock.time())):
+      format_print("WARNING: Timed out after "+str(args.readtimeout)+" s reading sensor "+temp_sensor)
+      sensor_failures.inc(sensor=temp_sensor)
+      return ""
+    tempvalue = read["value"]
+  else:
+    tempvalue = read_sensor(temp_sensor)
+  if tempvalue == None:
+    format_print("WARNING: Cannot get current temperature from sensor "+temp_sensor+" - check 1-wire driver enabled, sensor is connected correctly and (if set) --sensorid is correct")
+    sensor_failures.inc(sensor=temp_sensor)
+    return ""
+  return tempvalue
+
+# Compare control temperature with setpoint of channel, and set heating/cooling demand signal accordingly - returns requested demand status
+def control_channel(channel, current_temp):
+  setpoint = channel["setpoint"]
+  hysteresis = channel["hysteresis"]
+  gpio_output = channel["gpio_output"]
+  # Note empirically switch on below setpoint and off at setpoint works best for many heating systems, since reaction to demand on tends to be faster than off
+  format_print("Comparing measured temperature and setpoint", "verbose", channel)
+  if channel["cooler"]:
+    # For cooler, switch on at hysteresis above setpoint and off at setpoint
+    above = (current_temp - hysteresis) > setpoint
+    below = current_temp < setpoint
+  else:
+    # For heater, switch on hysteresis below setpoint and off at setpoint
+    above = (current_temp + hysteresis) < setpoint
+    below = current_temp > setpoint
+  # If output cannot be read back, status is unknown and demand signal is always set
+  status = get_gpio(gpio_output)
+  # Time demand output was switched this cycle (None if not switched), so feedback is only waited for after a switch
+  channel["switched"] = None
+  if above:
+    format_print("Demand required, checking if system is on", "verbose", channel)
+    if status != 1:
+      # Note for controller analyse must contain exact string "Switching system on"
+      status_message=("Setpoint=%s, Actual=%s - Switching system on" % (setpoint, current_temp))
+      format_print(status_message, channel=channel)
+      if set_gpio(gpio_output,"1") == 0:
+        channel["switched"] = controller_metrics.timer()
+      status = 1
+  elif below:
+    format_print("Demand not required, checking if system is on", "verbose", channel)
+    if status != 0:
+      # Note for controller analyse must contain exact string "Switching system off"
+      status_message=("Setpoint=%s, Actual=%s - Switching system off" % (setpoint, current_temp))
+      format_print(status_message, channel=channel)
+      if set_gpio(gpio_output,"0") == 0:
+        channel["switched"] = controller_metrics.timer()
+      status = 0
+  else:
+    format_print("Temperature OK", "verbose", channel)
+    pass
+  return status
+
+# Read feedback GPIO of channel - if demand was switched this cycle, wait for feedback to settle at requested status (up to --feedbacktimeout from
+# switch) and log relay switching time and contact bounce.  Returns feedback status (None on error)
+def read_feedback(channel):
+  if channel["switched"] == None or channel["gpio_feedback"] == channel["gpio_output"]:
+    # Nothing switched this cycle, or output read back directly - no need to wait
+    return get_gpio(channel["gpio_feedback"])
+  waited = controller_metrics.timer() - channel["switched"]
+  result = gpio.wait_for(channel["gpio_feedback"], channel["status"], max(0, args.feedbacktimeout - waited))
+  if result == None:
+    return get_gpio(channel["gpio_feedback"])
+  switch_time, edges = result[0] + waited, result[1]
+  relay_switch_time.observe(switch_time, channel=channel["name"])
+  if edges > 1:
+    relay_bounces.inc(edges - 1, channel=channel["name"])
+  format_print("Feedback GPIO %s switched to %d in %.3f s (%d edge(s))" % (channel["gpio_feedback"], channel["status"], switch_time, edges), channel=channel)
+  return channel["status"]
+
+# Write temperature(s), setpoint and actual status of channel to its data log
+def write_data_log(channel, current_temps, actual_status):
+  start = controller_metrics.timer()
+  try:
+    # Write temperature, setpoint and actual status to log - Note all all timestamps in UTC
+    if args.logformat == "legacy":
+      # Backwards compatibilty - Use previous message-style log - note does not support multiple temperature sensors
+      channel["writer"].write("%s %d Setpoint: %s Actual: %s Status: %s \n" % (strftime("%Y-%m-%d-%H-%M-%S", gmtime(clock.time())), clock.time(), channel["setpoint"], current_temps[0], actual_status))
+    elif args.logformat == "binary":
+      # Compact binary record - note all channels as float32, failed sensor reads as NaN
+      channel["writer"].write(data_log.binary_record(clock.time(), channel["setpoint"], current_temps, actual_status))
+    else:
+      # Write CSV file with Excel-friendly timestamp.  Header is written by writer if file does not exist
+      channel["writer"].write("%s,%s,%s,%s\n" % (strftime("%Y-%m-%d %H:%M:%S", gmtime(clock.time())), channel["setpoint"], ','.join(map(str, current_temps)), actual_status))
+  except OSError as e:
+    format_print("WARNING: Cannot open / write to logfile "+channel["logfile"]+" - check filename is correct and permissions? ("+str(e)+")", channel=channel)
+  log_write_time.observe(controller_metrics.timer() - start, channel=channel["name"])
+
+# Export metrics to textfile collector file (if set) - failure is only a warning, controller keeps running
+def export_metrics():
+  if args.metricsfile:
+    try:
+      metrics.write_textfile(args.metricsfile)
+    except OSError as e:
+      format_print("WARNING: Cannot write metrics file "+args.metricsfile+" ("+str(e)+")")
+
 # Parse input arguments
 parser = argparse.ArgumentParser(description='Simple Temperature Controller.')
-parser.add_argument('setpoint', type=str,
-  help='Setpoint Temperature (C) or path to file containing setpoint')
+parser.add_argument('setpoint', type=str, nargs='?',
+  help='Setpoint Temperature (C) or path to file containing setpoint - required unless --channels or --schedule is specified')
 parser.add_argument('--hysteresis', '-t', type=float, default=0.1, metavar='TEMPERATURE',
   help='Hystersis between switch-off and switch on (C) - default: 0.1')
 parser.add_argument('--cooler', '-c', action='store_true',
@@ -168,188 +896,240 @@ parser.add_argument('--gpioout', '-g', type=int, default=17, metavar='GPIO',
   help='GPIO pin for output demand signal - default: GPIO17 / Pin 11 (integer)')
 parser.add_argument('--gpiofeedback', '-f', type=int, metavar='GPIO',
   help='GPIO pin for optional feedback signal from relay or system under control - default same as --gpioout (integer)')
+parser.add_argument('--feedbacktimeout', '-z', type=float, default=1.0, metavar='SECONDS',
+  help='Time allowed for feedback GPIO to follow demand output after switching (s) - increase for slow contactors - default: 1.0')
 parser.add_argument('--logfile', '-l', type=str, metavar='FILENAME', default="temperature_data.csv",
   help='Full path and filename of output logfile for temperature and setpoint data - default: "temperature_data.csv" (string)')
 parser.add_argument('--legacylog', '-y', action='store_true',
-  help='Legacy logging mode - if this flag is set uses legacy logfile format - default: Excel-friendly CSV')
+  help='Legacy logging mode - if this flag is set uses legacy logfile format (same as --logformat legacy) - default: Excel-friendly CSV')
+parser.add_argument('--logformat', '-o', type=str, choices=['csv', 'legacy', 'binary'], default='csv',
+  help='Data logfile format: "csv" Excel-friendly CSV, "legacy" previous message-style log, "binary" compact fixed size records (see data_log.py) - default: "csv"')
+parser.add_argument('--flushrows', '-u', type=int, default=1, metavar='ROWS',
+  help='Number of data log rows buffered before writing to logfile - increase to reduce writes to SD card - default: 1 (write every row)')
+parser.add_argument('--flushinterval', '-e', type=float, default=0, metavar='SECONDS',
+  help='Maximum time data log rows are buffered before writing to logfile (s), 0 for no limit - default: 0')
+parser.add_argument('--fsync', action='store_true',
+  help='Sync data log to storage after every write - default: left to operating system')
 parser.add_argument('--messagelog', '-m', type=str, metavar='FILENAME',
   help='Full path and filename of optional output logfile for controller messages - if not specified messages sent to STDOUT only (string)')
 parser.add_argument('--interval', '-i', type=float, metavar='SECONDS',
   help='Interval between control cycle (s) - specify to enable continuous mode - default: run once and exit')
+parser.add_argument('--overrun', '-a', type=str, choices=cycle_scheduler.OVERRUN_MODES, default='skip',
+  help='If a cycle takes longer than --interval: "skip" missed cycles and wait for next scheduled cycle, or "coalesce" missed cycles into one cycle started immediately - default: "skip"')
+parser.add_argument('--sweep', '-w', type=str, choices=['serial', 'threaded', 'bulk'], default='serial',
+  help='Sensor read mode each cycle: "serial" one sensor at a time, "threaded" all sensors concurrently, "bulk" w1_therm bulk conversion of all sensors - default: "serial"')
+parser.add_argument('--resolution', type=int, nargs='+', choices=list(CONVERSION_TIME), metavar='BITS',
+  help='Resolution of sensor(s) (9-12 bit, conversion 94-750 ms) - one per sensor (--sensorid) or one for all - default: 12')
+parser.add_argument('--adaptive', type=float, metavar='TEMPERATURE',
+  help='Read control sensor at 9 bit resolution while more than TEMPERATURE (C, at least 0.5) outside hysteresis band - default: always read at --resolution')
+parser.add_argument('--logevery', type=int, default=1, metavar='CYCLES',
+  help='Read logging-only sensors (all but first sensor of each channel) every CYCLES cycles, last reading is logged in between - default: 1 (every cycle)')
+parser.add_argument('--readtimeout', '-r', type=float, default=2.0, metavar='SECONDS',
+  help='Per-sensor read timeout in "threaded" sweep mode, or bulk conversion timeout in "bulk" mode (s) - sensors not read in time are logged as empty - default: 2.0')
+parser.add_argument('--gpiobackend', '-b', type=str, choices=gpio_backend.BACKENDS, default='sysfs',
+  help='GPIO interface: "sysfs" (/sys/class/gpio), "gpiod" (GPIO character device, requires python3-libgpiod) or "fake" (in-memory pins for testing without hardware) - default: "sysfs"')
+parser.add_argument('--schedule', '-p', type=str, metavar='FILENAME',
+  help='Setpoint schedule file - setpoint follows weekly schedule (continuous mode), a setpoint set by hand is kept until next scheduled change (see config/schedule.conf) - default: no schedule')
+parser.add_argument('--channels', '-k', type=str, metavar='FILENAME',
+  help='Channel definition file for multi-channel mode - all channels are controlled by this process, and per-channel settings replace setpoint, --schedule, --hysteresis, --cooler, --sensorid, --label, --gpioout, --gpiofeedback and --logfile')
+parser.add_argument('--metricsfile', '-x', type=str, metavar='FILENAME',
+  help='Write timing metrics in Prometheus text format to this file after every cycle, e.g. for node_exporter textfile collector (filename must end .prom) - default: not written')
+parser.add_argument('--metricsport', '-q', type=int, metavar='PORT',
+  help='Serve timing metrics in Prometheus text format at http://<--metricsaddress>:<PORT>/metrics - default: not served')
+parser.add_argument('--metricsaddress', type=str, default='127.0.0.1', metavar='ADDRESS',
+  help='Address metrics HTTP endpoint listens on - use 0.0.0.0 to allow scraping from other hosts - default: "127.0.0.1"')
+parser.add_argument('--statusfile', '-j', type=str, metavar='FILENAME',
+  help='Write JSON snapshot of latest readings, setpoint, demand, feedback and last error of every channel to this file after every cycle (replaced atomically - best under /run) - default: not written')
+parser.add_argument('--socket', type=str, metavar='FILENAME',
+  help='UNIX domain socket to serve control requests on in continuous mode - get latest readings/status or set setpoint without restarting (see controller_ctl.py) - default: not served')
+parser.add_argument('--sysroot', type=str, default='/', metavar='DIRECTORY',
+  help='Root directory under which sysfs (sys/bus/w1, sys/devices/w1_bus_master1, sys/class/gpio) is found - for testing against a simulated sensor/GPIO tree - default: "/"')
 parser.add_argument('--verbose', '-v', action='store_true',
   help='Verbose mode - if this flag is set additional messages of control process sent to STDOUT - useful for debugging')
 args = parser.parse_args()
+if args.legacylog:
+  args.logformat = "legacy"
 
-# Deal with GPIO out for demand first, since it is used in all error handling
-gpio_output = args.gpioout
+channels = []
 
-# Check input argumants, set defaults where necessary and validate
-setarg = args.setpoint
+# Open GPIO interface - needed before any error handling can switch off outputs
 try:
-  # If we can convert to float use directly...
-  setpoint = float(setarg)
-except:
-  # ...Otherwise assume it is path of setpoint file
-  try:
-    with open(setarg, 'r') as f:
-      setpoint = float(f.readline())
-  except:
-    format_print("ERROR: "+setarg+" cannot be found/opened or does not contain a valid setpoint")
-    exit_on_error()
-
-hysteresis = args.hysteresis
-if hysteresis < 0:
-  format_print("ERROR: hysteresis cannot be negative!")
+  gpio = gpio_backend.open_backend(args.gpiobackend, os.path.join(args.sysroot, 'sys/class/gpio'))
+except Exception as e:
+  format_print("ERROR: Cannot open GPIO backend "+args.gpiobackend+" - "+str(e))
   exit_on_error()
 
-if args.sensorid:
-  # set temp_sensor(s) to specified list - handle errors later when list iterated
-  temp_sensors = args.sensorid
-else:
-  # Find list of /sys/bus/w1/devices/28-*/w1_slave and select first
-  sensor_list = glob.glob('/sys/devices/w1_bus_master1/28*/w1_slave')
-  if not sensor_list:
-    format_print("ERROR: Cannot find any temperature sensors on 1-wire bus, ensure temperature sensor(s) are properly connected and 1-wire driver loaded")
-    exit_on_error()
-  temp_sensors = [ele.split('/')[4] for ele in sensor_list]
-
-if args.label:
-  temp_labels = args.label
-else:
-  if len(temp_sensors) == 1:
-    temp_labels = ["Current"]
+try:
+  if args.channels:
+    # Multi-channel mode - all channel settings from channel definition file
+    channels = load_channels(args.channels, gpio_outputs)
   else:
-    temp_labels=temp_sensors
-
-if len(temp_labels) != len(temp_sensors):
-  format_print("ERROR: Number of label(s) (--label) must match number of sensor(s) (--sensorid) if both arguments are specified")
+    # Deal with GPIO out for demand first, since it is used in all error handling
+    gpio_outputs.append(args.gpioout)
+    if args.setpoint == None and not args.schedule:
+      raise ValueError("Setpoint or setpoint schedule (--schedule) must be specified if channel definition file (--channels) is not used")
+    # Check input argumants, set defaults where necessary and validate
+    channels = [make_channel("Current", args.setpoint, args.hysteresis, args.cooler, args.sensorid, args.label, args.gpioout, args.gpiofeedback, args.logfile, args.messagelog,
+      args.schedule, args.resolution)]
+except ValueError as e:
+  format_print("ERROR: "+str(e))
   exit_on_error()
 
-if args.gpiofeedback:
-  gpio_feedback = args.gpiofeedback
-else:
-  gpio_feedback = gpio_output
-
-logfile_fullpath = args.logfile
-
 cycle_interval = args.interval
 if cycle_interval and cycle_interval < 0:
   format_print("ERROR: interval cannot be negative!")
   exit_on_error()
 
-format_print("Setpoint: "+str(setpoint)+"  Hysteresis: "+str(hysteresis)+"  Temperature sensor(s): "+','.join(temp_sensors)+"  Channel label(s): "+','.join(temp_labels), "verbose")
+if args.readtimeout <= 0:
+  format_print("ERROR: read timeout must be greater than zero!")
+  exit_on_error()
 
-# Prepare CSV file header for data log
-CSV_header = "Timestamp,Setpoint (C),"
-for temp_label in temp_labels:
-  CSV_header += temp_label+" Temperature (C),"
-CSV_header += "Demand Status (0/1)\n"
-format_print("CSV header: "+CSV_header, "verbose")
+if args.feedbacktimeout < 0:
+  format_print("ERROR: feedback timeout cannot be negative!")
+  exit_on_error()
 
-# Set up GPIOs
-configure_gpio(gpio_output,"out")
-if gpio_output != gpio_feedback:
-  configure_gpio(gpio_feedback,"in")
+# Readings at 9 bit resolution are up to 0.5 C out, so margin must be larger for control decisions to be the same
+if args.adaptive != None and args.adaptive < 0.5:
+  format_print("ERROR: adaptive resolution margin must be at least 0.5 C!")
+  exit_on_error()
 
-# Main loop - continues once per --interval seconds or if --interval is not set execcutes one cycle and exits
-while True:
-  # Get current temperature from sensor
-  current_temps = []
-  for temp_sensor in temp_sensors:
-    current_temps.append(get_temp('/sys/bus/w1/devices/'+temp_sensor+'/w1_slave'))
-    if current_temps[-1] == None:
-      current_temps[-1] = get_temp('/sys/bus/w1/devices/'+temp_sensor+'/w1_slave')
-      if current_temps[-1] == None:
-        format_print("WARNING: Cannot get current temperature from sensor "+temp_sensor+" - check 1-wire driver enabled, sensor is connected correctly and (if set) --sensorid is correct")
-        current_temps[-1] = ""
-  format_print("Current Temperature(s): "+''.join(str(current_temps)), "verbose")
-  # If multiple sensors, note first sensor specified is always used for control
-  current_temp = current_temps[0]
-  if current_temp == "":
-  # If error occurs on control channel it is critical error, otherwise ignore
-    format_print("ERROR: Cannot get current temperature from control channel, cannot run control cycle")
-    if cycle_interval:
-      # In continuous mode, wait for next cycle and try again
-      try:
-        # Note for controller analyse must contain exact string "Switching system off"
-        format_print("Switching system off and waiting for retry next cycle")
-        set_gpio(gpio_output,"0")
-        sleep(cycle_interval)
-      except KeyboardInterrupt:
-        # Note for controller analyse must contain exact string "Switching system off"
-        format_print("Keyboard interrupt - Switching system off demand and exiting temperature controller")
-        exit_on_error()
-      continue
-    else:
-      # in one-shot mode, exit if temperature cannont be found
-      exit_on_error()
+if args.logevery < 1:
+  format_print("ERROR: logging sensor read interval must be at least one cycle!")
+  exit_on_error()
 
-  # Compare temperature with setpoint, set heating/cooling demand signal accordingly
-  # Note empirically switch on below setpoint and off at setpoint works best for many heating systems, since reaction to demand on tends to be faster than off
-  format_print("Comparing measured temperature and setpoint", "verbose")
-  if args.cooler:
-    # For cooler, switch on at hysteresis above setpoint and off at setpoint
-    above = (current_temp - hysteresis) > setpoint
-    below = current_temp < setpoint
-  else:
-    # For heater, switch on hysteresis below setpoint and off at setpoint
-    above = (current_temp + hysteresis) < setpoint
-    below = current_temp > setpoint
-  status = get_gpio(gpio_output)
-  if above:
-    format_print("Demand required, checking if system is on", "verbose")
-    if status == 0:
-      # Note for controller analyse must contain exact string "Switching system on"
-      status_message=("Setpoint=%s, Actual=%s - Switching system on" % (setpoint, current_temp))
-      format_print(status_message)
-      set_gpio(gpio_output,"1")
-      status = 1
-  elif below:
-    format_print("Demand not required, checking if system is on", "verbose")
-    if status == 1:
-      # Note for controller analyse must contain exact string "Switching system off"
-      status_message=("Setpoint=%s, Actual=%s - Switching system off" % (setpoint, current_temp))
-      format_print(status_message)
-      set_gpio(gpio_output,"0")
-      status = 0
-  else:
-    format_print("Temperature OK", "verbose")
-    pass
+# Read every sensor used by any channel once per cycle
+temp_sensors = sweep_sensors(channels)
+update_sensor_states(channels)
+# Cycles run, for reading logging-only sensors every --logevery cycles
+cycle_count = 0
+
+# Most recent concurrent read started for each sensor - one reader thread per sensor so a blocked sensor cannot delay the others
+pending_reads = {}
 
-  # Read back demand signal - if spare relay contacts (DP), can test here if relay has actually switched
-  # Else if additional GPIO for feedback not specified, check status of GPIO output matches demand
-  sleep(0.1)
-  # Need to allow time for mechanical relay to switch (if in use)
-  actual_status = get_gpio(gpio_feedback)
+# Set up GPIOs - if error occurs, still attempt to switch off - GPIO out may already be configured if failure is setting GPIO feedback
+try:
+  for channel in channels:
+    configure_channel(channel)
+except ValueError as e:
+  format_print("ERROR: "+str(e))
+  exit_on_error()
 
-  if actual_status != status:
-    format_print("ERROR: Requested demand status "+str(status)+" but actual status "+str(actual_status)+" - failed to set demand signal!")
+# Reload configuration on SIGHUP (e.g. systemctl reload) and pick up setpoint changes each cycle, so no restart is needed
+reload_requested = False
+signal.signal(signal.SIGHUP, request_reload)
+# Ensure buffered data is written if controller is stopped
+signal.signal(signal.SIGTERM, terminate)
 
+# Serve metrics for scraping - monitoring is optional, so controller keeps running if endpoint cannot be started
+if args.metricsport:
   try:
-    # Write temperature, setpoint and actual status to log - Note all all timestamps in UTC
-    with open(logfile_fullpath,"a") as f:
-      if args.legacylog:
-        # Backwards compatibilty - Use previous message-style log - note does not support multiple temperature sensors
-        f.write("%s %d Setpoint: %s Actual: %s Status: %s \n" % (strftime("%Y-%m-%d-%H-%M-%S", gmtime()), time(), setpoint, current_temp, actual_status))
-      else:
-        # Write CSV file with Excel-friendly timestamp.  For CSV mode, write header if file does not exist
-        if os.stat(logfile_fullpath).st_size == 0:
-          f.write(CSV_header)
-        f.write("%s,%s,%s,%s\n" % (strftime("%Y-%m-%d %H:%M:%S", gmtime()), setpoint, ','.join(map(str, current_temps)), actual_status))
-  except:
-    format_print("WARNING: Cannot open / write to logfile "+logfile_fullpath+" - check filename is correct and permissions?")
+    metrics.serve(args.metricsport, args.metricsaddress)
+  except OSError as e:
+    format_print("WARNING: Cannot serve metrics on "+args.metricsaddress+":"+str(args.metricsport)+" ("+str(e)+")")
 
-  # Check if one-shot mode or continuous - if interval argument is set use continuous
-  if cycle_interval:
-      try:
-        sleep(cycle_interval)
-      except KeyboardInterrupt:
-        # Note for controller analyse must contain exact string "Switching system off"
-        format_print("Keyboard interrupt - Switching system off and exiting")
-        exit_on_error()
-      continue
-  else:
-    break
+# Serve control requests - controller keeps running if socket cannot be created
+if cycle_interval and args.socket:
+  try:
+    control_server = control_socket.ControlServer(args.socket, {"get": socket_get, "set": socket_set})
+  except OSError as e:
+    format_print("WARNING: Cannot serve control socket "+args.socket+" ("+str(e)+")")
 
-# Put back umask
-os.umask(oldmask)
+# In continuous mode cycles start on fixed time grid (multiples of interval), so period does not drift with time taken by each cycle
+# Created after GPIO setup (sysfs export waits 1 s per GPIO), so setup time is not counted as an overrun of first cycle
+if cycle_interval:
+  scheduler = cycle_scheduler.CycleScheduler(cycle_interval, args.overrun)
+
+# Main loop - continues once per --interval seconds or if --interval is not set execcutes one cycle and exits
+try:
+  while True:
+    cycle_start = controller_metrics.timer()
+    if reload_requested:
+      reload_requested = False
+      reload_config()
+    # Apply any setpoint changes since last cycle, then any scheduled setpoint change
+    for channel in channels:
+      check_setpoint(channel)
+      check_schedule(channel)
+
+    # Start reading sensors due this cycle, then get current temperature from control sensor of each channel first
+    read_sensors, cycle_conversion = plan_sweep(cycle_count)
+    cycle_count += 1
+    sweep = start_sweep(read_sensors)
+    for temp_sensor in temp_sensors:
+      if temp_sensor not in read_sensors:
+        # Not read this cycle - last reading is used
+        sweep["temps"][temp_sensor] = sensor_states[temp_sensor]["temp"]
+        sweep["times"][temp_sensor] = sensor_states[temp_sensor]["time"]
+    # Bus time saved compared with 12 bit read of every sensor
+    cycle_saved = CONVERSION_TIME[12] * (1 if args.sweep == "bulk" else len(temp_sensors)) - cycle_conversion
+    conversion_time.inc(cycle_conversion)
+    conversion_saved.inc(cycle_saved)
+    format_print("Reading %d of %d sensor(s) - estimated conversion time %.3f s, saved %.3f s" % (len(read_sensors), len(temp_sensors), cycle_conversion, cycle_saved), "verbose")
+    active_channels = []
+    for channel in channels:
+      # If multiple sensors, note first sensor specified is always used for control
+      current_temp = collect_temp(sweep, channel["sensors"][0])
+      format_print("Control Temperature: "+str(current_temp), "verbose", channel)
+      if current_temp == "":
+        # If error occurs on control channel it is critical error for this channel, otherwise ignore
+        format_print("ERROR: Cannot get current temperature from control channel, cannot run control cycle", channel=channel)
+        if cycle_interval:
+          # In continuous mode, wait for next cycle and try again
+          # Note for controller analyse must contain exact string "Switching system off"
+          format_print("Switching system off and waiting for retry next cycle", channel=channel)
+        set_gpio(channel["gpio_output"],"0")
+        channel["readings"] = channel_readings(channel, sweep, [""], 0, None)
+        continue
+      # Compare temperature with setpoint, set heating/cooling demand signal accordingly
+      channel["status"] = control_channel(channel, current_temp)
+      active_channels.append(channel)
+
+    # Read back demand signal - if spare relay contacts (DP), can test here if relay has actually switched
+    # Else if additional GPIO for feedback not specified, check status of GPIO output matches demand
+    # Only channels switched this cycle wait for mechanical relay to switch (if in use)
+    for channel in active_channels:
+      channel["actual_status"] = read_feedback(channel)
+      if channel["actual_status"] != channel["status"]:
+        feedback_mismatches.inc(channel=channel["name"])
+        format_print("ERROR: Requested demand status "+str(channel["status"])+" but actual status "+str(channel["actual_status"])+" - failed to set demand signal!", channel=channel)
+
+    # Collect remaining logging-only sensors and write data logs - control decisions above do not wait on these
+    for channel in active_channels:
+      current_temps = [collect_temp(sweep, temp_sensor) for temp_sensor in channel["sensors"]]
+      format_print("Current Temperature(s): "+''.join(str(current_temps)), "verbose", channel)
+      write_data_log(channel, current_temps, channel["actual_status"])
+      channel["readings"] = channel_readings(channel, sweep, current_temps, channel["status"], channel["actual_status"])
+
+    cycle_seconds = controller_metrics.timer() - cycle_start
+    cycle_time.observe(cycle_seconds)
+    cycle_stats = {"time": clock.time(), "cycle_seconds": cycle_seconds, "sensors_read": len(read_sensors), "conversion_seconds": cycle_conversion,
+      "conversion_seconds_saved": cycle_saved}
+    if cycle_interval:
+      # Lag of this cycle behind schedule, and overruns of previous cycles
+      cycle_stats.update({"interval": cycle_interval, "cycles": scheduler.cycles + 1, "jitter": scheduler.jitter, "overruns": scheduler.overruns,
+        "cycles_skipped": scheduler.skipped_total})
+    export_metrics()
+    publish_status()
+
+    # Check if one-shot mode or continuous - if interval argument is set use continuous
+    if cycle_interval:
+        try:
+          scheduler.wait()
+        except KeyboardInterrupt:
+          # Note for controller analyse must contain exact string "Switching system off"
+          format_print("Keyboard interrupt - Switching system off and exiting")
+          exit_on_error()
+        schedule_lag.observe(scheduler.jitter)
+        if scheduler.overrun:
+          cycle_overruns.inc()
+          cycles_skipped.inc(scheduler.skipped)
+          format_print("WARNING: Control cycle overran interval by %.3f s - %d cycle(s) %s" % (scheduler.overrun, scheduler.skipped, "skipped" if args.overrun == "skip" else "coalesced"))
+        format_print("Cycle jitter: %.3f s, overruns: %d, cycles skipped: %d" % (scheduler.jitter, scheduler.overruns, scheduler.skipped_total), "verbose")
+        continue
+    else:
+      if len(active_channels) != len(channels):
+        # in one-shot mode, exit on error if temperature cannot be found for any channel - failed channels have already been switched off
+        sys.exit(1)
+      break
+finally:
+  shutdown()
@@ -2,13 +2,17 @@
 
 # Analyse temperature controller log-files produced by control_temp.py, generating daily stats and charts
 
-# SYNTAX: ./controller_analyse.py [<full filename and path of log> <start time> <end time> <output directory>]
+# SYNTAX: ./controller_analyse.py [--rotated] [--checkpoint <checkpoint file>] [--index <index file> | --no-index] [--no-plots] [--dpi <dpi>] [--format <png|svg|pdf|jpg>] [<full filename and path of log> <start time> <end time> <output directory>]
 
 # EXAMPLE CALLS
 # ./controller_analyse.py /var/log/temperature-controller/control_temp.log "2020-01-01" "2020-04-01" /var/log/temperature-controller
+# ./controller_analyse.py --checkpoint /var/lib/temperature-controller/analysis.checkpoint /var/log/temperature-controller/control_temp.log
+# ./controller_analyse.py "/var/log/temperature-controller/control_temp.log*"
 
 # INPUTS (all arguments are optional)
-# If <full filename and path of log> is not specified default /var/log/control_temp.log
+# If <full filename and path of log> is not specified default /var/log/control_temp.log - may also be a glob pattern (quoted, so it is not
+#   expanded by the shell) or a directory (control_temp.log and its rotated logs in directory)
+# --rotated also analyses rotated logs of <log> (<log>.1, <log>.2.gz etc., e.g. rotated by logrotate with compress/delaycompress)
 # If <start time> is not specified default [midnight at end of day on which first switching event occurs]
 # If <end time> is not specified default [midnight at start of last day in log]
 # If <output directory> is outputs will be written to directory from which script is run
@@ -17,14 +21,28 @@
 # Invalid start or end times will be ignored (default of all available data used)
 # Note if the end date is later than end of log, it will be assumed system status is held from end of log to requested end of analysis
 # Note the temperature controller uses UTC throughout
+# If --checkpoint is specified, per-day results and the position reached in the log are saved to the checkpoint file, and the next run only
+# parses lines appended since then.  If the log has been truncated or rotated (or is a different file) since the checkpoint, the full log is analysed
+# Otherwise the sidecar day index of the log (--index, default <log file>.idx - see log_index.py) is updated with lines appended since last run,
+# and only the days analysed are parsed (starting from the status at midnight held in the index), so a short period of a long log is quick to
+# analyse.  --no-index parses the full log without using the index
+# If more than one log is found (rotated logs, glob pattern or directory), or the log is gzip compressed (.gz), the logs are ordered by their
+# first timestamp, decompressed as they are read (without temporary files), parsed in parallel processes on multi-core systems and analysed as
+# one log, with status carried from each log to the next.  Checkpoint and index are not used
 
 # OUTPUTS
 # CSV file with amount of time system "on" (in hours and %) for each day
-# Plot and bar chart of hours "on" each day
+# Plot and bar chart of hours "on" each day (PNG at 300 dpi unless --dpi / --format specified, not saved if --no-plots specified) - both charts
+# are rendered at the same time in separate processes on multi-core systems
 
 # CHANGELOG
 # 2015 - First Version
 # 06/2020 - Fixed bug with analysis of days after log ends, changed CSV to 2 d.p., added python3 compatibility
+# 10/2026 - Added incremental analysis with checkpoint file
+# 10/2026 - Log parsed in a single streaming pass (controller_log.py) instead of reading whole log into memory and searching it for each day
+# 10/2026 - Matplotlib only loaded when plotting, added --no-plots, --dpi and --format options, plots rendered in parallel
+# 10/2026 - Only days analysed are parsed, located with sidecar day index
+# 10/2026 - Rotated and gzip compressed logs analysed as one log, parsed in parallel
 
 # Copyright (C) 2015, 2020 Aaron Lockton
 
@@ -41,36 +59,47 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-print("Importing modules...")
-
 import time
 from time import gmtime, strftime
 import os
 import sys
 import calendar
-from matplotlib.dates import date2num, DAILY
-import datetime as DT
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import argparse
+import controller_log
+import log_index
+import analysis_plots
 
 # Allow all group users to write to files created by this script
 oldmask = os.umask(0o002)
 
 print(strftime("%Y-%m-%d-%H:%M:%S: Starting temperature controller log analysis", gmtime()))
-# Set defaults
-if len(sys.argv) < 2:
-  log_file = "/var/log/control_temp.log"
-else:
-  log_file = sys.argv[1]
-  if os.path.isfile(log_file) != 1:
-    print("WARNING: Cannot find log file specified - using default")
-    log_file = "/var/log/control_temp.log"
-
-if len(sys.argv) < 3:
+# Parse arguments - all positional and optional for compatibility with previous versions
+parser = argparse.ArgumentParser(description='Analyse temperature controller log-files produced by control_temp.py, generating daily stats and charts')
+parser.add_argument('log_file', nargs='?', default="/var/log/control_temp.log",
+  help='Full filename and path of log, glob pattern of logs (quoted) or directory holding control_temp.log (default /var/log/control_temp.log)')
+parser.add_argument('start', nargs='?', help='Start of analysis - YYYY-MM-DD or unix timestamp (default all available data)')
+parser.add_argument('end', nargs='?', help='End of analysis - YYYY-MM-DD or unix timestamp (default all available data)')
+parser.add_argument('output_dir', nargs='?', default="", help='Output directory (default current directory)')
+parser.add_argument('-k', '--checkpoint', help='Checkpoint file for incremental analysis - only log lines appended since previous run are parsed (created if it does not exist)')
+parser.add_argument('--rotated', '-r', action='store_true', help='Include rotated logs (<log>.1, <log>.2.gz etc.) in analysis')
+parser.add_argument('--index', '-i', help='Sidecar day index of log, created or updated if needed - default: <log file>.idx')
+parser.add_argument('--no-index', '-n', action='store_true', help='Parse full log instead of only the days analysed')
+parser.add_argument('--no-plots', '-p', action='store_true', help='Only save CSV of results - plotting is skipped (and matplotlib is not loaded)')
+parser.add_argument('--dpi', '-d', type=int, default=300, help='Resolution of plots (dots per inch) - default: 300')
+parser.add_argument('--format', '-f', choices=analysis_plots.FORMATS, default='png', help='File format of plots - default: png')
+args = parser.parse_args()
+
+# Set defaults - log may be given as glob pattern or directory, and may be split into rotated logs, which are analysed as one log
+log_files = controller_log.log_segments(args.log_file, args.rotated)
+if not log_files:
+  print("WARNING: Cannot find log file specified - using default")
+  log_files = controller_log.log_segments("/var/log/control_temp.log", args.rotated) or ["/var/log/control_temp.log"]
+log_file = log_files[-1]
+
+if args.start == None:
   requested_start = 0
 else:
-  requested_start_raw = sys.argv[2]
+  requested_start_raw = args.start
   if str.isdigit(requested_start_raw):
     requested_start = int(requested_start_raw)
   else:
@@ -81,24 +110,58 @@ else:
       requested_start = 0
 #print(strftime("%Y-%m-%d-%H:%M:%S", gmtime(requested_start)))
 
-# Read in log file
-print("Analysing log file:  %s" % log_file)
-with open(log_file, "r") as f:
-  raw_log = list(f)
-
-# Find first switch in log (and hence earliest start time) and  end time of log
-start_time=None
-for line in raw_log:
-  if "Switching system" in line:
-    start_time = calendar.timegm(time.strptime(line[0:10], "%Y-%m-%d")) + 86400
-    break
-end_time = calendar.timegm(time.strptime(raw_log[-1][0:10], "%Y-%m-%d"))
+# Read in log file - checkpoint state holds results for every complete day in log, and log_tail the last (incomplete) day
+state = None
+index = None
+if len(log_files) > 1 or log_file.endswith(".gz"):
+  # Rotated and compressed logs - all logs are parsed, in parallel
+  print("Analysing log files: %s" % ', '.join(log_files))
+  if args.checkpoint:
+    print("WARNING: Checkpoint is only used when analysing a single uncompressed log - analysing all log files")
+  state = controller_log.new_checkpoint(log_file)
+  log_tail = controller_log.scan_segments(log_files, state)
+elif args.checkpoint or args.no_index:
+  print("Analysing log file:  %s" % log_file)
+  if args.checkpoint:
+    # Incremental analysis - only parse lines appended since checkpoint
+    state = controller_log.load_checkpoint(args.checkpoint, log_file)
+    if state != None and state["offset"] > 0:
+      print("Resuming analysis from checkpoint %s at line %d" % (args.checkpoint, state["lines"] + 1))
+  if state == None:
+    state = controller_log.new_checkpoint(log_file)
+  log_tail = controller_log.scan_log(log_file, state)
+  if args.checkpoint:
+    try:
+      controller_log.save_checkpoint(args.checkpoint, log_file, state)
+    except OSError as e:
+      print("WARNING: Cannot save checkpoint %s - %s" % (args.checkpoint, str(e)))
+else:
+  print("Analysing log file:  %s" % log_file)
+  # Extent of log from sidecar index - only days being analysed are parsed, once analysis period is known
+  index = log_index.update(log_file, "controller", args.index)
+  first_switch_day = index["first_switch_day"]
+  last_day = index["days"][-1][0] if index["days"] else None
+  first_line = index["first_line"]
+  last_line = index["last_line"]
+  total_lines = index["lines"]
+if index == None:
+  first_switch_day = state["first_switch_day"]
+  last_day = state["day"]
+  first_line = state["first_line"]
+  last_line = log_tail["last_line"]
+  total_lines = log_tail["lines"]
+
+# Earliest start time is midnight at end of day of first switch in log, end time is midnight at start of last day of log
+start_time = None
+if first_switch_day != None:
+  start_time = first_switch_day + 86400
+end_time = last_day
 if not start_time or not end_time:
   print("ERROR: logfile does not appear to contain at least one valid switch on and switch off event" )
   # Put back umask
   os.umask(oldmask)
   sys.exit(1)
-print("Log file covers %s to %s" % (raw_log[0][0:19], raw_log[-1][0:19]))
+print("Log file covers %s to %s" % (first_line[0:19], last_line[0:19]))
 print("Log file can be analysed from from %s to %s" % (strftime("%Y-%m-%d_%H:%M:%S", gmtime(start_time)), strftime("%Y-%m-%d-%H:%M:%S", gmtime(end_time))))
 num_days = int((end_time - start_time) / 86400)
 if num_days < 1:
@@ -107,13 +170,13 @@ if num_days < 1:
   os.umask(oldmask)
   sys.exit(1)
 end_time_log = end_time
-print("Total %s log lines, %d full days in log" % (len(raw_log), num_days))
+print("Total %s log lines, %d full days in log" % (total_lines, num_days))
 
 # Check requested end time, and set default
-if len(sys.argv) < 4:
+if args.end == None:
   requested_end = end_time
 else:
-  requested_end_raw = sys.argv[3]
+  requested_end_raw = args.end
   if str.isdigit(requested_end_raw):
     requested_end = int(requested_end_raw)
   else:
@@ -125,10 +188,8 @@ else:
 #print(strftime("%Y-%m-%d-%H:%M:%S", gmtime(requested_end)))
 
 # Check if output directory is specified
-if len(sys.argv) < 5:
-  output_dir=""
-else:
-  output_dir = sys.argv[4]
+output_dir = args.output_dir
+if output_dir:
   # Ensure logfile path ends with a trailing slash
   if output_dir[-1] != "/":
     output_dir = output_dir + "/"
@@ -147,132 +208,17 @@ num_days = int((end_time - start_time) / 86400)
 print("Analysing %d full days" % (num_days))
 if end_time > end_time_log:
   print("WARNING: Requested analysis period ends after last log line - assuming no changes in status between these times")
-current_day = start_time
-datestamps = []
-timestamps = []
-for ii in range(0, num_days):
-  # print(ii,strftime("%Y-%m-%d-%H:%M:%S", gmtime(current_day)))
-  datestamps.append(strftime("%Y%m%d", gmtime(current_day)))
-  timestamps.append(current_day)
-  current_day += 86400
-datestamps_extra = datestamps[:]
-datestamps_extra.append(strftime("%Y%m%d", gmtime(current_day)))
-timestamps.append(current_day)
-# datestamps: list of every day analysed (string)
-# timestamps: list of day boundary of every day analysed-including start and end (unix timestamp)
-# datestamps_extra-list of every day boundary-including start and end (string)
-# print(datestamps, datestamps_extra, timestamps[0], len(timestamps))
+datestamps = [strftime("%Y%m%d", gmtime(start_time + ii * 86400)) for ii in range(0, num_days)]
 
-# Create status list, showing status at midnight every day
-status_list = []
-current_status = -1
-for line in datestamps_extra:
-  status_list.append("-1")
-prev_time = calendar.timegm(time.strptime(raw_log[0][0:10], "%Y-%m-%d"))
-for line in raw_log:
-  try:
-    line_time = calendar.timegm(time.strptime(line[0:19], "%Y-%m-%d-%H:%M:%S"))
-  except ValueError:
-    try:
-      line_time = calendar.timegm(time.strptime(line[0:19], "%Y-%m-%d-%H-%M-%S"))
-    except ValueError:
-      # Line does not contain valid data - ignore it
-      # print("Invalid line:  %s" % repr(line))
-      continue
-  line_day = strftime("%Y%m%d", gmtime(line_time))
-  if line_day != strftime("%Y%m%d", gmtime(prev_time)):
-    # Day rollower has occurred
-    if line_time > start_time and prev_time < start_time:
-      status_start_analysis = current_status
-      #print(status_start_analysis)
-    try:
-      start_day_index = datestamps_extra.index(strftime("%Y%m%d", gmtime(prev_time+86400)))
-      end_day_index = datestamps_extra.index(line_day)
-      for ii in range(start_day_index,end_day_index+1):
-        status_list[ii] = current_status
-    except ValueError:
-      pass
-      # print(strftime("%Y%m%d", gmtime(prev_time+86400)), line_day)
-  if "Switching system on" in line:
-    current_status = 1
-  if "Switching system off" in line:
-    current_status = 0
-  prev_time = line_time
-# If last day(s) in analysis have no data in log, pad with last known status
-indices = [jj for jj, s in enumerate(raw_log) if 'Switching system' in s]
-last_status_change_line = raw_log[indices[-1]]
-if "Switching system on" in last_status_change_line:
-  status_end_analysis = 1
-elif "Switching system off" in last_status_change_line:
-  status_end_analysis = 0
-else:
-  print("ERROR: invalid last switching line: " + last_status_change_line)
-  # Put back umask
-  os.umask(oldmask)
-  sys.exit(1)
-if status_list[-1] == "-1":
-  index = ii+1
-  for line in status_list[ii+1:]:
-    status_list[index] = status_end_analysis
-    index += 1
-# If first day(s) in analysis have no data in log, pad with known start status
-first_status_change_line = raw_log[indices[0]]
-# Inverted logic here - if first line is switching on, then assume off in all time before log
-if "Switching system on" in first_status_change_line:
-   status_start_analysis = 0
-elif "Switching system off" in first_status_change_line:
-   status_start_analysis = 1
-else:
-  print("ERROR: invalid first switching line: " + first_status_change_line)
-  sys.exit(1)
-if status_list[0] == "-1":
-  index = 0
-  for line in status_list:
-    if line == "-1":
-      status_list[index] = status_start_analysis
-    else:
-      break
-    index += 1
-#print(status_list)
+# Parse days analysed, starting from status at midnight at start of first day in index
+if index != None:
+  day, offset, line, midnight_status = log_index.day_entry(index, start_time)
+  state = controller_log.new_checkpoint(log_file)
+  state.update({"offset": offset, "lines": line, "day": day, "days_start": day, "midnight_status": midnight_status, "first_switch_day": first_switch_day})
+  log_tail = controller_log.scan_log(log_file, state, end_time)
 
-# Step through days, reading log lines and calculating time on each day
-counter = 0
-time_on = []
-for line in datestamps:
-  todays_lines = [s for s in raw_log if (line[0:4]+"-"+line[4:6]+"-"+line[6:8]) in s]
-  #print(line,todays_lines,line[0:4]+"-"+line[4:6]+"-"+line[6:8])
-  if todays_lines:
-    current_status = status_list[counter]
-    todays_total = 0
-    if current_status == 1:
-      last_on = timestamps[counter]
-    for line in todays_lines:
-      try:
-        line_time = calendar.timegm(time.strptime(line[0:19], "%Y-%m-%d-%H:%M:%S"))
-      except ValueError:
-        try:
-          line_time = calendar.timegm(time.strptime(line[0:19], "%Y-%m-%d-%H-%M-%S"))
-        except ValueError:
-          # Line does not contain valid data - ignore it
-          # print("WARNING: Line does not contain valid data "+line)
-          continue
-      if "Switching system on" in line and current_status == 0:
-        current_status = 1
-        last_on = line_time
-      if "Switching system off" in line and current_status == 1:
-        current_status = 0
-        todays_total += line_time - last_on
-    if current_status != status_list[counter+1]:
-      print("ERROR! inconsistency between status from log lines and expected midnight status!")
-      print(line_time, current_status, last_on, status_list[counter+1], todays_total)
-    if current_status == 1:
-      todays_total += timestamps[counter+1] - last_on
-    time_on.append(todays_total)
-  else:
-    # If no data, status for entire day same as at start of day
-    time_on.append(status_list[counter] * 86400)
-  counter += 1
-#print(datestamps,time_on)
+# Time on each day analysed
+time_on = controller_log.daily_on_time(state, log_tail, start_time, num_days)
 time_on_hours = [float(x)/3600 for x in time_on]
 duty_cycle = [float(x)/864 for x in time_on]
 
@@ -285,45 +231,15 @@ print("Max %.1f hours in a day (on %s) and min %.1f hours in a day" %(max_hours,
 file_timestamp = output_dir + strftime("%Y%m%d_%H%M%S", gmtime())
 data_filename = file_timestamp + "_controller_analysis.csv"
 print("Saving csv of results to %s" %data_filename)
-with open(data_filename, "w") as f:
-  counter = 0
-  f.write("Standard Date,Date,Time ON (hours),Time ON (%)\n")
-  for line in datestamps:
-    f.write("%s,%s/%s/%s,%s,%s\n" %(line, line[6:8],line[4:6],line[0:4], "{:.2f}".format(time_on_hours[counter]), "{:.2f}".format(duty_cycle[counter])))
-    counter += 1
-print("Saving plots of results")
-
-# Create datenums for date ticks on plots
-DT_datestamps = [DT.datetime.strptime(x, "%Y%m%d") for x in datestamps]
-datenums = [date2num(x) for x in DT_datestamps]
-
-# Plot hours on bar chart
-fig, ax = plt.subplots(1)
-plt.bar(datenums, time_on_hours)
-ax.xaxis_date()
-loc = ax.xaxis.get_major_locator()
-loc.maxticks[DAILY] = 12
-plt.title(summary_string)
-plt.ylabel('Time ON each day (hours)')
-fig = matplotlib.pyplot.gcf()
-fig.set_size_inches(8,6)
-fig.autofmt_xdate(bottom=0.15)
-dateFmt = matplotlib.dates.DateFormatter('%Y-%m-%d')
-ax.xaxis.set_major_formatter(dateFmt)
-plt.savefig(file_timestamp+"_controller_log_plot_bar.png", format='png', dpi=300)
-
-# Plotting on chart
-plt.close('all')
-fig, ax = plt.subplots(1)
-plt.plot_date(datenums,time_on_hours, 'r-o')
-loc = ax.xaxis.get_major_locator()
-loc.maxticks[DAILY] = 12
-plt.title(summary_string)
-plt.ylabel('Time ON each day (hours)')
-fig.autofmt_xdate(bottom=0.15)
-dateFmt = matplotlib.dates.DateFormatter('%Y-%m-%d')
-ax.xaxis.set_major_formatter(dateFmt)
-plt.savefig(file_timestamp+"_controller_log_plot.png", format='png', dpi=300)
+controller_log.write_daily_csv(data_filename, datestamps, time_on_hours, duty_cycle)
+
+# Plot hours on bar chart and line chart
+if not args.no_plots:
+  print("Saving plots of results")
+  plot_suffix = "." + args.format
+  analysis_plots.render([
+    (analysis_plots.daily_bar_chart, (datestamps, time_on_hours, summary_string, 'Time ON each day (hours)', file_timestamp+"_controller_log_plot_bar"+plot_suffix, args.dpi, args.format)),
+    (analysis_plots.daily_line_chart, (datestamps, time_on_hours, summary_string, 'Time ON each day (hours)', file_timestamp+"_controller_log_plot"+plot_suffix, args.dpi, args.format))])
 
 # Put back umask
 os.umask(oldmask)
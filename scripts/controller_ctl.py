@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Get latest readings from, or set setpoint of, a running temperature controller (control_temp.py --socket) over its control socket
+# Used by temprt and settemp, which fall back to reading sensors / writing setpoint file directly if no controller is running
+
+# SYNTAX: ./controller_ctl.py [--socket <socket>] [--json] get
+#         ./controller_ctl.py [--socket <socket>] [--json] set <setpoint> [--channel <channel name>]
+
+# EXAMPLE CALLS
+# ./controller_ctl.py get
+# ./controller_ctl.py --socket /run/temperature-controller/controller.sock set 20.5
+# ./controller_ctl.py set 18 --channel "Fermenter 1"
+
+# INPUTS
+# get - latest readings of every channel from last control cycle (sensors are not read again, so returns immediately)
+# set <setpoint> - apply new setpoint (C) from next control cycle without restarting controller - also written to setpoint file, if controller
+#   setpoint is a file.  --channel must be given if controller runs more than one channel (--channels)
+# --socket control socket of controller - default /run/temperature-controller/controller.sock
+# --json print response from controller as JSON instead of text
+
+# OUTPUTS
+# get - same form as temprt: setpoint, temperature of each sensor and demand status of each channel (prefixed with [<channel name>] if more than
+#   one channel), and timing of last control cycle.  With --json the full status snapshot is printed (same as control_temp.py --statusfile)
+# set - timestamped setpoint in same form as settemp (change is logged to controller log by controller)
+# Exit status: 0 success, 1 request rejected by controller (error printed to STDOUT), 2 no controller listening on socket (message to STDERR)
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import sys
+import json
+import argparse
+from time import gmtime, strftime
+import control_socket
+
+parser = argparse.ArgumentParser(description='Get readings from or set setpoint of running temperature controller')
+parser.add_argument('--socket', '-k', type=str, default=control_socket.DEFAULT_SOCKET, metavar='FILENAME',
+  help='Control socket of controller - default: "'+control_socket.DEFAULT_SOCKET+'"')
+parser.add_argument('--json', '-j', action='store_true', help='Print response as JSON')
+subparsers = parser.add_subparsers(dest='command', required=True)
+subparsers.add_parser('get', help='Latest readings, setpoint and demand of every channel')
+set_parser = subparsers.add_parser('set', help='Set setpoint')
+set_parser.add_argument('setpoint', type=float, help='Setpoint temperature (C)')
+set_parser.add_argument('--channel', '-c', type=str, help='Channel name - required if controller has more than one channel')
+args = parser.parse_args()
+
+request = {"command": args.command}
+if args.command == "set":
+  request["setpoint"] = args.setpoint
+  if args.channel:
+    request["channel"] = args.channel
+try:
+  response = control_socket.request(args.socket, request)
+except (OSError, ValueError) as e:
+  print("ERROR: No controller responding on control socket "+args.socket+" ("+str(e)+")", file=sys.stderr)
+  sys.exit(2)
+
+if args.json:
+  print(json.dumps(response, indent=2))
+  sys.exit(0 if response["ok"] else 1)
+if not response["ok"]:
+  print("ERROR: "+response.get("error", "request failed"))
+  sys.exit(1)
+
+if args.command == "set":
+  print("%s Setpoint: %s" % (strftime("%Y-%m-%d-%H:%M:%S:", gmtime()), response["setpoint"]))
+  if not response.get("persistent"):
+    print("WARNING: Controller setpoint is not a file - new setpoint will be lost if controller restarts")
+  sys.exit(0)
+
+channels = response.get("channels", [])
+for channel in channels:
+  prefix = "[%s] " % channel["name"] if len(channels) > 1 else ""
+  print("%sSetpoint: %s C" % (prefix, channel["setpoint"]))
+  if channel.get("time") == None:
+    print("%sNo readings yet - waiting for first control cycle" % prefix)
+    continue
+  for sensor in channel.get("sensors", []):
+    if sensor["temperature"] == None:
+      print("%sERROR: Cannot read sensor %s" % (prefix, sensor["label"]))
+    else:
+      print("%s%s Temperature %0.2f C" % (prefix, sensor["label"], sensor["temperature"]))
+  # Demand as read back from feedback GPIO, as given by temprt
+  print("%sDemand Status: %s" % (prefix, channel["feedback"] if channel.get("feedback") != None else channel.get("demand")))
+cycle = response.get("cycle", {})
+if cycle.get("cycles"):
+  print("Last cycle %s UTC: %.3f s, %d cycles, %d overruns" % (strftime("%Y-%m-%d %H:%M:%S", gmtime(cycle["time"])), cycle["cycle_seconds"], cycle["cycles"], cycle["overruns"]))
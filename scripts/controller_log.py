@@ -0,0 +1,279 @@
+# Controller log parsing for temperature controller - used by controller_analyse.py to calculate time system is "on" each day from log of control_temp.py
+
+# SYNTAX: import controller_log
+#         state = controller_log.new_checkpoint(<log file>)
+#         log_tail = controller_log.scan_log(<log file>, state, [<end>])
+#         log_tail = controller_log.scan_segments(controller_log.log_segments(<path>, [<rotated>]), state)
+#         controller_log.write_daily_csv(<CSV file>, datestamps, time_on_hours, duty_cycle)
+
+# EXAMPLE CALLS
+# state = controller_log.load_checkpoint("analysis.checkpoint", "control_temp.log") or controller_log.new_checkpoint("control_temp.log")
+# log_tail = controller_log.scan_log("control_temp.log", state)
+# log_tail = controller_log.scan_segments(controller_log.log_segments("/var/log/temperature-controller/control_temp.log", True), state)
+# controller_log.save_checkpoint("analysis.checkpoint", "control_temp.log", state)
+# time_on = controller_log.daily_on_time(state, log_tail, start_time, num_days)
+# controller_log.write_daily_csv("controller_analysis.csv", ["20200629", "20200630"], [13.26, 14.22], [55.25, 59.25])
+
+# INPUTS
+# <log file> controller log written by control_temp.py (timestamps in current "YYYY-MM-DD-HH:MM:SS" or legacy "YYYY-MM-DD-HH-MM-SS" format)
+# <checkpoint file> JSON file holding state from previous scan, so only lines appended since then are parsed
+# <end> midnight (unix timestamp) to stop parsing at - default end of log.  With offset, day and midnight_status of checkpoint state set from
+#   log_index.py, only the days being analysed are parsed
+# <path> controller log, glob pattern (e.g. "/var/log/temperature-controller/control_temp.log*") or directory (control_temp.log and its rotated
+#   logs) - with <rotated> True, rotated logs of controller log (<log>.1, <log>.2.gz ...) are included.  Logs ending .gz are decompressed as read
+
+# OUTPUTS
+# Log is read once line by line, carrying system status over each midnight - scan_log() applies first line of each day and switching events as
+# they are read, so memory used does not depend on length of log
+# scan_segments() reads log segments (e.g. current and rotated logs) in parallel processes, each keeping its events, then carries status from each
+# segment to the next, giving the same results as scan_log() of one log holding all segments
+# Checkpoint state (dictionary, saved as JSON):
+#   offset/lines: position of first line of last (incomplete) day in log, day: midnight at start of that day, midnight_status: status at that midnight (-1 unknown)
+#   days_start/on_seconds: seconds on for every complete day in log from days_start, first_switch_day: midnight at start of day of first switching event
+#   first_line: first line of log, inode/check: log inode and log bytes preceding offset (to detect log truncated or rotated)
+# scan_log() returns line count, last line, current status and seconds on so far for last day in log
+# write_daily_csv() writes CSV of hours and % on for each day (YYYYMMDD datestamps), as saved by controller_analyse.py
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - scan_log() can stop at a given day, for analysis of a date range located with log_index.py
+# 10/2026 - Added scan_segments() to analyse rotated and gzip compressed logs, read in parallel
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import re
+import glob
+import gzip
+import json
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+import log_timestamps
+
+CHECKPOINT_VERSION = 1
+# Name of controller log in a log directory given to log_segments()
+DEFAULT_LOG_NAME = "control_temp.log"
+
+# Empty checkpoint state - log is parsed from the beginning
+def new_checkpoint(log_file):
+  return {"version": CHECKPOINT_VERSION, "log_file": os.path.abspath(log_file), "inode": None, "offset": 0, "check": "", "lines": 0,
+          "first_line": "", "first_switch_day": None, "day": None, "midnight_status": -1, "days_start": None, "on_seconds": []}
+
+# Bytes of log immediately before offset, as hex string
+def checkpoint_check(f, offset):
+  f.seek(max(0, offset - 64))
+  return f.read(offset - max(0, offset - 64)).hex()
+
+# Read checkpoint - returns None (full rebuild) if there is no valid checkpoint for this log, or log has been truncated or rotated since checkpoint
+def load_checkpoint(checkpoint_file, log_file):
+  if not os.path.isfile(checkpoint_file):
+    return None
+  try:
+    with open(checkpoint_file, 'r') as f:
+      state = json.load(f)
+    if state.get("version") != CHECKPOINT_VERSION or state["log_file"] != os.path.abspath(log_file):
+      print("WARNING: Checkpoint %s is not for this log file - analysing full log" % checkpoint_file)
+      return None
+    with open(log_file, 'rb') as f:
+      log_stat = os.fstat(f.fileno())
+      if log_stat.st_ino != state["inode"] or log_stat.st_size < state["offset"] or checkpoint_check(f, state["offset"]) != state["check"]:
+        print("WARNING: Log file truncated or rotated since checkpoint - analysing full log")
+        return None
+  except (OSError, ValueError, KeyError, TypeError) as e:
+    print("WARNING: Cannot read checkpoint %s - analysing full log (%s)" % (checkpoint_file, str(e)))
+    return None
+  return state
+
+# Write checkpoint atomically, so an interrupted run leaves previous checkpoint intact
+def save_checkpoint(checkpoint_file, log_file, state):
+  with open(log_file, 'rb') as f:
+    state["inode"] = os.fstat(f.fileno()).st_ino
+    state["check"] = checkpoint_check(f, state["offset"])
+  with open(checkpoint_file + ".tmp", 'w') as f:
+    json.dump(state, f)
+  os.replace(checkpoint_file + ".tmp", checkpoint_file)
+
+# Generator of (byte offset, line, timestamp) for each line of open log file (binary mode) from current position - timestamp is None for lines without valid timestamp
+def log_lines(f):
+  offset = f.tell()
+  for raw_line in f:
+    line = raw_line.decode('utf-8', 'replace')
+    yield offset, line, log_timestamps.parse_log_timestamp(line)
+    offset += len(raw_line)
+
+# Open log for reading (binary mode) - gzip compressed logs (.gz, e.g. compressed by logrotate) are decompressed as they are read
+def open_log(log_file):
+  if log_file.endswith(".gz"):
+    return gzip.open(log_file, 'rb')
+  return open(log_file, 'rb')
+
+# Read log from current position of open log file (binary mode), keeping only the lines analysis depends on - first line of each day and
+# switching events - as events (offset, line number from start of read, timestamp, day, switching, switched on, switched off)
+# Events are a generator reading the log as they are consumed - line count, first and last line of summary are updated as it is read
+# If end (midnight) is given, reading stops at first line on or after end, which is kept as last event
+def read_events(f, end=None):
+  summary = {"lines": 0, "first_line": "", "last_line": ""}
+  summary["events"] = _events(f, end, summary)
+  return summary
+
+# Generator of events for read_events()
+def _events(f, end, summary):
+  day = None
+  for offset, line, line_time in log_lines(f):
+    if summary["lines"] == 0:
+      summary["first_line"] = line
+    if line_time != None:
+      line_day = line_time - line_time % 86400
+      if end != None and line_day >= end:
+        yield (offset, summary["lines"], line_time, line_day, False, False, False)
+        return
+      switching = "Switching system" in line
+      if switching or day == None or line_day > day:
+        yield (offset, summary["lines"], line_time, line_day, switching, "Switching system on" in line, "Switching system off" in line)
+        day = line_day if day == None else max(day, line_day)
+    summary["lines"] += 1
+    summary["last_line"] = line
+
+# Read events of whole log segment (e.g. rotated log) - run in worker processes by scan_segments(), so events are kept as a list
+def read_segment(log_file):
+  with open_log(log_file) as f:
+    summary = read_events(f)
+    summary["events"] = list(summary["events"])
+  return summary
+
+# Apply events of one or more consecutive logs (from read_events()) to checkpoint state, carrying status over each midnight and from each log
+# to the next - adds seconds on for each newly completed day, and moves checkpoint to start of last (incomplete) day
+# Returns line count, last line, status and seconds on so far for that day.  If end is given, stops at first event on or after end
+def apply_events(state, summaries, end=None):
+  lines = state["lines"]
+  day = state["day"]
+  status = state["midnight_status"]
+  last_on = day
+  on_seconds = 0
+  last_line = ""
+  for summary in summaries:
+    for offset, line_number, line_time, line_day, switching, switched_on, switched_off in summary["events"]:
+      if day == None:
+        day = line_day
+        state["days_start"] = day
+      while line_day > day:
+        # Day rollover - complete previous day, status is held over midnight
+        if status == 1:
+          on_seconds += day + 86400 - last_on
+        state["on_seconds"].append(on_seconds)
+        day += 86400
+        last_on = day
+        on_seconds = 0
+        state["day"] = day
+        state["midnight_status"] = status
+        state["offset"] = offset
+        state["lines"] = lines + line_number
+      if end != None and line_day >= end:
+        break
+      if switching and state["first_switch_day"] == None:
+        state["first_switch_day"] = line_day
+      if switched_on:
+        if status != 1:
+          last_on = line_time
+        status = 1
+      if switched_off:
+        if status == 1:
+          on_seconds += line_time - last_on
+        status = 0
+    # First line is only known once events have been read
+    if lines == 0 and summary["first_line"]:
+      state["first_line"] = summary["first_line"]
+    lines += summary["lines"]
+    if summary["lines"] > 0:
+      last_line = summary["last_line"]
+  if state["day"] == None:
+    state["day"] = day
+  return {"lines": lines, "last_line": last_line, "status": status, "last_on": last_on, "on_seconds": on_seconds}
+
+# Parse log from checkpoint offset to end, adding seconds on for each newly completed day to checkpoint state
+# Checkpoint is moved to start of last (incomplete) day in log - returns line count, last line, status and seconds on so far for that day
+# If end (midnight) is given, parsing stops at first line on or after end, once all days before it are complete
+def scan_log(log_file, state, end=None):
+  with open(log_file, 'rb') as f:
+    f.seek(state["offset"])
+    # Events are applied as read, so are not all held in memory
+    return apply_events(state, [read_events(f, end)], end)
+
+# Parse log segments (oldest first, e.g. from log_segments()) as one log - segments are read in parallel in separate processes on multi-core
+# systems, then status is carried from each segment to the next.  Returns as scan_log() - checkpoint state offset is not meaningful
+def scan_segments(log_files, state, jobs=None):
+  if jobs == None:
+    jobs = min(len(log_files), os.cpu_count() or 1)
+  if jobs <= 1:
+    summaries = [read_segment(log_file) for log_file in log_files]
+  else:
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+      summaries = list(pool.map(read_segment, log_files))
+  return apply_events(state, summaries)
+
+# Rotation number of log segment - N for <log>.N or <log>.N.gz, 0 if not rotated
+def _rotation(log_file):
+  match = re.search(r'\.(\d+)(\.gz)?$', log_file)
+  return int(match.group(1)) if match else 0
+
+# Timestamp of first line of log segment with a valid timestamp (None if there is none near start of log)
+def _segment_start(log_file):
+  with open_log(log_file) as f:
+    for offset, line, line_time in islice(log_lines(f), 1000):
+      if line_time != None:
+        return line_time
+  return None
+
+# Log segments to analyse as one log, oldest first - <path> may be a log file (with its rotated logs <log>.N and <log>.N.gz if rotated is True),
+# a glob pattern, or a directory (control_temp.log and its rotated logs in directory).  Segments are ordered by first timestamp in each,
+# then by rotation number.  Sidecar files (.idx) and temporary files (.tmp) are ignored - returns empty list if no logs are found
+def log_segments(path, rotated=False):
+  if os.path.isdir(path):
+    path = os.path.join(path, DEFAULT_LOG_NAME)
+    rotated = True
+  if any(character in path for character in "*?["):
+    log_files = glob.glob(path)
+  else:
+    log_files = [path]
+    if rotated:
+      pattern = re.compile(re.escape(os.path.basename(path)) + r'\.\d+(\.gz)?$')
+      log_files += [os.path.join(os.path.dirname(path), name) for name in os.listdir(os.path.dirname(path) or ".") if pattern.match(name)]
+  log_files = [log_file for log_file in log_files if os.path.isfile(log_file) and not log_file.endswith((".idx", ".tmp"))]
+  starts = {log_file: _segment_start(log_file) for log_file in log_files}
+  return sorted(log_files, key=lambda log_file: (starts[log_file] == None, starts[log_file] or 0, -_rotation(log_file)))
+
+# Seconds on for each of num_days days from midnight start_time - complete days from checkpoint state, then last day in log
+# (assuming status held until midnight), then days after end of log with status held from end of log
+def daily_on_time(state, log_tail, start_time, num_days):
+  time_on = []
+  for day in range(start_time, start_time + num_days * 86400, 86400):
+    if day < state["day"]:
+      time_on.append(state["on_seconds"][int((day - state["days_start"]) / 86400)])
+    elif day == state["day"]:
+      todays_total = log_tail["on_seconds"]
+      if log_tail["status"] == 1:
+        todays_total += day + 86400 - log_tail["last_on"]
+      time_on.append(todays_total)
+    else:
+      time_on.append(log_tail["status"] * 86400)
+  return time_on
+
+# Write CSV of time on (hours and %) for each day
+def write_daily_csv(filename, datestamps, time_on_hours, duty_cycle):
+  with open(filename, "w") as f:
+    f.write("Standard Date,Date,Time ON (hours),Time ON (%)\n")
+    for line, hours, percent in zip(datestamps, time_on_hours, duty_cycle):
+      f.write("%s,%s/%s/%s,%s,%s\n" %(line, line[6:8],line[4:6],line[0:4], "{:.2f}".format(hours), "{:.2f}".format(percent)))
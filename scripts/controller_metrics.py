@@ -0,0 +1,181 @@
+# Counters and histograms of temperature controller timing, exported in Prometheus text format - used by control_temp.py
+
+# SYNTAX: import controller_metrics
+#         metrics = controller_metrics.Registry()
+#         <counter> = metrics.counter(<name>, <help>, [<label names>])
+#         <histogram> = metrics.histogram(<name>, <help>, <buckets>, [<label names>])
+
+# EXAMPLE CALLS
+# metrics = controller_metrics.Registry()
+# reads = metrics.histogram("sensor_read_seconds", "Time to read sensor", [0.01, 0.1, 1], ["sensor"])
+# start = controller_metrics.timer()
+# <read sensor>
+# reads.observe(controller_metrics.timer() - start, sensor="28-0300a2796e9e")
+# metrics.write_textfile("/var/lib/node_exporter/textfile_collector/temperature_controller.prom")
+# metrics.serve(9101)
+
+# INPUTS
+# <name> metric name, prefixed with "temperature_controller_" on export (counters should end in _total, times in _seconds)
+# <help> description of metric, <buckets> upper bounds of histogram buckets (a +Inf bucket is always added)
+# <label names> names of labels each value of metric is recorded against (e.g. sensor ID, channel name) - label values are given as keyword arguments
+#   to inc() / observe()
+
+# OUTPUTS
+# render() - all metrics in Prometheus text exposition format (version 0.0.4)
+# write_textfile(<filename>) - write metrics for node_exporter textfile collector (filename must end .prom) - written to a temporary file then
+#   renamed, so the collector never reads a partly written file
+# serve(<port>, [<address>]) - serve metrics at http://<address>:<port>/metrics from a background (daemon) thread, default address 127.0.0.1
+# Recording a value is a dictionary lookup and a few additions under a lock (a few microseconds), so metrics are always collected - sensor reads
+#   may be recorded from reader threads.  Times should be measured with timer() (real time, high resolution - not affected by simulated clock)
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import bisect
+import threading
+import http.server
+from time import perf_counter as timer
+
+PREFIX = "temperature_controller_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Escape label value for text format
+def _escape(value):
+  return value.replace("\\", "\\\\").replace("\n", "\\n").replace("\"", "\\\"")
+
+# Format label set (list of (name, value) pairs) as {name="value",...}
+def _labels(pairs):
+  if not pairs:
+    return ""
+  return "{" + ",".join(['%s="%s"' % (name, _escape(value)) for name, value in pairs]) + "}"
+
+# Format number as in Prometheus text format
+def _number(value):
+  if value == float("inf"):
+    return "+Inf"
+  return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+  def __init__(self, name, help, labelnames=()):
+    self.name = PREFIX + name
+    self.help = help
+    self.labelnames = tuple(labelnames)
+    self.values = {}
+    self.lock = threading.Lock()
+
+  def inc(self, value=1, **labels):
+    key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+    with self.lock:
+      self.values[key] = self.values.get(key, 0) + value
+
+  def render(self):
+    lines = ["# HELP %s %s" % (self.name, self.help), "# TYPE %s counter" % self.name]
+    with self.lock:
+      for key, value in sorted(self.values.items()):
+        lines.append("%s%s %s" % (self.name, _labels(list(zip(self.labelnames, key))), _number(value)))
+    return lines
+
+class Histogram:
+  def __init__(self, name, help, buckets, labelnames=()):
+    self.name = PREFIX + name
+    self.help = help
+    self.buckets = sorted(buckets)
+    self.labelnames = tuple(labelnames)
+    # For each label set: count in each bucket (not cumulative, last is +Inf), sum and count of observations
+    self.values = {}
+    self.lock = threading.Lock()
+
+  def observe(self, value, **labels):
+    key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+    with self.lock:
+      counts = self.values.get(key)
+      if counts == None:
+        counts = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+      counts[0][bisect.bisect_left(self.buckets, value)] += 1
+      counts[1] += value
+      counts[2] += 1
+
+  def render(self):
+    lines = ["# HELP %s %s" % (self.name, self.help), "# TYPE %s histogram" % self.name]
+    with self.lock:
+      for key, (buckets, total, count) in sorted(self.values.items()):
+        pairs = list(zip(self.labelnames, key))
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + [float("inf")], buckets):
+          cumulative += bucket_count
+          lines.append("%s_bucket%s %d" % (self.name, _labels(pairs + [("le", _number(float(bound)))]), cumulative))
+        lines.append("%s_sum%s %s" % (self.name, _labels(pairs), repr(total)))
+        lines.append("%s_count%s %d" % (self.name, _labels(pairs), count))
+    return lines
+
+class Registry:
+  def __init__(self):
+    self.metrics = []
+    self.server = None
+
+  def counter(self, name, help, labelnames=()):
+    self.metrics.append(Counter(name, help, labelnames))
+    return self.metrics[-1]
+
+  def histogram(self, name, help, buckets, labelnames=()):
+    self.metrics.append(Histogram(name, help, buckets, labelnames))
+    return self.metrics[-1]
+
+  def render(self):
+    lines = []
+    for metric in self.metrics:
+      lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+  # Write metrics to file for node_exporter textfile collector - temporary file in same directory is renamed over target
+  def write_textfile(self, filename):
+    temp_file = "%s.%d.tmp" % (filename, os.getpid())
+    try:
+      with open(temp_file, 'w') as f:
+        f.write(self.render())
+      os.replace(temp_file, filename)
+    except OSError:
+      try:
+        os.remove(temp_file)
+      except OSError:
+        pass
+      raise
+
+  # Serve metrics over HTTP from a daemon thread - raises OSError if port cannot be bound
+  def serve(self, port, address="127.0.0.1"):
+    registry = self
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+      def do_GET(self):
+        if self.path.split("?")[0] not in ["/", "/metrics"]:
+          self.send_error(404)
+          return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      # Requests are not logged - controller output is kept to status changes
+      def log_message(self, format, *args):
+        pass
+
+    self.server = http.server.ThreadingHTTPServer((address, port), MetricsHandler)
+    self.server.daemon_threads = True
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
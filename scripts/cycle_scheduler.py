@@ -0,0 +1,104 @@
+# Deadline based cycle scheduler for temperature controller - control cycles start on a fixed time grid, without drift from time taken by each cycle
+
+# SYNTAX: import cycle_scheduler
+#         scheduler = cycle_scheduler.CycleScheduler(<interval>, [<overrun>])
+#         scheduler.wait()
+
+# EXAMPLE CALLS
+# scheduler = cycle_scheduler.CycleScheduler(10)
+# while True:
+#   <control cycle>
+#   scheduler.wait()
+#   if scheduler.overrun:
+#     print("%d cycle(s) skipped" % scheduler.skipped)
+
+# INPUTS
+# <interval> period of control cycles (s)
+# <overrun> what to do if a cycle takes longer than <interval> (deadline of next cycle already passed): 'skip' (default) - missed cycles are
+#   dropped and next cycle starts at next deadline on the grid, 'coalesce' - one cycle runs immediately in place of all missed cycles, then
+#   cycles continue on the grid
+
+# OUTPUTS
+# wait() sleeps until deadline of next cycle.  Deadlines are multiples of <interval> since the unix epoch (e.g. :00, :10, :20 for 10 s interval), so
+#   every controller on a host (or hosts with synchronised clocks) with the same interval samples at the same times.  Deadlines are kept on the
+#   monotonic clock after the first, so changes to system time (NTP steps) do not shift or stall the grid
+# Measurements of the last cycle, updated by wait():
+#   jitter - time (s) cycle started after its deadline (sleep overshoot, or lateness of coalesced cycle)
+#   overrun - time (s) the cycle ended after next deadline (0 if cycle finished in time)
+#   skipped - number of deadlines missed by the cycle (0 if finished in time)
+# Totals since start: cycles, overruns (cycles which overran), skipped_total (deadlines missed), max_jitter (s)
+# Time is taken from clock.py, so scheduler follows simulated time in test harness
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import math
+import clock
+
+OVERRUN_MODES = ['skip', 'coalesce']
+
+class CycleScheduler:
+  def __init__(self, interval, overrun='skip'):
+    if interval <= 0:
+      raise ValueError("Cycle interval must be greater than zero")
+    if overrun not in OVERRUN_MODES:
+      raise ValueError("Unknown overrun mode "+str(overrun)+" - must be one of "+', '.join(OVERRUN_MODES))
+    self.interval = interval
+    self.overrun_mode = overrun
+    # First deadline is next multiple of interval in unix time, converted to monotonic clock
+    now = clock.time()
+    self.deadline = clock.monotonic() + (math.floor(now / interval) + 1) * interval - now
+    self.jitter = 0
+    self.overrun = 0
+    self.skipped = 0
+    self.cycles = 0
+    self.overruns = 0
+    self.skipped_total = 0
+    self.max_jitter = 0
+
+  # Wait for deadline of next cycle - deadlines missed by an overrunning cycle are skipped, or coalesced into one cycle started immediately
+  def wait(self):
+    self.cycles += 1
+    now = clock.monotonic()
+    self.overrun = max(0, now - self.deadline)
+    self.skipped = 0
+    if self.overrun > 0:
+      # Number of deadlines passed while cycle was running
+      missed = int(self.overrun / self.interval) + 1
+      self.overruns += 1
+      if self.overrun_mode == 'coalesce':
+        # Start one cycle now for the latest missed deadline - deadlines before it are skipped
+        self.skipped = missed - 1
+        self.deadline += (missed - 1) * self.interval
+        self.jitter = now - self.deadline
+        self.deadline += self.interval
+      else:
+        self.skipped = missed
+        self.deadline += missed * self.interval
+        self.jitter = self.sleep_until(self.deadline)
+        self.deadline += self.interval
+      self.skipped_total += self.skipped
+    else:
+      self.jitter = self.sleep_until(self.deadline)
+      self.deadline += self.interval
+    self.max_jitter = max(self.max_jitter, self.jitter)
+
+  # Sleep until monotonic time deadline - returns time woken after deadline
+  def sleep_until(self, deadline):
+    clock.sleep(max(0, deadline - clock.monotonic()))
+    return max(0, clock.monotonic() - deadline)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+# Analyse temperature data logs produced by control_temp.py, generating daily temperature and control performance stats for every channel
+
+# SYNTAX: ./data_analyse.py [--hysteresis <temperature>] [--maxgap <seconds>] [--index <index file> | --no-index] <full filename and path of data log> [<start time> <end time> <output directory>]
+
+# EXAMPLE CALLS
+# ./data_analyse.py /var/log/temperature-controller/temperature_data.csv
+# ./data_analyse.py --hysteresis 0.5 /var/log/temperature-controller/temperature_data.csv "2020-01-01" "2020-04-01" /var/log/temperature-controller
+
+# INPUTS
+# <full filename and path of data log> must be specified - CSV data log (default format) or binary data log (--logformat binary) - legacy format is not supported
+# If <start time> / <end time> are not specified default all days in data log - format as for controller_analyse.py (YYYY-MM-DD or unix timestamp)
+# If <output directory> is not specified outputs will be written to directory from which script is run
+# --hysteresis should match controller setting (default 0.1 C, same as control_temp.py)
+# --maxgap limits time any one sample represents, so gaps in data log (e.g. controller stopped) are not counted (default 60 s)
+# --index sidecar day index of data log (see log_index.py) - default <data log>.idx, created on first use and updated with rows appended since.
+#   If <start time> or <end time> is given only rows of the days analysed are read, so a short period of a long log is quick to analyse
+# --no-index read full data log (index is not used or updated)
+
+# OUTPUTS
+# CSV file with one row per day, and for each temperature channel (sensor label in data log header):
+#   min, max and mean temperature (C), time within +/- hysteresis of setpoint (%), overshoot and undershoot (C.h - integral of temperature
+#   above setpoint + hysteresis / below setpoint - hysteresis), and number of dropouts (failed sensor reads)
+# followed by demand duty cycle (%) and number of samples.  Fields with no valid data are left empty
+# Each sample is weighted by time since previous sample (limited to --maxgap).  Data log is processed in chunks using NumPy, so memory used
+# does not depend on length of log
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Only days in requested period are read, located with sidecar day index
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import time
+import calendar
+import argparse
+from time import gmtime, strftime
+import data_log
+import log_index
+try:
+  import numpy as np
+except ImportError:
+  print("ERROR: data analysis requires NumPy - install with 'sudo pip3 install numpy' (installed with matplotlib by install.sh)")
+  sys.exit(1)
+
+# Daily totals accumulated for each channel - min/max are combined with fmin/fmax, all other fields are summed
+CHANNEL_FIELDS = ['min', 'max', 'sum', 'count', 'valid_seconds', 'band_seconds', 'overshoot', 'undershoot', 'dropouts']
+
+# Allow all group users to write to files created by this script
+oldmask = os.umask(0o002)
+
+# Add stats of one chunk of samples to daily totals - days is dictionary of day (unix timestamp of midnight) -> totals
+def accumulate(days, timestamps, setpoints, temps, demand, weights, hysteresis):
+  day = timestamps - timestamps % 86400
+  # Samples are in time order, so split into runs of samples on the same day
+  starts = np.concatenate(([0], np.flatnonzero(np.diff(day)) + 1))
+  valid = ~np.isnan(temps)
+  valid_weights = np.where(valid, weights, 0)
+  error = temps - setpoints
+  stats = {
+    'min': np.fmin.reduceat(temps, starts, axis=1),
+    'max': np.fmax.reduceat(temps, starts, axis=1),
+    'sum': np.add.reduceat(np.where(valid, temps, 0), starts, axis=1),
+    'count': np.add.reduceat(valid, starts, axis=1),
+    'valid_seconds': np.add.reduceat(valid_weights, starts, axis=1),
+    'band_seconds': np.add.reduceat(np.where(valid & (np.abs(error) <= hysteresis), weights, 0), starts, axis=1),
+    'overshoot': np.add.reduceat(valid_weights * np.clip(np.nan_to_num(error) - hysteresis, 0, None), starts, axis=1) / 3600,
+    'undershoot': np.add.reduceat(valid_weights * np.clip(-np.nan_to_num(error) - hysteresis, 0, None), starts, axis=1) / 3600,
+    'dropouts': np.add.reduceat(~valid, starts, axis=1),
+  }
+  demand_valid = ~np.isnan(demand)
+  demand_seconds = np.add.reduceat(np.where(demand_valid, weights, 0), starts)
+  on_seconds = np.add.reduceat(np.where(demand_valid, weights * np.nan_to_num(demand), 0), starts)
+  samples = np.diff(np.append(starts, len(day)))
+  for ii, start in enumerate(starts):
+    totals = days.get(day[start])
+    if totals == None:
+      totals = {field: stats[field][:, ii] for field in CHANNEL_FIELDS}
+      totals['demand_seconds'] = demand_seconds[ii]
+      totals['on_seconds'] = on_seconds[ii]
+      totals['samples'] = samples[ii]
+      days[day[start]] = totals
+    else:
+      totals['min'] = np.fmin(totals['min'], stats['min'][:, ii])
+      totals['max'] = np.fmax(totals['max'], stats['max'][:, ii])
+      for field in CHANNEL_FIELDS[2:]:
+        totals[field] = totals[field] + stats[field][:, ii]
+      totals['demand_seconds'] += demand_seconds[ii]
+      totals['on_seconds'] += on_seconds[ii]
+      totals['samples'] += samples[ii]
+
+# Format value to 2 d.p. - empty if no valid data
+def format_value(value):
+  if np.isnan(value):
+    return ""
+  return "{:.2f}".format(value)
+
+# Parse start/end time argument (YYYY-MM-DD or unix timestamp) - returns None if not specified or invalid
+def parse_time_argument(value, name):
+  if value == None:
+    return None
+  if str.isdigit(value):
+    return int(value)
+  try:
+    return calendar.timegm(time.strptime(value, "%Y-%m-%d"))
+  except ValueError:
+    print("WARNING: Invalid %s date specified - using default (all available data)" % name)
+    return None
+
+print(strftime("%Y-%m-%d-%H:%M:%S: Starting temperature data log analysis", gmtime()))
+parser = argparse.ArgumentParser(description='Analyse temperature data logs produced by control_temp.py, generating daily stats for every channel')
+parser.add_argument('data_file', help='Full filename and path of CSV or binary data log')
+parser.add_argument('start', nargs='?', help='Start of analysis - YYYY-MM-DD or unix timestamp (default all available data)')
+parser.add_argument('end', nargs='?', help='End of analysis - YYYY-MM-DD or unix timestamp (default all available data)')
+parser.add_argument('output_dir', nargs='?', default="", help='Output directory (default current directory)')
+parser.add_argument('--hysteresis', '-t', type=float, default=0.1, metavar='TEMPERATURE',
+  help='Hystersis used by controller (C) - temperature within +/- hysteresis of setpoint is counted as in band - default: 0.1')
+parser.add_argument('--maxgap', '-g', type=float, default=60, metavar='SECONDS',
+  help='Maximum time represented by one sample (s) - longer gaps between samples are not counted - default: 60')
+parser.add_argument('--index', '-i', type=str, metavar='FILENAME', help='Sidecar day index of data log, created or updated if needed - default: <data log>.idx')
+parser.add_argument('--no-index', '-n', action='store_true', help='Read full data log instead of only the days requested')
+args = parser.parse_args()
+
+requested_start = parse_time_argument(args.start, "start")
+requested_end = parse_time_argument(args.end, "end")
+output_dir = args.output_dir
+if output_dir and output_dir[-1] != "/":
+  output_dir = output_dir + "/"
+
+print("Analysing data log:  %s" % args.data_file)
+try:
+  offset = None
+  end = None
+  if (requested_start != None or requested_end != None) and not args.no_index:
+    # Only read rows of days being analysed (and last row before them, which first sample is weighted from), located with sidecar index
+    index = log_index.update(args.data_file, "data", args.index)
+    if requested_start != None:
+      position = log_index.day_position(index, requested_start - requested_start % 86400)
+      offset = index["offset"] if position == len(index["days"]) else (index["days"][position][3] or index["days"][position][1])
+    if requested_end != None:
+      position = log_index.day_position(index, requested_end)
+      end = None if position == len(index["days"]) else index["days"][position][1]
+  labels, chunks = data_log.read_data_log_chunks(args.data_file, offset, end=end)
+except (OSError, ValueError) as e:
+  print("ERROR: Cannot read data log %s - %s" % (args.data_file, str(e)))
+  os.umask(oldmask)
+  sys.exit(1)
+print("Channels: %s" % ', '.join(labels))
+
+days = {}
+num_samples = 0
+last_timestamp = None
+for timestamps, setpoints, temps, demand, offset in chunks:
+  if len(timestamps) == 0:
+    continue
+  # Weight each sample by time since previous sample (including last sample of previous chunk)
+  previous = np.concatenate(([timestamps[0] if last_timestamp == None else last_timestamp], timestamps[:-1]))
+  weights = np.clip(timestamps - previous, 0, None).astype(np.float64)
+  weights[weights > args.maxgap] = args.maxgap
+  last_timestamp = timestamps[-1]
+  accumulate(days, timestamps, setpoints, temps, demand, weights, args.hysteresis)
+  num_samples += len(timestamps)
+
+analysis_days = sorted(day for day in days if (requested_start == None or day >= requested_start - requested_start % 86400) and (requested_end == None or day < requested_end))
+if not analysis_days:
+  print("ERROR: data log contains no data in requested period")
+  os.umask(oldmask)
+  sys.exit(1)
+print("Read %d samples, analysing %d days from %s to %s" % (num_samples, len(analysis_days), strftime("%Y-%m-%d", gmtime(analysis_days[0])), strftime("%Y-%m-%d", gmtime(analysis_days[-1]))))
+
+file_timestamp = output_dir + strftime("%Y%m%d_%H%M%S", gmtime())
+data_filename = file_timestamp + "_data_analysis.csv"
+print("Saving csv of results to %s" % data_filename)
+with open(data_filename, "w") as f:
+  header = "Standard Date,Date"
+  for label in labels:
+    header += ",%s Min (C),%s Max (C),%s Mean (C),%s In Band (%%),%s Overshoot (C.h),%s Undershoot (C.h),%s Dropouts" % ((label,) * 7)
+  f.write(header + ",Duty Cycle (%),Samples\n")
+  with np.errstate(invalid='ignore', divide='ignore'):
+    for day in analysis_days:
+      totals = days[day]
+      fields = [strftime("%Y%m%d", gmtime(day)), strftime("%d/%m/%Y", gmtime(day))]
+      mean = totals['sum'] / totals['count']
+      in_band = totals['band_seconds'] / totals['valid_seconds'] * 100
+      for ii in range(len(labels)):
+        fields += [format_value(totals['min'][ii]), format_value(totals['max'][ii]), format_value(mean[ii]), format_value(in_band[ii]),
+                   format_value(totals['overshoot'][ii]), format_value(totals['undershoot'][ii]), str(int(totals['dropouts'][ii]))]
+      fields += [format_value(totals['on_seconds'] / totals['demand_seconds'] * 100), str(totals['samples'])]
+      f.write(','.join(fields) + "\n")
+
+# Put back umask
+os.umask(oldmask)
+print(strftime("%Y-%m-%d-%H:%M:%S: Completed temperature data log analysis", gmtime()))
@@ -0,0 +1,356 @@
+# Temperature data log writer and binary data log format for temperature controller - used by control_temp.py to write data logs with minimal file-system overhead
+
+# SYNTAX: import data_log
+#         writer = data_log.DataLogWriter(<filename>, [<header>, <flush rows>, <flush interval>, <fsync>, <binary>, <warn>])
+
+# EXAMPLE CALLS
+# writer = data_log.DataLogWriter("temperature_data.csv", "Timestamp,Setpoint (C),Current Temperature (C),Demand Status (0/1)\n", flush_rows=6, flush_interval=60)
+# writer.write("2020-06-28 20:58:29,27.0,26.562,1\n")
+# writer.close()
+# writer = data_log.DataLogWriter("temperature_data.bin", data_log.binary_header(["Current"]), binary=True)
+# writer.write(data_log.binary_record(1593377909, 27.0, [26.562], 1))
+# labels, data = data_log.binary_log_memmap("temperature_data.bin")
+# labels, chunks = data_log.read_data_log_chunks("temperature_data.csv")
+
+# INPUTS
+# <filename> full path of data log - opened in append mode and kept open
+# <header> optional header written once if file is new or empty
+# <flush rows> number of rows buffered before writing to file (default 1 - every row written immediately)
+# <flush interval> maximum time in seconds rows are buffered before writing, 0 to disable (default 0)
+# <fsync> if True, file is synced to storage after every flush (default False - left to OS)
+# <binary> if True, header and rows are bytes (binary data log format) instead of text (default False)
+# <warn> function called with WARNING message if writer has to repair log or discard rows (default print)
+
+# OUTPUTS
+# Rows appended to data log.  The file is checked for rotation/removal (e.g. by logrotate) at most once every ROTATION_CHECK_INTERVAL seconds,
+# and if the file has been moved or deleted a new file is created (with header) before writing - rows written in between go to the rotated file
+# write() / flush() / close() raise OSError if data cannot be written - rows not written are kept in buffer and retried at next flush.  If more than
+# MAX_BUFFER_ROWS are held the oldest are discarded, with a WARNING when rows are first discarded and the number discarded once rows are written again
+
+# BINARY DATA LOG FORMAT
+# Compact alternative to CSV data log - fixed size little-endian records, so file can be read without parsing (e.g. zero-copy with numpy.memmap)
+# Header:  8 bytes magic "RTCBLOG1", uint32 header length (bytes, including padding), uint16 format version, uint16 number of channels N,
+#          then for each channel uint16 label length + UTF-8 label, zero padded to multiple of 8 bytes
+# Records: int64 unix timestamp (UTC), float32 setpoint (C), N x float32 temperatures (C, NaN if sensor read failed), uint8 demand status (255 if unknown)
+# A partially written record at end of file (e.g. power loss during write) is ignored by readers, and removed by DataLogWriter when the log is
+#   next opened (with a WARNING) so records appended after it stay aligned
+# Use binlog_export.py to convert to Excel-friendly CSV in same format as CSV data log
+
+# READING DATA LOGS WITH NUMPY
+# read_data_log_chunks() reads CSV or binary data log into NumPy arrays in chunks, and returns byte offset reached after each chunk so
+# reading can be resumed from that point when more rows have been appended, and can stop at an end offset (e.g. first row of a day from
+# log_index.py) so only a date range is read.  NumPy is only imported when these functions are used
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Flush interval timed with clock.py, so data logs follow simulated time in test harness
+# 10/2026 - read_data_log_chunks() can stop at an end offset
+# 10/2026 - Partial record at end of binary data log removed when log is opened
+# 10/2026 - Rotation checked at most once every ROTATION_CHECK_INTERVAL, not every flush
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import errno
+import bisect
+import struct
+from itertools import islice, accumulate
+import log_timestamps
+import clock
+
+BINARY_MAGIC = b"RTCBLOG1"
+BINARY_VERSION = 1
+BINARY_UNKNOWN_DEMAND = 255
+
+# Number of data log rows read at once by read_data_log_chunks()
+CHUNK_ROWS = 100000
+
+# Minimum time (s) between checks of data log for rotation/removal - so writing a row costs a single write() in between
+ROTATION_CHECK_INTERVAL = 60
+
+# Limit on rows held in buffer if log cannot be written (e.g. storage full) - oldest rows are discarded first
+MAX_BUFFER_ROWS = 10000
+
+# Buffered writer for append-only data logs - file is kept open between writes and header is only checked when file is opened
+class DataLogWriter:
+  def __init__(self, filename, header=None, flush_rows=1, flush_interval=0, fsync=False, binary=False, warn=print):
+    self.filename = filename
+    self.binary = binary
+    self.warn = warn
+    self.header = header
+    self.flush_rows = max(1, int(flush_rows))
+    self.flush_interval = flush_interval
+    self.fsync = fsync
+    self.file = None
+    self.buffer = []
+    # Rows discarded from full buffer since data was last written
+    self.discarded = 0
+    self.last_flush = clock.monotonic()
+    self.last_rotation_check = self.last_flush
+
+  # Open file for append, writing header if file is new/empty
+  def _open(self):
+    if self.binary:
+      self.file = open(self.filename, 'ab+')
+    else:
+      self.file = open(self.filename, 'a')
+    if self.header and os.fstat(self.file.fileno()).st_size == 0:
+      self.file.write(self.header)
+    elif self.binary and self.header:
+      # Records of a different channel layout cannot be appended to existing binary log
+      self.file.seek(0)
+      existing_header = self.file.read(len(self.header))
+      if existing_header != self.header:
+        self._close_file()
+        raise OSError(errno.EINVAL, "Existing binary data log has different channels - move or delete old file", self.filename)
+      # Partial record at end of log (e.g. power loss during write) is removed, otherwise every record appended after it is misaligned
+      size = os.fstat(self.file.fileno()).st_size
+      partial = (size - len(self.header)) % binary_record_size(binary_header_channels(self.header))
+      if partial:
+        os.ftruncate(self.file.fileno(), size - partial)
+        self.warn("WARNING: Removed partial record (%d bytes) at end of binary data log %s" % (partial, self.filename))
+
+  def _close_file(self):
+    if self.file:
+      try:
+        self.file.close()
+      except OSError:
+        pass
+      self.file = None
+
+  # Check if open file is still the file at filename - returns False if it has been moved (rotated) or deleted
+  def _same_file(self):
+    try:
+      path_stat = os.stat(self.filename)
+    except OSError:
+      return False
+    open_stat = os.fstat(self.file.fileno())
+    return path_stat.st_ino == open_stat.st_ino and path_stat.st_dev == open_stat.st_dev
+
+  # Add row (string including line ending) to buffer, and flush if buffer is full or flush interval has passed
+  def write(self, row):
+    self.buffer.append(row)
+    if len(self.buffer) > MAX_BUFFER_ROWS:
+      del self.buffer[0]
+      if self.discarded == 0:
+        self.warn("WARNING: Data log buffer full (%d rows) - discarding oldest rows until %s can be written" % (MAX_BUFFER_ROWS, self.filename))
+      self.discarded += 1
+    if len(self.buffer) >= self.flush_rows or (self.flush_interval and clock.monotonic() - self.last_flush >= self.flush_interval):
+      self.flush()
+
+  # Write all buffered rows to file
+  def flush(self):
+    self.last_flush = clock.monotonic()
+    if not self.buffer:
+      return
+    if self.file and self.last_flush - self.last_rotation_check >= ROTATION_CHECK_INTERVAL:
+      self.last_rotation_check = self.last_flush
+      if not self._same_file():
+        # Logfile rotated or removed - continue in new file at same path
+        self._close_file()
+    try:
+      if not self.file:
+        self._open()
+        self.last_rotation_check = self.last_flush
+      if self.binary:
+        self.file.write(b''.join(self.buffer))
+      else:
+        self.file.write(''.join(self.buffer))
+      self.file.flush()
+      if self.fsync:
+        os.fsync(self.file.fileno())
+    except OSError:
+      # Re-open next time in case file/directory permissions or storage have changed
+      self._close_file()
+      raise
+    self.buffer = []
+    if self.discarded:
+      self.warn("WARNING: Discarded %d data log row(s) while %s could not be written" % (self.discarded, self.filename))
+      self.discarded = 0
+
+  # Flush remaining rows and close file
+  def close(self):
+    try:
+      self.flush()
+    finally:
+      self._close_file()
+
+# Create binary data log header for list of channel labels
+def binary_header(labels):
+  encoded_labels = b''.join([struct.pack('<H', len(label.encode('utf-8'))) + label.encode('utf-8') for label in labels])
+  header_length = len(BINARY_MAGIC) + 8 + len(encoded_labels)
+  header_length += -header_length % 8
+  header = BINARY_MAGIC + struct.pack('<IHH', header_length, BINARY_VERSION, len(labels)) + encoded_labels
+  return header + bytes(header_length - len(header))
+
+# struct format of a binary data log record for given number of channels
+def binary_record_format(num_channels):
+  return '<qf' + 'f' * num_channels + 'B'
+
+# Number of channels in binary data log header
+def binary_header_channels(header):
+  return struct.unpack_from('<H', header, len(BINARY_MAGIC) + 6)[0]
+
+# Size (bytes) of a binary data log record for given number of channels
+def binary_record_size(num_channels):
+  return struct.calcsize(binary_record_format(num_channels))
+
+# Create binary data log record - temperatures of "" or None are stored as NaN, demand of None as 255
+def binary_record(timestamp, setpoint, temps, demand):
+  temps = [float('nan') if temp == "" or temp == None else temp for temp in temps]
+  if demand == None:
+    demand = BINARY_UNKNOWN_DEMAND
+  return struct.pack(binary_record_format(len(temps)), int(timestamp), setpoint, *temps, demand)
+
+# Read header of binary data log from open file - returns list of channel labels and header length, raises ValueError if not a binary data log
+def read_binary_header(f):
+  fixed = f.read(len(BINARY_MAGIC) + 8)
+  if len(fixed) != len(BINARY_MAGIC) + 8 or fixed[0:len(BINARY_MAGIC)] != BINARY_MAGIC:
+    raise ValueError("Not a temperature controller binary data log")
+  header_length, version, num_channels = struct.unpack('<IHH', fixed[len(BINARY_MAGIC):])
+  if version != BINARY_VERSION:
+    raise ValueError("Unsupported binary data log version "+str(version))
+  encoded_labels = f.read(header_length - len(fixed))
+  labels = []
+  offset = 0
+  for ii in range(num_channels):
+    label_length = struct.unpack_from('<H', encoded_labels, offset)[0]
+    labels.append(encoded_labels[offset+2:offset+2+label_length].decode('utf-8'))
+    offset += 2 + label_length
+  return labels, header_length
+
+# Read binary data log record by record without numpy - returns list of channel labels and generator of (timestamp, setpoint, [temperatures], demand)
+def read_binary_log(filename):
+  f = open(filename, 'rb')
+  labels, header_length = read_binary_header(f)
+  record = struct.Struct(binary_record_format(len(labels)))
+  def records():
+    with f:
+      while True:
+        block = f.read(record.size * 4096)
+        whole_records = len(block) - len(block) % record.size
+        for fields in record.iter_unpack(block[0:whole_records]):
+          yield fields[0], fields[1], list(fields[2:-1]), fields[-1]
+        if len(block) < record.size * 4096:
+          break
+  return labels, records()
+
+# Map binary data log into numpy structured array without copying - fields 'timestamp', 'setpoint', 'temps' (one column per channel) and 'demand'
+def binary_log_memmap(filename):
+  import numpy as np
+  with open(filename, 'rb') as f:
+    labels, header_length = read_binary_header(f)
+  dtype = np.dtype([('timestamp', '<i8'), ('setpoint', '<f4'), ('temps', '<f4', (len(labels),)), ('demand', 'u1')])
+  num_records = (os.path.getsize(filename) - header_length) // dtype.itemsize
+  if num_records == 0:
+    return labels, np.zeros(0, dtype=dtype)
+  return labels, np.memmap(filename, dtype=dtype, mode='r', offset=header_length, shape=(num_records,))
+
+# Convert array of strings to float - empty fields (failed sensor reads) and "None" (unknown demand status) are NaN
+def _to_float(values):
+  import numpy as np
+  values = np.array(values)
+  values[(values == '') | (values == 'None')] = 'nan'
+  return values.astype(np.float64)
+
+# Parse CSV timestamps - vectorised, falling back to parsing one by one if any are invalid (which are returned as -1)
+def _parse_timestamps(values):
+  import numpy as np
+  try:
+    return np.array(values).astype('datetime64[s]').astype(np.int64)
+  except ValueError:
+    timestamps = [log_timestamps.parse_csv_timestamp(value) for value in values]
+    return np.array([-1 if timestamp == None else timestamp for timestamp in timestamps], dtype=np.int64)
+
+# Parse CSV data log rows with NumPy text parser - raises ValueError if any rows are invalid (e.g. repeated header)
+def _parse_csv_text(text, num_channels):
+  import numpy as np
+  if ',,' in text:
+    text = text.replace(',,', ',nan,').replace(',,', ',nan,')
+  if 'None' in text:
+    text = text.replace('None', 'nan')
+  dtype = [('timestamp', 'U19'), ('setpoint', 'f8'), ('temps', 'f8', (num_channels,)), ('demand', 'f8')]
+  data = np.loadtxt(text.splitlines(), delimiter=',', dtype=dtype, ndmin=1)
+  timestamps = data['timestamp'].astype('datetime64[s]').astype(np.int64)
+  return timestamps, data['setpoint'], data['temps'].reshape(len(data), num_channels).T, data['demand']
+
+# Parse CSV data log rows one by one, skipping invalid rows
+def _parse_csv_rows(text, num_channels):
+  import numpy as np
+  rows = [line.split(',') for line in text.splitlines()]
+  columns = list(zip(*[row for row in rows if len(row) == num_channels + 3 and row[0] != "Timestamp"]))
+  if not columns:
+    return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros((num_channels, 0)), np.zeros(0)
+  timestamps = _parse_timestamps(columns[0])
+  valid = timestamps >= 0
+  return timestamps[valid], _to_float(columns[1])[valid], _to_float(columns[2:-1]).reshape(num_channels, -1)[:, valid], _to_float(columns[-1])[valid]
+
+def _read_csv_chunks(filename, offset, end, chunk_rows):
+  f = open(filename, 'rb')
+  header = f.readline().decode('utf-8', 'replace').rstrip('\n').split(',')
+  if len(header) < 4 or header[0] != "Timestamp":
+    f.close()
+    raise ValueError("Not a temperature controller CSV or binary data log")
+  labels = [column.replace(" Temperature (C)", "") for column in header[2:-1]]
+  if offset == None:
+    offset = f.tell()
+  def chunks(offset):
+    with f:
+      f.seek(offset)
+      while True:
+        lines = list(islice(f, chunk_rows))
+        if lines and not lines[-1].endswith(b'\n'):
+          # Row still being written
+          lines.pop()
+        if end != None and offset + sum(map(len, lines)) > end:
+          # Rows from end offset are not read
+          lines = lines[0:bisect.bisect_left(list(accumulate(map(len, lines), initial=offset)), end)]
+        if not lines:
+          break
+        offset += sum(map(len, lines))
+        text = b''.join(lines).decode('utf-8', 'replace')
+        try:
+          yield _parse_csv_text(text, len(labels)) + (offset,)
+        except ValueError:
+          yield _parse_csv_rows(text, len(labels)) + (offset,)
+  return labels, chunks(offset)
+
+def _read_binary_chunks(filename, offset, end, chunk_rows):
+  import numpy as np
+  with open(filename, 'rb') as f:
+    labels, header_length = read_binary_header(f)
+  data = binary_log_memmap(filename)[1]
+  record_size = data.dtype.itemsize
+  first = 0 if offset == None else (offset - header_length) // record_size
+  last = len(data) if end == None else min(len(data), (end - header_length) // record_size)
+  def chunks():
+    for start in range(first, last, chunk_rows):
+      chunk = data[start:min(start+chunk_rows, last)]
+      demand = chunk['demand'].astype(np.float64)
+      demand[chunk['demand'] == BINARY_UNKNOWN_DEMAND] = np.nan
+      yield chunk['timestamp'].astype(np.int64), chunk['setpoint'].astype(np.float64), chunk['temps'].astype(np.float64).T, demand, header_length + (start + len(chunk)) * record_size
+  return labels, chunks()
+
+# Read CSV or binary data log (detected from file contents) into NumPy arrays in chunks, from byte offset (default first row) to end offset (default end of log)
+# Returns list of channel labels and generator of (timestamps, setpoints, temperatures [channel, sample], demand, offset after chunk) for each chunk
+# Failed sensor reads and unknown demand status are NaN. Invalid CSV rows are skipped, and a partially written last row is not read
+# Raises OSError if log cannot be read, or ValueError if file is not a CSV or binary data log
+def read_data_log_chunks(filename, offset=None, chunk_rows=CHUNK_ROWS, end=None):
+  with open(filename, 'rb') as f:
+    binary = f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+  if binary:
+    return _read_binary_chunks(filename, offset, end, chunk_rows)
+  return _read_csv_chunks(filename, offset, end, chunk_rows)
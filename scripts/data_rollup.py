@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+# Maintain multi-resolution rollup store of temperature data log, and plot any time range from it (see rollup_store.py)
+
+# SYNTAX: ./data_rollup.py update <data log> <store directory>
+#         ./data_rollup.py plot <store directory> <output PNG> [<start time> <end time>] [--width <pixels>]
+
+# EXAMPLE CALLS
+# ./data_rollup.py update /var/log/temperature-controller/temperature_data.csv /var/log/temperature-controller/rollup
+# ./data_rollup.py plot /var/log/temperature-controller/rollup /tmp/temperature_plot.png "2020-01-01" "2020-04-01"
+
+# INPUTS
+# <data log> CSV or binary data log written by control_temp.py - only rows appended since previous update are read
+# <store directory> directory of rollup store - created by first update
+# <output PNG> full path and filename of plot
+# If <start time> / <end time> are not specified default all data in store - YYYY-MM-DD or unix timestamp (UTC)
+# --width sets plot width in pixels (default 1600) - data is taken from the coarsest rollup level with at least one bucket per pixel
+
+# OUTPUTS
+# update: rollup store updated with new rows in data log
+# plot: PNG of mean temperature of each channel with shaded min-max range, setpoint and demand (fraction of time on) - time to plot
+#       depends on plot width, not length of time range
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import time
+import calendar
+import argparse
+from time import gmtime, strftime
+import rollup_store
+
+# Allow all group users to write to files created by this script
+oldmask = os.umask(0o002)
+
+# Parse start/end time argument (YYYY-MM-DD or unix timestamp) - returns default if not specified
+def parse_time_argument(value, default):
+  if value == None:
+    return default
+  if str.isdigit(value):
+    return int(value)
+  return calendar.timegm(time.strptime(value, "%Y-%m-%d"))
+
+# Plot records returned by rollup_store.query()
+def plot(labels, bucket_size, records, output_file, width):
+  import matplotlib
+  matplotlib.use('Agg')
+  import matplotlib.pyplot as plt
+  dpi = 100
+  fig, ax = plt.subplots(1, figsize=(width / dpi, 0.5 * width / dpi), dpi=dpi)
+  # Matplotlib date numbers are days since 1970-01-01 - plot each bucket at its centre
+  times = (records['start'] + bucket_size / 2) / 86400
+  for ii, label in enumerate(labels):
+    if label == "Setpoint":
+      ax.plot(times, records['mean'][:, ii], 'k--', linewidth=0.8, label=label)
+    elif label != "Demand":
+      line, = ax.plot(times, records['mean'][:, ii], linewidth=0.8, label=label)
+      ax.fill_between(times, records['min'][:, ii], records['max'][:, ii], color=line.get_color(), alpha=0.25, linewidth=0)
+  ax.set_ylabel('Temperature (C)')
+  demand_ax = ax.twinx()
+  demand_ax.fill_between(times, records['mean'][:, labels.index("Demand")], step='mid', color='grey', alpha=0.2, linewidth=0)
+  demand_ax.set_ylim(0, 5)
+  demand_ax.set_yticks([0, 1])
+  demand_ax.set_ylabel('Demand')
+  ax.xaxis_date()
+  ax.legend(loc='upper left')
+  ax.set_title("%s to %s (%d minute buckets)" % (strftime("%Y-%m-%d %H:%M", gmtime(records['start'][0])), strftime("%Y-%m-%d %H:%M", gmtime(records['start'][-1] + bucket_size)), bucket_size / 60))
+  fig.autofmt_xdate(bottom=0.15)
+  plt.savefig(output_file, format='png', dpi=dpi)
+  plt.close('all')
+
+parser = argparse.ArgumentParser(description='Maintain multi-resolution rollup store of temperature data log, and plot any time range from it')
+subparsers = parser.add_subparsers(dest='command', required=True)
+update_parser = subparsers.add_parser('update', help='Add rows appended to data log since previous update to rollup store')
+update_parser.add_argument('data_file', help='Full filename and path of CSV or binary data log')
+update_parser.add_argument('store_dir', help='Rollup store directory')
+plot_parser = subparsers.add_parser('plot', help='Plot time range from rollup store')
+plot_parser.add_argument('store_dir', help='Rollup store directory')
+plot_parser.add_argument('output_file', help='Full filename and path of output PNG')
+plot_parser.add_argument('start', nargs='?', help='Start of plot - YYYY-MM-DD or unix timestamp (default start of data)')
+plot_parser.add_argument('end', nargs='?', help='End of plot - YYYY-MM-DD or unix timestamp (default end of data)')
+plot_parser.add_argument('--width', '-w', type=int, default=1600, metavar='PIXELS', help='Width of plot in pixels - default: 1600')
+args = parser.parse_args()
+
+try:
+  if args.command == "update":
+    added = rollup_store.update(args.store_dir, args.data_file)
+    print("Added %d samples from %s to rollup store %s" % (added, args.data_file, args.store_dir))
+  else:
+    meta = rollup_store.load_meta(args.store_dir)
+    if meta == None:
+      raise ValueError("Rollup store " + args.store_dir + " is empty - run update first")
+    days = rollup_store.read_level(args.store_dir, rollup_store.LEVELS[-1], len(meta["labels"]))
+    start = parse_time_argument(args.start, int(days['start'][0]))
+    end = parse_time_argument(args.end, int(days['start'][-1]) + rollup_store.LEVELS[-1])
+    labels, bucket_size, records = rollup_store.query(args.store_dir, start, end, args.width)
+    if len(records) == 0:
+      raise ValueError("No data in rollup store between %s and %s" % (strftime("%Y-%m-%d %H:%M:%S", gmtime(start)), strftime("%Y-%m-%d %H:%M:%S", gmtime(end))))
+    plot(labels, bucket_size, records, args.output_file, args.width)
+    print("Saved plot of %d %d second buckets to %s" % (len(records), bucket_size, args.output_file))
+except (OSError, ValueError) as e:
+  print("ERROR: %s" % str(e))
+  os.umask(oldmask)
+  sys.exit(1)
+
+# Put back umask
+os.umask(oldmask)
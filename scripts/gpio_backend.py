@@ -0,0 +1,361 @@
+# GPIO backends for temperature controller - used by control_temp.py to configure, read and set GPIO pins
+
+# SYNTAX: import gpio_backend
+#         gpio = gpio_backend.open_backend(<name>)
+
+# EXAMPLE CALLS
+# gpio = gpio_backend.open_backend("sysfs")
+# if gpio.set(17, "1") != 0: print("failed")
+
+# INPUTS
+# <name> is one of:
+#   'sysfs' - (default) Linux sysfs GPIO interface in /sys/class/gpio, holding open file descriptors on each pin value file so reads/writes need no fork/exec or re-open
+#   'gpiod' - Linux GPIO character device via libgpiod Python bindings (python3-libgpiod, v1 API) - lines are held requested for the lifetime of the process
+#   'fake'  - in-memory GPIO pins for testing / dry runs without hardware - outputs can be linked to inputs to simulate relay feedback
+
+# OUTPUTS
+# All backends provide the same methods:
+#   exported(gpionum) - True if pin is available for use
+#   export(gpionum) - make pin available for use - returns 0 on success or error code
+#   get_direction(gpionum) - returns "in" / "out" or None on error
+#   set_direction(gpionum, direction) - returns 0 on success or error code
+#   get(gpionum) - returns pin value as integer 0/1 or None on error
+#   set(gpionum, value) - value is "0" or "1", returns 0 on success or error code
+#   enable_events(gpionum) - enable edge events on input pin for wait_for() - returns 0 on success or error code (e.g. pin has no interrupt), in
+#     which case wait_for() polls the pin value instead
+#   wait_for(gpionum, value, timeout) - wait up to timeout (s) for pin to settle at value (integer 0/1) - returns (time, edges): time (s) from call
+#     until the last edge to value, and number of edges seen (0 if pin was already at value, more than 1 if contacts bounced), or None if pin is
+#     not at value when timeout expires.  Pin is taken as settled once it has been at value for SETTLE_TIME with no further edges
+#   close() - release all pins / file descriptors
+# Error codes are errno values (e.g. errno.EACCES if user is not in gpio group)
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Added edge events and wait_for() to confirm feedback input has switched, with switching time and contact bounce
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import errno
+import select
+from time import perf_counter, sleep
+
+BACKENDS = ['sysfs', 'gpiod', 'fake']
+# Time pin must hold a value with no further edges to be taken as settled (contact bounce of relays is typically a few ms)
+SETTLE_TIME = 0.01
+# Interval pin value is polled at by wait_for() if edge events are not available
+POLL_INTERVAL = 0.002
+
+# Return error code from OSError, falling back to generic I/O error
+def _error_code(e):
+  return e.errno if e.errno else errno.EIO
+
+# Wait for pin to settle at value, reading pin with read() and waiting up to a given time (s) for an edge with wait_edge() - returns (time, edges)
+# or None on timeout, as wait_for().  wait_edge() returns True if an edge may have occurred, so pin is read again
+def _wait_for(read, wait_edge, value, timeout):
+  start = perf_counter()
+  deadline = start + timeout
+  current = read()
+  edges = 0
+  settled = None
+  if current == value:
+    return (0, 0)
+  while True:
+    now = perf_counter()
+    if settled != None and now - settled >= SETTLE_TIME:
+      return (settled - start, edges)
+    if now >= deadline:
+      return (settled - start, edges) if settled != None else None
+    if settled != None:
+      # Watch for bounce until settled, or deadline
+      wait = min(deadline, settled + SETTLE_TIME) - now
+    else:
+      wait = deadline - now
+    if not wait_edge(wait):
+      continue
+    new = read()
+    if new != current and new != None:
+      edges += 1
+      current = new
+      settled = perf_counter() if current == value else None
+
+# Sysfs GPIO interface - value file descriptors are opened once per pin and kept open
+class SysfsGPIO:
+  def __init__(self, root='/sys/class/gpio'):
+    self.root = root
+    self.value_fds = {}
+    self.edges = set()
+
+  def _path(self, gpionum, attribute=None):
+    path = os.path.join(self.root, 'gpio'+str(gpionum))
+    if attribute:
+      path = os.path.join(path, attribute)
+    return path
+
+  # Open value file of pin if not already open - read/write so outputs can also be read back
+  def _value_fd(self, gpionum):
+    gpionum = str(gpionum)
+    if gpionum not in self.value_fds:
+      try:
+        self.value_fds[gpionum] = os.open(self._path(gpionum, 'value'), os.O_RDWR)
+      except OSError:
+        # Input pins or restricted permissions - may still be able to read
+        self.value_fds[gpionum] = os.open(self._path(gpionum, 'value'), os.O_RDONLY)
+    return self.value_fds[gpionum]
+
+  def _close_fd(self, gpionum):
+    fd = self.value_fds.pop(str(gpionum), None)
+    if fd != None:
+      try:
+        os.close(fd)
+      except OSError:
+        pass
+
+  def exported(self, gpionum):
+    return os.path.exists(self._path(gpionum))
+
+  def export(self, gpionum):
+    try:
+      with open(os.path.join(self.root, 'export'), 'w') as f:
+        f.write(str(gpionum)+"\n")
+    except OSError as e:
+      return _error_code(e)
+    return 0
+
+  def get_direction(self, gpionum):
+    try:
+      with open(self._path(gpionum, 'direction'), 'r') as f:
+        return f.readline().rstrip()
+    except OSError:
+      return None
+
+  def set_direction(self, gpionum, direction):
+    # Value file must be re-opened with correct mode after direction change
+    self._close_fd(gpionum)
+    self.edges.discard(str(gpionum))
+    try:
+      with open(self._path(gpionum, 'direction'), 'w') as f:
+        f.write(direction+"\n")
+    except OSError as e:
+      return _error_code(e)
+    return 0
+
+  def get(self, gpionum):
+    try:
+      return int(os.pread(self._value_fd(gpionum), 16, 0))
+    except (OSError, ValueError):
+      # Pin may have been unexported - re-open on next access
+      self._close_fd(gpionum)
+      return None
+
+  def set(self, gpionum, value):
+    if value != "0" and value != "1":
+      return errno.EINVAL
+    try:
+      os.pwrite(self._value_fd(gpionum), (value+"\n").encode(), 0)
+    except OSError as e:
+      self._close_fd(gpionum)
+      return _error_code(e)
+    return 0
+
+  # Interrupt on both edges - value file then signals POLLPRI when pin changes
+  def enable_events(self, gpionum):
+    try:
+      with open(self._path(gpionum, 'edge'), 'w') as f:
+        f.write("both\n")
+    except OSError as e:
+      return _error_code(e)
+    self.edges.add(str(gpionum))
+    return 0
+
+  def wait_for(self, gpionum, value, timeout):
+    if str(gpionum) not in self.edges:
+      return _wait_for(lambda: self.get(gpionum), _poll_interval, value, timeout)
+    try:
+      poller = select.poll()
+      poller.register(self._value_fd(gpionum), select.POLLPRI | select.POLLERR)
+    except OSError:
+      return None
+    # Reading value (in get()) clears pending edge, so poll() only returns on a later edge
+    return _wait_for(lambda: self.get(gpionum), lambda wait: bool(poller.poll(max(0, wait) * 1000)), value, timeout)
+
+  def close(self):
+    for gpionum in list(self.value_fds):
+      self._close_fd(gpionum)
+
+# GPIO character device interface using libgpiod (v1 API) - each line is requested on first use and held until close()
+class GpiodGPIO:
+  def __init__(self, chip='gpiochip0', consumer='temperature-controller'):
+    import gpiod
+    self.gpiod = gpiod
+    self.chip = gpiod.Chip(chip)
+    self.consumer = consumer
+    self.lines = {}
+    self.directions = {}
+    self.event_lines = set()
+
+  def exported(self, gpionum):
+    return int(gpionum) in self.lines
+
+  def export(self, gpionum):
+    # Lines are requested when direction is set
+    return 0
+
+  def get_direction(self, gpionum):
+    return self.directions.get(int(gpionum))
+
+  def set_direction(self, gpionum, direction):
+    gpionum = int(gpionum)
+    if gpionum in self.lines:
+      self.lines.pop(gpionum).release()
+      self.event_lines.discard(gpionum)
+    try:
+      line = self.chip.get_line(gpionum)
+      if direction == "out":
+        line.request(consumer=self.consumer, type=self.gpiod.LINE_REQ_DIR_OUT, default_vals=[0])
+      else:
+        line.request(consumer=self.consumer, type=self.gpiod.LINE_REQ_DIR_IN)
+    except OSError as e:
+      return _error_code(e)
+    self.lines[gpionum] = line
+    self.directions[gpionum] = direction
+    return 0
+
+  def get(self, gpionum):
+    try:
+      return int(self.lines[int(gpionum)].get_value())
+    except (KeyError, OSError):
+      return None
+
+  def set(self, gpionum, value):
+    if value != "0" and value != "1":
+      return errno.EINVAL
+    try:
+      self.lines[int(gpionum)].set_value(int(value))
+    except KeyError:
+      return errno.ENODEV
+    except OSError as e:
+      return _error_code(e)
+    return 0
+
+  # Input line is requested again with edge events - value can still be read with get()
+  def enable_events(self, gpionum):
+    gpionum = int(gpionum)
+    if self.directions.get(gpionum) != "in" or gpionum not in self.lines:
+      return errno.EINVAL
+    self.lines.pop(gpionum).release()
+    try:
+      line = self.chip.get_line(gpionum)
+      line.request(consumer=self.consumer, type=self.gpiod.LINE_REQ_EV_BOTH_EDGES)
+    except OSError as e:
+      # Keep line as plain input, so feedback can still be polled
+      self.set_direction(gpionum, "in")
+      return _error_code(e)
+    self.lines[gpionum] = line
+    self.event_lines.add(gpionum)
+    return 0
+
+  def wait_for(self, gpionum, value, timeout):
+    line = self.lines.get(int(gpionum))
+    if line == None:
+      return None
+    if int(gpionum) not in self.event_lines:
+      return _wait_for(lambda: self.get(gpionum), _poll_interval, value, timeout)
+    return _wait_for(lambda: self.get(gpionum), lambda wait: self._event_wait(line, wait), value, timeout)
+
+  # Wait for edge event on line - events are read so the next wait only returns on a later edge
+  # Note libgpiod v1 event_wait() takes timeout as integer seconds and nanoseconds
+  def _event_wait(self, line, wait):
+    wait = max(0, wait)
+    try:
+      if not line.event_wait(sec=int(wait), nsec=int((wait % 1) * 1e9)):
+        return False
+      line.event_read()
+    except OSError:
+      return False
+    return True
+
+  def close(self):
+    for line in self.lines.values():
+      line.release()
+    self.lines = {}
+    self.chip.close()
+
+# In-memory GPIO pins for testing - inputs linked to an output with link() follow that output (simulated relay feedback)
+class FakeGPIO:
+  def __init__(self):
+    self.values = {}
+    self.directions = {}
+    self.links = {}
+    self.writes = 0
+
+  def link(self, gpio_input, gpio_output):
+    self.links[int(gpio_input)] = int(gpio_output)
+
+  def exported(self, gpionum):
+    return int(gpionum) in self.directions
+
+  def export(self, gpionum):
+    self.directions.setdefault(int(gpionum), "in")
+    self.values.setdefault(int(gpionum), 0)
+    return 0
+
+  def get_direction(self, gpionum):
+    return self.directions.get(int(gpionum))
+
+  def set_direction(self, gpionum, direction):
+    if int(gpionum) not in self.directions:
+      return errno.ENODEV
+    self.directions[int(gpionum)] = direction
+    return 0
+
+  def get(self, gpionum):
+    gpionum = self.links.get(int(gpionum), int(gpionum))
+    return self.values.get(gpionum)
+
+  # Linked inputs change as soon as output is set, so there is nothing to wait for
+  def enable_events(self, gpionum):
+    return 0
+
+  def wait_for(self, gpionum, value, timeout):
+    return (0, 0) if self.get(gpionum) == value else None
+
+  def set(self, gpionum, value):
+    if value != "0" and value != "1":
+      return errno.EINVAL
+    if self.directions.get(int(gpionum)) != "out":
+      return errno.EPERM
+    self.values[int(gpionum)] = int(value)
+    self.writes += 1
+    return 0
+
+  def close(self):
+    pass
+
+# Sleep for poll interval or wait (s), whichever is shorter - pin is then read again
+def _poll_interval(wait):
+  sleep(max(0, min(wait, POLL_INTERVAL)))
+  return True
+
+# Create GPIO backend by name - raises ValueError for unknown backend, ImportError if gpiod bindings are not installed
+def open_backend(name, root='/sys/class/gpio'):
+  if name == 'sysfs':
+    return SysfsGPIO(root)
+  elif name == 'gpiod':
+    return GpiodGPIO()
+  elif name == 'fake':
+    return FakeGPIO()
+  raise ValueError("Unknown GPIO backend "+str(name)+" - must be one of "+', '.join(BACKENDS))
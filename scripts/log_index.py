@@ -0,0 +1,199 @@
+# Sidecar day index of controller and data logs - used by controller_analyse.py and data_analyse.py to read only the days being analysed
+
+# SYNTAX: import log_index
+#         index = log_index.update(<log file>, <kind>, [<index file>])
+#         position = log_index.day_position(index, <time>)
+#         entry = log_index.day_entry(index, <time>)
+
+# EXAMPLE CALLS
+# index = log_index.update("/var/log/temperature-controller/control_temp.log", "controller")
+# day, offset, line, midnight_status = log_index.day_entry(index, 1593388800)
+# index = log_index.update("/var/log/temperature-controller/temperature_data.csv", "data")
+# position = log_index.day_position(index, 1593388800)
+
+# INPUTS
+# <log file> controller log written by control_temp.py (<kind> "controller"), or CSV or binary data log ("data")
+# <index file> sidecar index file (JSON) - default <log file>.idx
+# <time> unix timestamp
+
+# OUTPUTS
+# Index (dictionary, saved as JSON) - "days" holds an entry [day, offset, line, carry] for each day in log: midnight at start of day, byte offset and
+#   line number (from 0, data rows from 0 for data logs) of first line of day, and state carried over midnight - for controller log status at
+#   midnight (-1 unknown), for data log byte offset of previous row (None if first row), so time since previous sample can be weighted
+# Controller log index also holds first_line, last_line, lines, status at end of log and first_switch_day (as controller_log checkpoint), and data
+#   log index lines (number of rows) and last_row (byte offset of last row)
+# Index is built on first use, then each update only reads lines appended since - rebuilt automatically if log is rotated or truncated (checked as
+#   for controller_log checkpoint).  A partly written last line is not indexed.  If index file cannot be written a WARNING is printed and the
+#   index built in memory is used
+# day_position() - position in index["days"] of first day starting at or after <time> (len(index["days"]) if none)
+# day_entry() - entry of last day starting at or before <time> (None if log starts after <time>)
+# Days are assumed to be in time order - a line timed before the latest day indexed (e.g. system clock stepped back) does not start a new day
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import bisect
+import log_timestamps
+import controller_log
+import data_log
+
+INDEX_VERSION = 1
+KINDS = ['controller', 'data']
+
+# Empty index - log is indexed from the beginning
+def new_index(log_file, kind):
+  return {"version": INDEX_VERSION, "kind": kind, "log_file": os.path.abspath(log_file), "inode": None, "offset": 0, "check": "", "lines": 0,
+          "days": [], "first_line": "", "last_line": "", "status": -1, "first_switch_day": None, "last_row": None}
+
+# Read index - returns None (full rebuild) if there is no valid index for this log, or log has been truncated or rotated since index was saved
+def load_index(index_file, log_file, kind):
+  if not os.path.isfile(index_file):
+    return None
+  try:
+    with open(index_file, 'r') as f:
+      index = json.load(f)
+    if index.get("version") != INDEX_VERSION or index["kind"] != kind or index["log_file"] != os.path.abspath(log_file):
+      print("WARNING: Index %s is not for this log file - rebuilding index" % index_file)
+      return None
+    with open(log_file, 'rb') as f:
+      log_stat = os.fstat(f.fileno())
+      if log_stat.st_ino != index["inode"] or log_stat.st_size < index["offset"] or controller_log.checkpoint_check(f, index["offset"]) != index["check"]:
+        print("WARNING: Log file truncated or rotated since index was saved - rebuilding index")
+        return None
+  except (OSError, ValueError, KeyError, TypeError) as e:
+    print("WARNING: Cannot read index %s - rebuilding index (%s)" % (index_file, str(e)))
+    return None
+  return index
+
+# Write index atomically, so an interrupted run leaves previous index intact
+def save_index(index_file, index):
+  with open(index_file + ".tmp", 'w') as f:
+    json.dump(index, f)
+  os.replace(index_file + ".tmp", index_file)
+
+# Add days of controller log from index offset to end of log
+def _extend_controller(f, index):
+  f.seek(index["offset"])
+  day = index["days"][-1][0] if index["days"] else None
+  offset = index["offset"]
+  for raw_line in f:
+    if not raw_line.endswith(b'\n'):
+      # Line still being written
+      break
+    line = raw_line.decode('utf-8', 'replace')
+    if index["lines"] == 0:
+      index["first_line"] = line
+    line_time = log_timestamps.parse_log_timestamp(line)
+    if line_time != None:
+      line_day = line_time - line_time % 86400
+      if day == None or line_day > day:
+        day = line_day
+        index["days"].append([day, offset, index["lines"], index["status"]])
+      if "Switching system" in line and index["first_switch_day"] == None:
+        index["first_switch_day"] = line_day
+      if "Switching system on" in line:
+        index["status"] = 1
+      if "Switching system off" in line:
+        index["status"] = 0
+    index["lines"] += 1
+    index["last_line"] = line
+    offset += len(raw_line)
+  index["offset"] = offset
+
+# Add days of CSV data log from index offset to end of log - timestamp is only parsed when date at start of row changes
+def _extend_csv(f, index):
+  if index["offset"] == 0:
+    f.readline()
+    index["offset"] = f.tell()
+  f.seek(index["offset"])
+  day = index["days"][-1][0] if index["days"] else None
+  offset = index["offset"]
+  previous = index["last_row"]
+  date = None
+  for raw_line in f:
+    if not raw_line.endswith(b'\n'):
+      # Row still being written
+      break
+    if raw_line[0:10] != date:
+      row_time = log_timestamps.parse_csv_timestamp(raw_line[0:19].decode('utf-8', 'replace'))
+      if row_time != None:
+        date = raw_line[0:10]
+        row_day = row_time - row_time % 86400
+        if day == None or row_day > day:
+          day = row_day
+          index["days"].append([day, offset, index["lines"], previous])
+    previous = offset
+    index["lines"] += 1
+    offset += len(raw_line)
+  index["last_row"] = previous
+  index["offset"] = offset
+
+# Add days of binary data log from index offset to end of log - timestamps are read with NumPy
+def _extend_binary(log_file, index):
+  import numpy as np
+  with open(log_file, 'rb') as f:
+    labels, header_length = data_log.read_binary_header(f)
+  data = data_log.binary_log_memmap(log_file)[1]
+  record_size = data.dtype.itemsize
+  first = 0 if index["offset"] == 0 else (index["offset"] - header_length) // record_size
+  if first < len(data):
+    timestamps = data['timestamp'][first:].astype(np.int64)
+    last_day = index["days"][-1][0] if index["days"] else timestamps[0] - timestamps[0] % 86400 - 1
+    # Latest day so far at each record, starting from last day indexed - a new day starts where this increases
+    days = np.maximum.accumulate(np.concatenate(([last_day], timestamps - timestamps % 86400)))
+    for ii in np.flatnonzero(np.diff(days) > 0):
+      row = first + int(ii)
+      index["days"].append([int(days[ii + 1]), header_length + row * record_size, row, None if row == 0 else header_length + (row - 1) * record_size])
+  index["lines"] = len(data)
+  index["offset"] = header_length + len(data) * record_size
+
+# Update index of log with lines appended since index was saved (building index if there is none) and save - returns index
+# Raises OSError if log cannot be read, or ValueError if data log is not a CSV or binary data log
+def update(log_file, kind, index_file=None):
+  if kind not in KINDS:
+    raise ValueError("Unknown log kind "+str(kind)+" - must be one of "+', '.join(KINDS))
+  if index_file == None:
+    index_file = log_file + ".idx"
+  index = load_index(index_file, log_file, kind) or new_index(log_file, kind)
+  with open(log_file, 'rb') as f:
+    if kind == "controller":
+      _extend_controller(f, index)
+    elif f.read(len(data_log.BINARY_MAGIC)) == data_log.BINARY_MAGIC:
+      _extend_binary(log_file, index)
+    else:
+      _extend_csv(f, index)
+    index["inode"] = os.fstat(f.fileno()).st_ino
+    index["check"] = controller_log.checkpoint_check(f, index["offset"])
+  try:
+    save_index(index_file, index)
+  except OSError as e:
+    print("WARNING: Cannot save index %s - %s" % (index_file, str(e)))
+  return index
+
+# Position of first day starting at or after time
+def day_position(index, time):
+  return bisect.bisect_left([entry[0] for entry in index["days"]], time)
+
+# Entry of last day starting at or before time
+def day_entry(index, time):
+  position = bisect.bisect_right([entry[0] for entry in index["days"]], time)
+  if position == 0:
+    return None
+  return index["days"][position - 1]
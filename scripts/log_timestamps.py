@@ -0,0 +1,98 @@
+# Fast timestamp parsing for temperature controller logs - used by log readers in place of time.strptime(), which dominates log parsing time
+
+# SYNTAX: import log_timestamps
+#         log_timestamps.parse_log_timestamp(<controller log line>)
+#         log_timestamps.parse_csv_timestamp(<data log timestamp field>)
+
+# EXAMPLE CALLS
+# log_timestamps.parse_log_timestamp("2020-07-09-16:00:09: Setpoint=29.0, Actual=25.25 - Switching system on")  -> 1594310409
+# log_timestamps.parse_log_timestamp("2020-07-09-16-00-09: Setpoint=29.0, Actual=25.25 - Switching system on")  -> 1594310409 (legacy format)
+# log_timestamps.parse_csv_timestamp("2020-07-09 16:00:09")  -> 1594310409
+
+# INPUTS
+# Controller log line starting with timestamp in current "YYYY-MM-DD-HH:MM:SS" or legacy "YYYY-MM-DD-HH-MM-SS" format
+# Data log (CSV) timestamp in "YYYY-MM-DD HH:MM:SS" format
+# All timestamps are UTC
+
+# OUTPUTS
+# Unix timestamp (integer), or None if text does not start with a valid timestamp - gives same result as time.strptime() with the same format strings
+# for every zero-padded timestamp (as written by the controller), space-padded fields are not accepted
+# Fields are read from fixed offsets, and the timestamp of each date's midnight is cached so only time of day is calculated per line
+# See benchmarks/timestamp_benchmark.py for comparison with time.strptime()
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import datetime as DT
+
+EPOCH_ORDINAL = DT.date(1970, 1, 1).toordinal()
+
+# Limit on number of dates held in cache - cache is cleared when full
+MAX_CACHED_DAYS = 4096
+
+_day_epochs = {}
+
+# True if text is all ASCII digits (str.isdigit() alone also accepts other unicode digits)
+def _digits(text):
+  return text.isascii() and text.isdigit()
+
+# Unix timestamp of midnight at start of date "YYYY-MM-DD" - raises ValueError if not a valid date
+def day_epoch(date):
+  epoch = _day_epochs.get(date)
+  if epoch == None:
+    if len(date) != 10 or date[4] != '-' or date[7] != '-' or not _digits(date[0:4] + date[5:7] + date[8:10]):
+      raise ValueError("Invalid date " + repr(date))
+    epoch = (DT.date(int(date[0:4]), int(date[5:7]), int(date[8:10])).toordinal() - EPOCH_ORDINAL) * 86400
+    if len(_day_epochs) >= MAX_CACHED_DAYS:
+      _day_epochs.clear()
+    _day_epochs[date] = epoch
+  return epoch
+
+# Parse 19 character timestamp with given separator between date and time and between time fields - returns None if invalid
+def _parse(text, date_time_sep, time_sep):
+  if len(text) < 19 or text[10] != date_time_sep or text[13] != time_sep or text[16] != time_sep:
+    return None
+  hours = text[11:13]
+  minutes = text[14:16]
+  seconds = text[17:19]
+  if not _digits(hours + minutes + seconds):
+    return None
+  hours = int(hours)
+  minutes = int(minutes)
+  seconds = int(seconds)
+  # Seconds up to 61 are accepted by time.strptime() (leap seconds)
+  if hours > 23 or minutes > 59 or seconds > 61:
+    return None
+  try:
+    return day_epoch(text[0:10]) + hours * 3600 + minutes * 60 + seconds
+  except ValueError:
+    return None
+
+# Timestamp at start of controller log line, in current or legacy format
+def parse_log_timestamp(line):
+  if len(line) < 19:
+    return None
+  if line[13] == ':':
+    return _parse(line, '-', ':')
+  return _parse(line, '-', '-')
+
+# Timestamp field of data log (CSV)
+def parse_csv_timestamp(field):
+  if len(field) != 19:
+    return None
+  return _parse(field, ' ', ':')
@@ -0,0 +1,133 @@
+# Asynchronous controller message log writer for temperature controller - used by control_temp.py so writing messages never delays control
+
+# SYNTAX: import message_log
+#         logger = message_log.MessageLogger([<queue size>])
+#         logger.write(<filenames>, <line>)
+#         logger.close()
+
+# EXAMPLE CALLS
+# logger = message_log.MessageLogger()
+# logger.write(["/var/log/temperature-controller/control_temp.log"], message_log.timestamp(clock.time())+": Switching system on\n")
+# logger.close()
+
+# INPUTS
+# <queue size> maximum number of messages waiting to be written (default 1000) - if the writer has fallen this far behind (e.g. storage stalled)
+#   further messages are dropped and counted, and a WARNING with the number dropped is written once the writer catches up
+# <filenames> message logs line is written to, <line> message including line ending
+
+# OUTPUTS
+# Messages are queued and written in order by a background (daemon) thread, which keeps each message log open (see data_log.DataLogWriter) and
+#   starts a new file if the log is rotated or removed.  If a log cannot be written a WARNING is printed to STDOUT, and the message is retried with
+#   the next message written to that log
+# close() writes all queued messages and closes logs - called on exit, and also registered to run at interpreter exit (close_all())
+# timestamp(<unix time>) - message timestamp prefix (YYYY-MM-DD-HH:MM:SS, UTC), formatted once per second and cached
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import queue
+import atexit
+import threading
+from time import gmtime, strftime
+import clock
+import data_log
+
+# Time given to write queued messages on close
+CLOSE_TIMEOUT = 10
+
+# Cached (second, formatted timestamp) - replaced as a whole so it can be read from any thread
+_timestamp_cache = (None, "")
+
+# Loggers not yet closed, closed at interpreter exit
+_loggers = []
+
+# Timestamp prefix of messages for unix time - only formatted when second changes
+def timestamp(now):
+  global _timestamp_cache
+  second = int(now // 1)
+  cached = _timestamp_cache
+  if cached[0] != second:
+    cached = _timestamp_cache = (second, strftime("%Y-%m-%d-%H:%M:%S", gmtime(second)))
+  return cached[1]
+
+class MessageLogger:
+  def __init__(self, queue_size=1000):
+    self.queue = queue.Queue(queue_size)
+    self.writers = {}
+    self.dropped = 0
+    self.closed = False
+    self.thread = threading.Thread(target=self._run, daemon=True)
+    self.thread.start()
+    _loggers.append(self)
+
+  # Queue line to be written to message logs - never blocks
+  def write(self, filenames, line):
+    if not filenames or self.closed:
+      return
+    try:
+      self.queue.put_nowait((filenames, line))
+    except queue.Full:
+      self.dropped += 1
+
+  # Write all queued messages and close message logs
+  def close(self):
+    if self.closed:
+      return
+    self.closed = True
+    try:
+      self.queue.put(None, timeout=CLOSE_TIMEOUT)
+    except queue.Full:
+      pass
+    self.thread.join(CLOSE_TIMEOUT)
+    if self in _loggers:
+      _loggers.remove(self)
+
+  # Writer thread - writes queued messages until close()
+  def _run(self):
+    while True:
+      item = self.queue.get()
+      if item == None:
+        break
+      filenames, line = item
+      self._write_line(filenames, line)
+      if self.dropped and self.queue.empty():
+        dropped, self.dropped = self.dropped, 0
+        self._write_line(list(self.writers), "%s: WARNING: %d controller message(s) dropped - message log writes fell behind\n" % (timestamp(clock.time()), dropped))
+    for writer in self.writers.values():
+      try:
+        writer.close()
+      except OSError:
+        pass
+
+  def _write_line(self, filenames, line):
+    for filename in filenames:
+      writer = self.writers.get(filename)
+      if writer == None:
+        writer = self.writers[filename] = data_log.DataLogWriter(filename)
+      try:
+        writer.write(line)
+      except OSError:
+        # Line is kept by writer and retried with next message
+        print("%s: WARNING: Cannot write to specified logfile %s - check correct path/filename and permissions" % (timestamp(clock.time()), filename))
+
+# Close all loggers - writes any queued messages at interpreter exit
+def close_all():
+  for logger in list(_loggers):
+    logger.close()
+
+atexit.register(close_all)
@@ -0,0 +1,235 @@
+# Multi-resolution rollup store for temperature data logs - used by data_rollup.py to plot long periods of data without reading every sample
+
+# SYNTAX: import rollup_store
+#         rollup_store.update(<store directory>, <data log>)
+#         labels, bucket_size, records = rollup_store.query(<store directory>, <start>, <end>, <points>)
+
+# EXAMPLE CALLS
+# rollup_store.update("/var/log/temperature-controller/rollup", "/var/log/temperature-controller/temperature_data.csv")
+# labels, bucket_size, records = rollup_store.query("/var/log/temperature-controller/rollup", 1577836800, 1609459200, 1600)
+# plt.plot(records['start'], records['mean'][:, labels.index("Current")])
+
+# INPUTS
+# <store directory> directory holding rollup files - created if it does not exist.  Use a separate store for each data log
+# <data log> CSV or binary data log written by control_temp.py
+# <start> <end> time range of query (unix timestamps), <points> minimum number of points required (e.g. width of plot in pixels)
+
+# OUTPUTS
+# Samples are summarised in buckets of 1 minute, 15 minutes, 1 hour and 1 day for every series in data log (setpoint, each temperature channel
+# and demand status).  Each level is stored in its own file of fixed size little-endian records (rollup_<bucket size in seconds>.bin):
+#   int64 bucket start (unix timestamp), then for each of N series: uint32 sample count, float32 min, max, mean and last value (NaN if no valid samples)
+# rollup.json holds series labels and position reached in data log, so update() only reads rows appended since previous update.  If the data log
+# has been rotated, rows remaining in the rotated file (<data log>.1) are read first, then the new log from the start
+# rollup.json also holds the number of records and last record of each level file, saved atomically with the position in data log - update()
+#   first puts level files back to that state, so samples added by an interrupted update (e.g. power loss) are not added twice
+# Samples not later than the last sample already stored (e.g. after clock change) are ignored
+# query() returns records of the coarsest level giving at least <points> buckets over the time range, as a read-only NumPy memmap
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Level files put back to state saved with position in data log before each update
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import numpy as np
+import data_log
+
+ROLLUP_VERSION = 1
+
+# Bucket sizes (seconds) of each level, finest first
+LEVELS = [60, 900, 3600, 86400]
+
+META_FILE = "rollup.json"
+
+# NumPy dtype of rollup records for given number of series
+def record_dtype(num_series):
+  return np.dtype([('start', '<i8'), ('count', '<u4', (num_series,)), ('min', '<f4', (num_series,)), ('max', '<f4', (num_series,)),
+                   ('mean', '<f4', (num_series,)), ('last', '<f4', (num_series,))])
+
+def level_file(store_dir, bucket_size):
+  return os.path.join(store_dir, "rollup_%d.bin" % bucket_size)
+
+# Read store metadata - returns None if store is empty
+def load_meta(store_dir):
+  try:
+    with open(os.path.join(store_dir, META_FILE), 'r') as f:
+      meta = json.load(f)
+  except FileNotFoundError:
+    return None
+  if meta.get("version") != ROLLUP_VERSION:
+    raise ValueError("Unsupported rollup store version " + str(meta.get("version")))
+  return meta
+
+def save_meta(store_dir, meta):
+  path = os.path.join(store_dir, META_FILE)
+  with open(path + ".tmp", 'w') as f:
+    json.dump(meta, f)
+  os.replace(path + ".tmp", path)
+
+# Summarise samples (values [series, sample], timestamps in increasing order) into buckets - returns new records
+def summarise(timestamps, values, bucket_size):
+  buckets = timestamps - timestamps % bucket_size
+  starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+  valid = ~np.isnan(values)
+  records = np.zeros(len(starts), dtype=record_dtype(len(values)))
+  records['start'] = buckets[starts]
+  count = np.add.reduceat(valid, starts, axis=1)
+  records['count'] = count.T
+  records['min'] = np.fmin.reduceat(values, starts, axis=1).T
+  records['max'] = np.fmax.reduceat(values, starts, axis=1).T
+  with np.errstate(invalid='ignore', divide='ignore'):
+    records['mean'] = (np.add.reduceat(np.where(valid, values, 0), starts, axis=1) / count).T
+  # Last valid sample in each bucket
+  last_index = np.maximum.reduceat(np.where(valid, np.arange(values.shape[1]), -1), starts, axis=1)
+  records['last'] = np.where(last_index >= 0, np.take_along_axis(values, np.clip(last_index, 0, None), axis=1), np.nan).T
+  return records
+
+# Combine stored record with first new record of same bucket
+def merge(old, new):
+  count = old['count'] + new['count']
+  with np.errstate(invalid='ignore', divide='ignore'):
+    new['mean'] = (np.nan_to_num(old['mean']) * old['count'] + np.nan_to_num(new['mean']) * new['count']) / count
+  new['count'] = count
+  new['min'] = np.fmin(old['min'], new['min'])
+  new['max'] = np.fmax(old['max'], new['max'])
+  new['last'] = np.where(np.isnan(new['last']), old['last'], new['last'])
+
+# Append new records to level file, merging first record into last stored record if they are the same bucket
+# Returns number of records in file and last record (hex), saved in metadata
+def append_records(path, records):
+  with open(path, 'ab+') as f:
+    pass
+  with open(path, 'r+b') as f:
+    num_records = os.fstat(f.fileno()).st_size // records.dtype.itemsize
+    # Any partially written record (e.g. power loss during update) is overwritten
+    f.seek(num_records * records.dtype.itemsize)
+    if num_records > 0:
+      f.seek((num_records - 1) * records.dtype.itemsize)
+      last = np.frombuffer(f.read(records.dtype.itemsize), dtype=records.dtype)[0]
+      if last['start'] == records['start'][0]:
+        merge(last, records[0])
+        num_records -= 1
+        f.seek(num_records * records.dtype.itemsize)
+    f.write(records.tobytes())
+    f.truncate()
+  return [num_records + len(records), records[-1].tobytes().hex()]
+
+# Number of records and last record (hex) of each level file as it is now
+def level_state(store_dir, record_size):
+  level_records = {}
+  for bucket_size in LEVELS:
+    path = level_file(store_dir, bucket_size)
+    num_records = os.path.getsize(path) // record_size if os.path.isfile(path) else 0
+    last = ""
+    if num_records > 0:
+      with open(path, 'rb') as f:
+        f.seek((num_records - 1) * record_size)
+        last = f.read(record_size).hex()
+    level_records[str(bucket_size)] = [num_records, last]
+  return level_records
+
+# Put level files back to number of records and last record saved in metadata (empty if not saved) - removes records appended and undoes
+# merge into last record by an update interrupted before metadata was saved
+def restore_levels(store_dir, level_records, record_size):
+  for bucket_size in LEVELS:
+    path = level_file(store_dir, bucket_size)
+    num_records, last = level_records.get(str(bucket_size), [0, ""])
+    if not os.path.isfile(path):
+      continue
+    with open(path, 'r+b') as f:
+      f.truncate(num_records * record_size)
+      if num_records > 0:
+        f.seek((num_records - 1) * record_size)
+        f.write(bytes.fromhex(last))
+
+# Add chunks of data log to every level - returns number of samples added
+def add_chunks(store_dir, meta, chunks, source, inode):
+  added = 0
+  for timestamps, setpoints, temps, demand, offset in chunks:
+    # Only samples later than all previous samples are added
+    previous = np.maximum.accumulate(np.concatenate(([meta["last_timestamp"]], timestamps[:-1])))
+    new = timestamps > previous
+    if np.any(new):
+      values = np.vstack((setpoints, temps, demand))[:, new]
+      for bucket_size in LEVELS:
+        meta["level_records"][str(bucket_size)] = append_records(level_file(store_dir, bucket_size), summarise(timestamps[new], values, bucket_size))
+      meta["last_timestamp"] = int(timestamps[new][-1])
+      added += int(np.count_nonzero(new))
+    meta["source"] = source
+    meta["inode"] = inode
+    meta["offset"] = offset
+    save_meta(store_dir, meta)
+  return added
+
+# Update store with rows appended to data log since previous update - returns number of samples added
+# Raises OSError if data log cannot be read or store cannot be written, ValueError if data log channels do not match store
+def update(store_dir, data_file, chunk_rows=data_log.CHUNK_ROWS):
+  os.makedirs(store_dir, exist_ok=True)
+  source = os.path.abspath(data_file)
+  meta = load_meta(store_dir)
+  if meta == None:
+    # Level files left by an interrupted first update are emptied
+    restore_levels(store_dir, {}, 0)
+  elif "level_records" in meta:
+    restore_levels(store_dir, meta["level_records"], record_dtype(len(meta["labels"])).itemsize)
+  else:
+    # Store created before level state was saved - current level files are kept
+    meta["level_records"] = level_state(store_dir, record_dtype(len(meta["labels"])).itemsize)
+  log_stat = os.stat(source)
+  added = 0
+  offset = None
+  if meta != None and meta["source"] == source:
+    if meta["inode"] == log_stat.st_ino and log_stat.st_size >= meta["offset"]:
+      offset = meta["offset"]
+    elif meta["inode"] != log_stat.st_ino and os.path.isfile(source + ".1") and os.stat(source + ".1").st_ino == meta["inode"]:
+      # Log rotated since last update - finish reading rotated log first
+      labels, chunks = data_log.read_data_log_chunks(source + ".1", meta["offset"], chunk_rows)
+      added += add_chunks(store_dir, meta, chunks, source, meta["inode"])
+  labels, chunks = data_log.read_data_log_chunks(source, offset, chunk_rows)
+  labels = ["Setpoint"] + labels + ["Demand"]
+  if meta == None:
+    meta = {"version": ROLLUP_VERSION, "labels": labels, "levels": LEVELS, "source": source, "inode": log_stat.st_ino, "offset": 0, "last_timestamp": -1,
+            "level_records": {}}
+  elif meta["labels"] != labels:
+    raise ValueError("Data log channels (" + ', '.join(labels) + ") do not match rollup store (" + ', '.join(meta["labels"]) + ") - use a new store directory")
+  added += add_chunks(store_dir, meta, chunks, source, log_stat.st_ino)
+  return added
+
+# Read-only records of one level of store
+def read_level(store_dir, bucket_size, num_series):
+  dtype = record_dtype(num_series)
+  path = level_file(store_dir, bucket_size)
+  num_records = os.path.getsize(path) // dtype.itemsize if os.path.isfile(path) else 0
+  if num_records == 0:
+    return np.zeros(0, dtype=dtype)
+  return np.memmap(path, dtype=dtype, mode='r', shape=(num_records,))
+
+# Records covering start to end from coarsest level with at least points buckets in that time (finest level if none has enough)
+# Returns series labels, bucket size (seconds) and records - raises ValueError if store is empty
+def query(store_dir, start, end, points):
+  meta = load_meta(store_dir)
+  if meta == None:
+    raise ValueError("Rollup store " + store_dir + " is empty")
+  bucket_size = LEVELS[0]
+  for level in reversed(LEVELS):
+    if (end - start) / level >= points:
+      bucket_size = level
+      break
+  records = read_level(store_dir, bucket_size, len(meta["labels"]))
+  first, last = np.searchsorted(records['start'], [start - start % bucket_size, end])
+  return meta["labels"], bucket_size, records[first:last]
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+# Incremental sync of temperature controller logs and analysis outputs to AWS S3 (or S3 compatible storage) - used by temperature_controller.sh
+# Only files changed since last sync are uploaded, and logs are uploaded as daily chunks so only the latest day of each log is sent again
+
+# SYNTAX: ./s3_sync.py [--log <controller log>] [--datalog <data log>] [--file <file>=<key>] [--manifest <manifest file>] [--public] [--timestamped]
+#                      [--endpoint-url <url>] [--connections <number>] <output directory> <S3 destination>
+
+# EXAMPLE CALLS
+# ./s3_sync.py --log /var/log/temperature-controller/control_temp.log --datalog /var/log/temperature-controller/temperature_data.csv /var/log/temperature-controller s3://mybucket/controller
+# ./s3_sync.py --public --file /run/temperature-controller/status.json=status.json outputs s3://mybucket
+# ./s3_sync.py --endpoint-url http://127.0.0.1:5000 outputs s3://test-bucket/controller
+
+# INPUTS
+# <output directory> directory of analysis outputs (and web page) uploaded to <S3 destination>, including subdirectories (e.g. rollup).  Hidden files,
+#   sidecar index files (.idx), temporary files (.tmp), checkpoints (.checkpoint) and logs given with --log / --datalog (and their rotated logs)
+#   are not uploaded, nor are timestamped analysis outputs (YYYYMMDD_HHMMSS_*) unless --timestamped is given - the latest outputs are copied to
+#   fixed names by analysis
+# <S3 destination> s3://<bucket>[/<path>]
+# --log / --datalog controller log / data log (CSV or binary) to upload in daily chunks - may be given more than once, logs which do not exist are skipped
+# --file file uploaded to <S3 destination>/<key> if changed, e.g. controller status snapshot - may be given more than once, skipped if file does not exist
+# --manifest record of files and log chunks uploaded - default <output directory>/.s3_manifest.json
+# --public objects uploaded with public-read ACL (for S3 static web hosting)
+# --endpoint-url S3 compatible endpoint to use instead of AWS (e.g. MinIO, or a local test server such as moto_server)
+# --connections number of uploads in parallel, sharing one connection pool (default 4)
+# Credentials and region are taken from the usual AWS configuration (environment variables, ~/.aws/credentials and ~/.aws/config), as used by AWS CLI
+
+# OUTPUTS
+# Files are uploaded when their size or modification time has changed since last sync, and their MD5 hash differs from the one uploaded
+# Each log is uploaded to <S3 destination>/<log name>.parts/<YYYYMMDD_HHMMSS>.<log extension> - one object per day, named from time of first line of
+#   day (days are located with the sidecar day index of the log, see log_index.py).  Complete days are uploaded once and never change, and only
+#   the current day is uploaded again while lines are appended.  Data log chunks start with the data log header, so each is a valid data log.
+#   If a log has been rotated since last sync, the rest of the rotated log (<log>.1) is uploaded first.  <log name>.parts/index.html lists all chunks
+# Manifest (JSON) is written atomically after each sync, and only holds uploads which succeeded - failed uploads are retried at next sync
+# Exit status: 0 success, 1 one or more uploads failed (error printed to STDOUT)
+
+# CHANGELOG
+# 10/2026 - First Version
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import re
+import sys
+import json
+import bisect
+import struct
+import hashlib
+import argparse
+import mimetypes
+from time import gmtime, strftime
+from concurrent.futures import ThreadPoolExecutor
+import data_log
+import log_index
+import log_timestamps
+try:
+  import boto3
+  import botocore.config
+  import botocore.exceptions
+except ImportError:
+  print("ERROR: S3 sync requires boto3 - install with 'sudo apt-get install python3-boto3' (installed by install.sh)")
+  sys.exit(1)
+
+MANIFEST_VERSION = 1
+# Timestamped outputs of controller_analyse.py / data_analyse.py
+TIMESTAMPED_OUTPUT = re.compile(r'^\d{8}_\d{6}_')
+# Files in output directory which are never uploaded
+EXCLUDED_EXTENSIONS = (".idx", ".tmp", ".checkpoint")
+
+mimetypes.add_type("text/plain", ".log")
+
+# Split s3://<bucket>/<path> into bucket and key prefix (empty, or ending /)
+def parse_destination(destination):
+  match = re.match(r'^s3://([^/]+)/?(.*)$', destination)
+  if not match:
+    raise ValueError("S3 destination must be in form s3://<bucket>/<path>")
+  prefix = match.group(2)
+  if prefix and not prefix.endswith("/"):
+    prefix += "/"
+  return match.group(1), prefix
+
+# Read manifest - new (empty) manifest if there is none, or it is for another destination
+def load_manifest(manifest_file, destination):
+  try:
+    with open(manifest_file, 'r') as f:
+      manifest = json.load(f)
+    if manifest.get("version") == MANIFEST_VERSION and manifest["destination"] == destination:
+      return manifest
+    print("WARNING: Manifest %s is for another destination - uploading all files" % manifest_file)
+  except FileNotFoundError:
+    pass
+  except (OSError, ValueError, KeyError) as e:
+    print("WARNING: Cannot read manifest %s - uploading all files (%s)" % (manifest_file, str(e)))
+  return {"version": MANIFEST_VERSION, "destination": destination, "files": {}, "logs": {}}
+
+# Write manifest atomically, so an interrupted sync leaves previous manifest intact
+def save_manifest(manifest_file, manifest):
+  with open(manifest_file + ".tmp", 'w') as f:
+    json.dump(manifest, f)
+  os.replace(manifest_file + ".tmp", manifest_file)
+
+# MD5 hash of file contents (hex)
+def file_md5(filename):
+  md5 = hashlib.md5()
+  with open(filename, 'rb') as f:
+    for block in iter(lambda: f.read(1048576), b''):
+      md5.update(block)
+  return md5.hexdigest()
+
+# Upload file or bytes to key
+def put_object(key, body):
+  arguments = {"Bucket": bucket, "Key": key, "Body": body, "ContentType": mimetypes.guess_type(key)[0] or "application/octet-stream"}
+  if args.public:
+    arguments["ACL"] = "public-read"
+  client.put_object(**arguments)
+
+# Upload file if changed since it was last uploaded - returns manifest entry of file
+def sync_file(filename, key, entry, kind=None):
+  file_stat = os.stat(filename)
+  if entry != None and entry["size"] == file_stat.st_size and entry["mtime_ns"] == file_stat.st_mtime_ns:
+    return entry
+  md5 = file_md5(filename)
+  if entry == None or entry["md5"] != md5:
+    with open(filename, 'rb') as f:
+      put_object(key, f)
+    print("Uploaded %s to %s" % (filename, key))
+  return {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns, "md5": md5}
+
+# Header of log written at start of every chunk (data log header - controller log has no header)
+def log_header(f, kind):
+  if kind == "controller":
+    return b""
+  f.seek(0)
+  if f.read(len(data_log.BINARY_MAGIC)) == data_log.BINARY_MAGIC:
+    f.seek(0)
+    header_length = data_log.read_binary_header(f)[1]
+    f.seek(0)
+    return f.read(header_length)
+  f.seek(0)
+  return f.readline()
+
+# Name of chunk starting at offset - time of first line (or record) of chunk
+def chunk_name(f, kind, binary, offset):
+  f.seek(offset)
+  if binary:
+    line_time = struct.unpack('<q', f.read(8))[0]
+  else:
+    line = f.readline().decode('utf-8', 'replace')
+    line_time = log_timestamps.parse_log_timestamp(line) if kind == "controller" else log_timestamps.parse_csv_timestamp(line[0:19])
+  return strftime("%Y%m%d_%H%M%S", gmtime(line_time))
+
+# Upload daily chunks of log not yet uploaded, updating log state in manifest - if rotated, last day is complete as no more lines are appended
+def upload_log_chunks(log_file, kind, state, prefix, extension, rotated):
+  index = log_index.update(log_file, kind)
+  days = index["days"]
+  with open(log_file, 'rb') as f:
+    header = log_header(f, kind)
+    binary = header.startswith(data_log.BINARY_MAGIC)
+    # Days before the one holding the offset uploaded to are complete
+    first = max(0, bisect.bisect_right([entry[1] for entry in days], state["offset"]) - 1)
+    for ii in range(first, len(days)):
+      end = days[ii + 1][1] if ii + 1 < len(days) else index["offset"]
+      if end <= state["offset"]:
+        continue
+      complete = ii + 1 < len(days) or rotated
+      name = chunk_name(f, kind, binary, days[ii][1])
+      if state["tail"] != [name, end]:
+        # First chunk also holds any lines before first timestamp
+        start = len(header) if ii == 0 else days[ii][1]
+        f.seek(start)
+        put_object(prefix + name + extension, header + f.read(end - start))
+        print("Uploaded %s (%d bytes) to %s" % (log_file, end - start, prefix + name + extension))
+        if name not in state["chunks"]:
+          state["chunks"].append(name)
+      state["tail"] = None if complete else [name, end]
+      if complete:
+        state["offset"] = end
+
+# Upload log as daily chunks, and list of chunks if changed - returns log state for manifest
+def sync_log(log_file, key, state, kind):
+  prefix = key + ".parts/"
+  extension = os.path.splitext(log_file)[1]
+  log_stat = os.stat(log_file)
+  if state != None and state["inode"] != log_stat.st_ino:
+    # Log rotated since last sync - finish uploading rotated log
+    rotated_file = log_file + ".1"
+    if os.path.isfile(rotated_file) and os.stat(rotated_file).st_ino == state["inode"]:
+      upload_log_chunks(rotated_file, kind, state, prefix, extension, True)
+    else:
+      print("WARNING: Log %s rotated since last sync, but rotated log not found - lines logged before rotation since last sync are not uploaded" % log_file)
+    state = dict(state, inode=log_stat.st_ino, offset=0, tail=None)
+  elif state != None and log_stat.st_size < state["offset"]:
+    print("WARNING: Log %s truncated since last sync - uploading from start" % log_file)
+    state = dict(state, offset=0, tail=None)
+  if state == None:
+    state = {"inode": log_stat.st_ino, "offset": 0, "tail": None, "chunks": [], "listed": 0}
+  upload_log_chunks(log_file, kind, state, prefix, extension, False)
+  if state["listed"] != len(state["chunks"]):
+    # List of chunks, for web page
+    links = ''.join(['    <a href="%s%s">%s%s</a><br>\n' % (name, extension, name, extension) for name in state["chunks"]])
+    put_object(prefix + "index.html", ("<html>\n  <head>\n    <title>%s</title>\n  </head>\n  <body>\n%s  </body>\n</html>\n" % (os.path.basename(log_file), links)).encode())
+    state["listed"] = len(state["chunks"])
+  return state
+
+# Run upload task, printing any error - returns (manifest section, key, entry), entry None if upload failed
+def run_task(task):
+  function, filename, key, section, entry, kind = task
+  try:
+    return section, key, function(filename, key, entry, kind)
+  except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError, OSError, ValueError) as e:
+    print("ERROR: Cannot upload %s to %s - %s" % (filename, key, str(e)))
+    return section, key, None
+
+parser = argparse.ArgumentParser(description='Sync temperature controller logs and analysis outputs to AWS S3, uploading only changes')
+parser.add_argument('output_dir', help='Directory of analysis outputs to upload')
+parser.add_argument('destination', help='S3 destination - s3://<bucket>/<path>')
+parser.add_argument('--log', '-l', action='append', default=[], metavar='FILENAME', help='Controller log to upload in daily chunks (may be repeated)')
+parser.add_argument('--datalog', '-d', action='append', default=[], metavar='FILENAME', help='Data log to upload in daily chunks (may be repeated)')
+parser.add_argument('--file', '-f', action='append', default=[], metavar='FILENAME=KEY', help='File to upload to key under destination (may be repeated)')
+parser.add_argument('--manifest', '-m', type=str, metavar='FILENAME', help='Manifest of uploads - default: <output directory>/.s3_manifest.json')
+parser.add_argument('--public', '-p', action='store_true', help='Upload with public-read ACL')
+parser.add_argument('--timestamped', '-t', action='store_true', help='Also upload timestamped analysis outputs (YYYYMMDD_HHMMSS_*)')
+parser.add_argument('--endpoint-url', '-e', type=str, metavar='URL', help='S3 compatible endpoint to use instead of AWS')
+parser.add_argument('--connections', '-c', type=int, default=4, help='Number of uploads in parallel - default: 4')
+args = parser.parse_args()
+
+try:
+  bucket, prefix = parse_destination(args.destination)
+except ValueError as e:
+  print("ERROR: " + str(e))
+  sys.exit(1)
+manifest_file = args.manifest or os.path.join(args.output_dir, ".s3_manifest.json")
+manifest = load_manifest(manifest_file, args.destination)
+
+# Upload tasks - (function, local file, key, manifest section, manifest entry, log kind)
+tasks = []
+logs = [(log_file, "controller") for log_file in args.log] + [(log_file, "data") for log_file in args.datalog]
+for log_file, kind in logs:
+  if os.path.isfile(log_file):
+    key = prefix + os.path.basename(log_file)
+    tasks.append((sync_log, log_file, key, "logs", manifest["logs"].get(key), kind))
+for file_argument in args.file:
+  filename, separator, name = file_argument.rpartition("=")
+  if not separator:
+    filename, name = file_argument, os.path.basename(file_argument)
+  if os.path.isfile(filename):
+    tasks.append((sync_file, filename, prefix + name, "files", manifest["files"].get(prefix + name), None))
+# Logs (and their rotated logs) are only uploaded as chunks
+log_patterns = [re.compile(re.escape(os.path.abspath(log_file)) + r'(\.\d+(\.gz)?)?$') for log_file, kind in logs]
+for directory, subdirectories, filenames in os.walk(args.output_dir):
+  subdirectories[:] = sorted([name for name in subdirectories if not name.startswith(".")])
+  for name in sorted(filenames):
+    filename = os.path.join(directory, name)
+    if name.startswith(".") or name.endswith(EXCLUDED_EXTENSIONS) or any(pattern.match(os.path.abspath(filename)) for pattern in log_patterns) or (TIMESTAMPED_OUTPUT.match(name) and not args.timestamped):
+      continue
+    key = prefix + os.path.relpath(filename, args.output_dir).replace(os.sep, "/")
+    tasks.append((sync_file, filename, key, "files", manifest["files"].get(key), None))
+
+# One client (and connection pool) shared by all uploads
+client = boto3.session.Session().client('s3', endpoint_url=args.endpoint_url,
+  config=botocore.config.Config(max_pool_connections=args.connections, retries={'max_attempts': 5, 'mode': 'standard'}))
+failures = 0
+with ThreadPoolExecutor(max_workers=args.connections) as pool:
+  for section, key, entry in pool.map(run_task, tasks):
+    if entry == None:
+      failures += 1
+    else:
+      manifest[section][key] = entry
+try:
+  save_manifest(manifest_file, manifest)
+except OSError as e:
+  print("WARNING: Cannot save manifest %s - %s" % (manifest_file, str(e)))
+sys.exit(1 if failures else 0)
@@ -0,0 +1,187 @@
+# Weekly setpoint schedule for temperature controller - used by control_temp.py (--schedule) to change setpoint at set times without cron
+
+# SYNTAX: import setpoint_schedule
+#         schedule = setpoint_schedule.load_schedule(<schedule file>)
+#         setpoint = schedule.setpoint(<time>)
+#         setpoint, target = schedule.lookup(<time>)
+
+# EXAMPLE CALLS
+# schedule = setpoint_schedule.load_schedule("/etc/controller-setpoints/schedule")
+# setpoint = schedule.setpoint(clock.time())
+
+# INPUTS
+# <schedule file> text file with one rule per line (blank lines and lines starting # are ignored) - see config/schedule.conf for an example:
+#   <days> <HH:MM> <setpoint> [<ramp minutes>] - from <HH:MM> on <days> the setpoint is <setpoint> (C) until the next rule.  <days> is a day (Mon,
+#     Tue ... Sun), a range (Mon-Fri), a list of days and ranges (Mon,Wed,Sat-Sun) or * for every day.  With <ramp minutes> the setpoint is
+#     ramped in 0.1 C steps from the previous setpoint to <setpoint> over that time, starting at <HH:MM>
+#   holiday <date>[:<end date>] <day | setpoint> - on these dates (YYYY-MM-DD, end date included) the rules of another day are followed instead
+#     (e.g. Sun), or a fixed setpoint is held all day
+# <time> unix timestamp - rules are in local time of the controller (same as cron), note the controller assumes OS timezone is UTC
+
+# OUTPUTS
+# load_schedule() compiles the rules into a table of transitions sorted by time of week, and holidays into a table of date ranges sorted by start
+#   date, so each setpoint() is two binary searches.  Raises ValueError (with line number) if the file cannot be read or a rule is not valid
+# setpoint() - scheduled setpoint (C) at <time>.  The week wraps around, so before the first rule of the week the last rule of the previous week applies
+# lookup() - scheduled setpoint and target setpoint of the rule (or holiday) in force at <time> - these only differ while ramping, so a change
+#   of target is a new scheduled change but a ramp step is not
+# If more than one rule gives the same day and time, the last in the file is used
+
+# CHANGELOG
+# 10/2026 - First Version
+# 10/2026 - Added lookup() giving target setpoint of rule in force
+
+# Copyright (C) 2026 Aaron Lockton
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import bisect
+import datetime
+from time import localtime
+
+DAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+WEEK = 7 * 86400
+# Ramped setpoints are rounded to this step, so a ramp changes setpoint (and is logged) at most once per step
+RAMP_STEP = 0.1
+
+class SetpointSchedule:
+  def __init__(self, rules, holidays):
+    if not rules:
+      raise ValueError("Schedule must contain at least one rule")
+    # Transitions [time of week (s from Monday 00:00), setpoint, ramp (s)] - rules for the same time of week replace earlier ones
+    transitions = {}
+    for week_time, setpoint, ramp in rules:
+      transitions[week_time] = [week_time, setpoint, ramp]
+    self.transitions = sorted(transitions.values())
+    self.transition_times = [transition[0] for transition in self.transitions]
+    # Holidays [first day, last day (date ordinals), day of week or fixed setpoint]
+    self.holidays = sorted(holidays)
+    for previous, holiday in zip(self.holidays, self.holidays[1:]):
+      if holiday[0] <= previous[1]:
+        raise ValueError("Holidays starting "+str(datetime.date.fromordinal(previous[0]))+" and "+str(datetime.date.fromordinal(holiday[0]))+" overlap")
+    self.holiday_starts = [holiday[0] for holiday in self.holidays]
+
+  # Scheduled setpoint at unix time
+  def setpoint(self, now):
+    return self.lookup(now)[0]
+
+  # Scheduled setpoint and target setpoint of rule in force at unix time
+  def lookup(self, now):
+    local = localtime(now)
+    day = local.tm_wday
+    date = datetime.date(local.tm_year, local.tm_mon, local.tm_mday).toordinal()
+    # Last holiday starting on or before today - applies if it has not ended
+    position = bisect.bisect_right(self.holiday_starts, date) - 1
+    if position >= 0 and self.holidays[position][1] >= date:
+      if isinstance(self.holidays[position][2], float):
+        return self.holidays[position][2], self.holidays[position][2]
+      day = self.holidays[position][2]
+    week_time = day * 86400 + local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec
+    # Last transition at or before time of week - position -1 (before first transition) is last transition of previous week
+    position = bisect.bisect_right(self.transition_times, week_time) - 1
+    start, setpoint, ramp = self.transitions[position]
+    elapsed = (week_time - start) % WEEK
+    if elapsed >= ramp:
+      return setpoint, setpoint
+    previous = self.transitions[position - 1][1]
+    return round(round((previous + (setpoint - previous) * elapsed / ramp) / RAMP_STEP) * RAMP_STEP, 1), setpoint
+
+# Days of week (0 Monday) given by days field of rule - e.g. Mon-Fri, Sat,Sun or *
+def parse_days(field):
+  if field == "*":
+    return list(range(7))
+  days = []
+  for part in field.lower().split(","):
+    first, _, last = part.partition("-")
+    if first not in DAYS or (last and last not in DAYS):
+      raise ValueError("Invalid day(s) "+field+" - must be * or days "+', '.join(DAYS)+" separated by , or -")
+    first = DAYS.index(first)
+    last = DAYS.index(last) if last else first
+    # Range may wrap around end of week, e.g. Sat-Mon
+    days += [(first + ii) % 7 for ii in range((last - first) % 7 + 1)]
+  return days
+
+# Seconds since midnight of HH:MM
+def parse_time(field):
+  try:
+    hours, minutes = [int(part) for part in field.split(":")]
+  except ValueError:
+    raise ValueError("Invalid time "+field+" - must be HH:MM")
+  if not (0 <= hours < 24 and 0 <= minutes < 60):
+    raise ValueError("Invalid time "+field+" - must be HH:MM")
+  return hours * 3600 + minutes * 60
+
+# Setpoint (C) given in rule
+def parse_setpoint(field):
+  try:
+    setpoint = float(field)
+  except ValueError:
+    raise ValueError("Invalid setpoint "+field+" - must be a number")
+  if setpoint != setpoint or setpoint in [float("inf"), float("-inf")]:
+    raise ValueError("Invalid setpoint "+field+" - must be a number")
+  return setpoint
+
+# Date ordinal of YYYY-MM-DD
+def parse_date(field):
+  try:
+    return datetime.date.fromisoformat(field).toordinal()
+  except ValueError:
+    raise ValueError("Invalid date "+field+" - must be YYYY-MM-DD")
+
+# Read and compile schedule file - raises ValueError if file cannot be read or is not valid
+def load_schedule(schedule_file):
+  try:
+    with open(schedule_file, 'r') as f:
+      lines = f.readlines()
+  except OSError as e:
+    raise ValueError("Cannot read setpoint schedule "+schedule_file+" - "+str(e))
+  rules = []
+  holidays = []
+  for line_number, line in enumerate(lines, 1):
+    fields = line.split()
+    if not fields or fields[0].startswith("#"):
+      continue
+    try:
+      if fields[0].lower() == "holiday":
+        if len(fields) != 3:
+          raise ValueError("Holiday must be: holiday <date>[:<end date>] <day | setpoint>")
+        first, _, last = fields[1].partition(":")
+        first = parse_date(first)
+        last = parse_date(last) if last else first
+        if last < first:
+          raise ValueError("Holiday end date "+fields[1]+" is before start date")
+        if fields[2].lower() in DAYS:
+          holidays.append([first, last, DAYS.index(fields[2].lower())])
+        else:
+          holidays.append([first, last, parse_setpoint(fields[2])])
+        continue
+      if len(fields) not in [3, 4]:
+        raise ValueError("Rule must be: <days> <HH:MM> <setpoint> [<ramp minutes>]")
+      time = parse_time(fields[1])
+      setpoint = parse_setpoint(fields[2])
+      ramp = 0
+      if len(fields) == 4:
+        try:
+          ramp = float(fields[3]) * 60
+        except ValueError:
+          raise ValueError("Invalid ramp "+fields[3]+" - must be a number of minutes")
+        if not (0 <= ramp < WEEK):
+          raise ValueError("Invalid ramp "+fields[3]+" - must be a number of minutes less than a week")
+      for day in parse_days(fields[0]):
+        rules.append([day * 86400 + time, setpoint, ramp])
+    except ValueError as e:
+      raise ValueError("Invalid setpoint schedule "+schedule_file+" line "+str(line_number)+" - "+str(e))
+  try:
+    return SetpointSchedule(rules, holidays)
+  except ValueError as e:
+    raise ValueError("Invalid setpoint schedule "+schedule_file+" - "+str(e))
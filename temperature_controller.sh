@@ -12,8 +12,8 @@
 # INPUTS
 # Configuration file must be present at either /etc/controller.conf or config/controller.conf (former takes precedence)
 # <function> must be specified:
-#       'set' to set temperature setpoint (in file)
-#       'get' to get current temperature(s) (to STDOUT)
+#       'set' to set temperature setpoint (sent to running controller if CONTROL_SOCKET is configured, otherwise in file)
+#       'get' to get current temperature(s) (to STDOUT) - latest readings from running controller if CONTROL_SOCKET is configured
 #       'control' to run temperature controller
 #       'analyse' to analyse logfile (and push data to AWS S3 if configured)
 #       'sync' Push data to AWS S3 if configured
@@ -26,6 +26,7 @@
 
 # CHANGELOG
 # 06/2020 - First Version
+# 10/2026 - On exit/failure switch off output of every channel in multi-channel mode
 
 # Copyright (C) 2020 Aaron Lockton
 
@@ -59,50 +60,64 @@ else
   exit 1
 fi
 
+# GPIO output and controller logfile of each channel, one per line - in multi-channel mode read from channel definition file
+function channel_outputs {
+  if [[ ! -z ${CHANNELS_FILE} ]]; then
+    python3 -c '
+import sys, configparser
+config = configparser.ConfigParser(interpolation=None)
+config.read(sys.argv[1])
+for name in config.sections():
+  if config[name].get("gpioout"):
+    print(config[name].get("gpioout"), config[name].get("messagelog", sys.argv[2]))
+' "${CHANNELS_FILE}" "${CONTROLLER_LOGFILE}"
+  else
+    echo "${GPIO_OUTPUT} ${CONTROLLER_LOGFILE}"
+  fi
+}
+
 function switch_off_and_exit {
   echo "Temperature controller terminated/failed - checking demand is off and exiting wrapper process"
-  if [[ -f /sys/class/gpio/gpio${GPIO_OUTPUT}/value ]] && [[ $(cat /sys/class/gpio/gpio${GPIO_OUTPUT}/value) = "1" ]]; then
-    if [[ -s ${CONTROLLER_LOGFILE} ]]; then
-      # If logfile exists and already has content, ensure switch-off is not missed - note this will not be logged by controller as it was terminated
-      echo "$(date -u +"%F-%T"): Temperature controller exiting - Switching system off" >> ${CONTROLLER_LOGFILE}
+  while read -r OUTPUT LOGFILE; do
+    if [[ -f /sys/class/gpio/gpio${OUTPUT}/value ]] && [[ $(cat /sys/class/gpio/gpio${OUTPUT}/value) = "1" ]]; then
+      if [[ -s ${LOGFILE} ]]; then
+        # If logfile exists and already has content, ensure switch-off is not missed - note this will not be logged by controller as it was terminated
+        echo "$(date -u +"%F-%T"): Temperature controller exiting - Switching system off" >> "${LOGFILE}"
+      fi
+      echo 0 > /sys/class/gpio/gpio${OUTPUT}/value
     fi
-    echo 0 > /sys/class/gpio/gpio${GPIO_OUTPUT}/value
-  fi
+  done < <(channel_outputs)
   exit 1
 }
 
 function sync_to_s3 {
   # If enabled in config, sync outputs to S3
   if [[ "${ENABLE_S3_SYNC,,}" = "1" ]] || [[ "${ENABLE_S3_SYNC,,}" = "enabled" ]] || [[ "${ENABLE_S3_SYNC,,}" = "yes" ]]; then
-    # sync to s3, if error is aws cli installed, is path correct, check permissions IAM, etc
+    # sync to s3, if error is boto3 installed, is path correct, check permissions IAM, etc
     if [[ "${S3_PUBLIC_ACCESS,,}" = "1" ]] || [[ "${S3_PUBLIC_ACCESS,,}" = "enabled" ]] || [[ "${S3_PUBLIC_ACCESS,,}" = "yes" ]]; then
-      ACL_ARG="--acl public-read"
+      SYNC_ARGS="--public"
     else
-      ACL_ARG=
+      SYNC_ARGS=
     fi
     echo "Attempting to sync logfiles and data to specified AWS S3 location ${S3_DESTINATION_PATH}"
-    ERROR_COUNTER=0
-    # Avoid double-copying logs if they are in same dir as analysis outputs
-    if [[ $(dirname "${DATA_LOGFILE}") != "${ANALYSIS_OUTDIR%/}" ]]; then
-      # Use sync rather than copy although clunky for a single file to prevent unecessary PUT if file not changed
-      aws s3 sync ${ACL_ARG} --exclude "*" --include $(basename "${DATA_LOGFILE}") $(dirname "${DATA_LOGFILE}") "${S3_DESTINATION_PATH}"
-      if [[ $? -ne 0 ]];then
-        ((ERROR_COUNTER+=1))
-      fi
+    if [[ -n "${S3_ENDPOINT_URL}" ]]; then
+      SYNC_ARGS="${SYNC_ARGS} --endpoint-url ${S3_ENDPOINT_URL}"
     fi
-    if [[ $(dirname "${CONTROLLER_LOGFILE}") != "${ANALYSIS_OUTDIR%/}" ]]; then
-      # Use sync rather than copy although clunky for a single file to prevent unecessary PUT if file not changed
-      aws s3 sync ${ACL_ARG} --exclude "*" --include $(basename "${CONTROLLER_LOGFILE}") $(dirname "${CONTROLLER_LOGFILE}") "${S3_DESTINATION_PATH}"
-      if [[ $? -ne 0 ]];then
-        ((ERROR_COUNTER+=1))
-      fi
+    if [[ "${S3_SYNC_TIMESTAMPED,,}" = "1" ]] || [[ "${S3_SYNC_TIMESTAMPED,,}" = "enabled" ]] || [[ "${S3_SYNC_TIMESTAMPED,,}" = "yes" ]]; then
+      SYNC_ARGS="${SYNC_ARGS} --timestamped"
     fi
-    aws s3 sync ${ACL_ARG} "${ANALYSIS_OUTDIR}" "${S3_DESTINATION_PATH}"
-    if [[ $? -ne 0 ]];then
-      ((ERROR_COUNTER+=1))
+    if [[ -n "${S3_SYNC_MANIFEST}" ]]; then
+      SYNC_ARGS="${SYNC_ARGS} --manifest ${S3_SYNC_MANIFEST}"
     fi
-    if [[ ${ERROR_COUNTER} -ne 0 ]]; then
-      echo "ERROR: AWS S3 sync did not complete successfully - check internet connection, AWS CLI is installed, configured path to destination bucket (${S3_DESTINATION_PATH}) is correct and there are rw permissions for controller on this location in AWS IAM"
+    # Latest status snapshot of controller (if running) for web page
+    if [[ -s "${STATUS_FILE}" ]]; then
+      SYNC_ARGS="${SYNC_ARGS} --file ${STATUS_FILE}=status.json"
+    fi
+    # Only changed outputs and new log lines (in daily chunks) are uploaded, in one process
+    "${SCRIPTDIR}/s3_sync.py" ${SYNC_ARGS} --log "${CONTROLLER_LOGFILE}" --datalog "${DATA_LOGFILE}" "${ANALYSIS_OUTDIR}" "${S3_DESTINATION_PATH}"
+    SYNC_STATUS=$?
+    if [[ ${SYNC_STATUS} -ne 0 ]]; then
+      echo "ERROR: AWS S3 sync did not complete successfully - check internet connection, boto3 is installed, configured path to destination bucket (${S3_DESTINATION_PATH}) is correct and there are rw permissions for controller on this location in AWS IAM"
     else
       echo "AWS S3 sync completed"
     fi
@@ -121,27 +136,60 @@ elif [[ "${1,,}" = "get" ]]; then
 elif [[ "${1,,}" = "control" ]]; then
   # Control mode - run control_temp.py
   ARG_STRING=
-  ARG_STRING+="${SETPOINT_FILE}"
-  if [[ ! -z ${HYTERESIS} ]]; then
-    ARG_STRING+=" -t ${HYTERESIS}"
-  fi
-  if [[ ${COOLERMODE,,} = "1" ]] || [[ ${COOLERMODE,,} = "enabled" ]] || [[ ${COOLERMODE,,} = "yes" ]]; then
-    ARG_STRING+=" -c"
+  if [[ ! -z ${CHANNELS_FILE} ]]; then
+    # Multi-channel mode - per-channel settings are taken from channel definition file
+    ARG_STRING+="--channels ${CHANNELS_FILE}"
+    WIRED_SENSOR_LABELS=()
+  else
+    ARG_STRING+="${SETPOINT_FILE}"
+    if [[ ! -z ${SETPOINT_SCHEDULE} ]]; then
+      ARG_STRING+=" --schedule ${SETPOINT_SCHEDULE}"
+    fi
+    if [[ ! -z ${HYTERESIS} ]]; then
+      ARG_STRING+=" -t ${HYTERESIS}"
+    fi
+    if [[ ${COOLERMODE,,} = "1" ]] || [[ ${COOLERMODE,,} = "enabled" ]] || [[ ${COOLERMODE,,} = "yes" ]]; then
+      ARG_STRING+=" -c"
+    fi
+    if [[ ! -z ${WIRED_SENSORS} ]]; then
+      ARG_STRING+=" -s ${WIRED_SENSORS[@]}"
+    fi
+    if [[ ! -z ${SENSOR_RESOLUTION} ]]; then
+      ARG_STRING+=" --resolution ${SENSOR_RESOLUTION[@]}"
+    fi
+    if [[ ! -z ${GPIO_OUTPUT} ]]; then
+      ARG_STRING+=" -g ${GPIO_OUTPUT}"
+    fi
+    if [[ ! -z ${GPIO_FEEDBACK} ]]; then
+      ARG_STRING+=" -f ${GPIO_FEEDBACK}"
+    fi
+    if [[ ! -z ${DATA_LOGFILE} ]]; then
+      ARG_STRING+=" -l ${DATA_LOGFILE}"
+    fi
   fi
   if [[ ${VERBOSE,,} = "1" ]] || [[ ${VERBOSE,,} = "enabled" ]] || [[ ${VERBOSE,,} = "yes" ]]; then
     ARG_STRING+=" -v"
   fi
-  if [[ ! -z ${WIRED_SENSORS} ]]; then
-    ARG_STRING+=" -s ${WIRED_SENSORS[@]}"
+  if [[ ! -z ${GPIO_BACKEND} ]]; then
+    ARG_STRING+=" -b ${GPIO_BACKEND}"
+  fi
+  if [[ ! -z ${FEEDBACK_TIMEOUT} ]]; then
+    ARG_STRING+=" -z ${FEEDBACK_TIMEOUT}"
   fi
-  if [[ ! -z ${GPIO_OUTPUT} ]]; then
-    ARG_STRING+=" -g ${GPIO_OUTPUT}"
+  if [[ ! -z ${SENSOR_SWEEP} ]]; then
+    ARG_STRING+=" -w ${SENSOR_SWEEP}"
   fi
-  if [[ ! -z ${GPIO_FEEDBACK} ]]; then
-    ARG_STRING+=" -f ${GPIO_FEEDBACK}"
+  if [[ ! -z ${SENSOR_READ_TIMEOUT} ]]; then
+    ARG_STRING+=" -r ${SENSOR_READ_TIMEOUT}"
   fi
-  if [[ ! -z ${DATA_LOGFILE} ]]; then
-    ARG_STRING+=" -l ${DATA_LOGFILE}"
+  if [[ ! -z ${SENSOR_ADAPTIVE_MARGIN} ]]; then
+    ARG_STRING+=" --adaptive ${SENSOR_ADAPTIVE_MARGIN}"
+  fi
+  if [[ ! -z ${LOGGING_SENSOR_CYCLES} ]]; then
+    ARG_STRING+=" --logevery ${LOGGING_SENSOR_CYCLES}"
+  fi
+  if [[ ! -z ${DATA_LOG_FORMAT} ]]; then
+    ARG_STRING+=" -o ${DATA_LOG_FORMAT}"
   fi
   if [[ ${LEGACYLOG,,} = "1" ]] || [[ ${LEGACYLOG,,} = "enabled" ]] || [[ ${LEGACYLOG,,} = "yes" ]]; then
     ARG_STRING+=" -y"
@@ -149,8 +197,32 @@ elif [[ "${1,,}" = "control" ]]; then
   if [[ ! -z ${CONTROLLER_LOGFILE} ]]; then
     ARG_STRING+=" -m ${CONTROLLER_LOGFILE}"
   fi
+  if [[ ! -z ${DATA_LOG_FLUSH_ROWS} ]]; then
+    ARG_STRING+=" -u ${DATA_LOG_FLUSH_ROWS}"
+  fi
+  if [[ ! -z ${DATA_LOG_FLUSH_INTERVAL} ]]; then
+    ARG_STRING+=" -e ${DATA_LOG_FLUSH_INTERVAL}"
+  fi
+  if [[ ${DATA_LOG_FSYNC,,} = "1" ]] || [[ ${DATA_LOG_FSYNC,,} = "enabled" ]] || [[ ${DATA_LOG_FSYNC,,} = "yes" ]]; then
+    ARG_STRING+=" --fsync"
+  fi
+  if [[ ! -z ${METRICS_FILE} ]]; then
+    ARG_STRING+=" -x ${METRICS_FILE}"
+  fi
+  if [[ ! -z ${METRICS_PORT} ]]; then
+    ARG_STRING+=" -q ${METRICS_PORT}"
+  fi
+  if [[ ! -z ${CONTROL_SOCKET} ]]; then
+    ARG_STRING+=" --socket ${CONTROL_SOCKET}"
+  fi
+  if [[ ! -z ${STATUS_FILE} ]]; then
+    ARG_STRING+=" -j ${STATUS_FILE}"
+  fi
   if [[ ${2,,} = "continuous" ]] && [[ ! -z ${INTERVAL} ]]; then
     ARG_STRING+=" -i ${INTERVAL}"
+    if [[ ! -z ${CYCLE_OVERRUN} ]]; then
+      ARG_STRING+=" -a ${CYCLE_OVERRUN}"
+    fi
     # In continuous mode, need to catch CTRL-C and switch off GPIO
     echo "Starting temperature controller in continuous mode - CTRL-C to exit"
     trap "switch_off_and_exit" SIGHUP SIGINT # SIGTERM
@@ -188,21 +260,58 @@ elif [[ "${1,,}" = "analyse" ]]; then
     START_ARG=$(date -u +%s -d "now")
   fi
   ARG_STRING="${CONTROLLER_LOGFILE} ${START_ARG} ${END_ARG} ${ANALYSIS_OUTDIR}"
+  if [[ -n "${ANALYSIS_CHECKPOINT}" ]]; then
+    ARG_STRING="--checkpoint ${ANALYSIS_CHECKPOINT} ${ARG_STRING}"
+  fi
+  if [[ "${ANALYSIS_ROTATED_LOGS,,}" = "1" ]] || [[ "${ANALYSIS_ROTATED_LOGS,,}" = "enabled" ]] || [[ "${ANALYSIS_ROTATED_LOGS,,}" = "yes" ]]; then
+    ARG_STRING="--rotated ${ARG_STRING}"
+  fi
+  # Plots are on unless disabled
+  PLOTS_DISABLED=
+  if [[ "${ANALYSIS_PLOTS,,}" = "0" ]] || [[ "${ANALYSIS_PLOTS,,}" = "disabled" ]] || [[ "${ANALYSIS_PLOTS,,}" = "no" ]]; then
+    PLOTS_DISABLED=1
+    ARG_STRING="--no-plots ${ARG_STRING}"
+  fi
+  if [[ -n "${ANALYSIS_PLOT_DPI}" ]]; then
+    ARG_STRING="--dpi ${ANALYSIS_PLOT_DPI} ${ARG_STRING}"
+  fi
+  PLOT_FORMAT=${ANALYSIS_PLOT_FORMAT:-png}
+  ARG_STRING="--format ${PLOT_FORMAT} ${ARG_STRING}"
   # Call controller analysis script with configured options
   "${SCRIPTDIR}/controller_analyse.py" ${ARG_STRING}
   if [[ ${?} -eq 0 ]]; then
     # Copy latest data to consistent static filenames (no timestamps) so can easily link if published on web (e.g. via S3)
     LATEST_CSV=$(find "${ANALYSIS_OUTDIR}" -name "????????_??????_controller_analysis.csv" | sort -n | tail -n1)
     cp "${LATEST_CSV}" "${ANALYSIS_OUTDIR}"/controller_analysis.csv
-    LATEST_BAR=$(find "${ANALYSIS_OUTDIR}" -name "????????_??????_controller_log_plot_bar.png" | sort -n | tail -n1)
-    cp "${LATEST_BAR}" "${ANALYSIS_OUTDIR}"/controller_log_plot_bar.png
-    LATEST_CHART=$(find "${ANALYSIS_OUTDIR}" -name "????????_??????_controller_log_plot.png" | sort -n | tail -n1)
-    cp "${LATEST_CHART}" "${ANALYSIS_OUTDIR}"/controller_log_plot.png
+    if [[ -z ${PLOTS_DISABLED} ]]; then
+      LATEST_BAR=$(find "${ANALYSIS_OUTDIR}" -name "????????_??????_controller_log_plot_bar.${PLOT_FORMAT}" | sort -n | tail -n1)
+      cp "${LATEST_BAR}" "${ANALYSIS_OUTDIR}"/controller_log_plot_bar.${PLOT_FORMAT}
+      LATEST_CHART=$(find "${ANALYSIS_OUTDIR}" -name "????????_??????_controller_log_plot.${PLOT_FORMAT}" | sort -n | tail -n1)
+      cp "${LATEST_CHART}" "${ANALYSIS_OUTDIR}"/controller_log_plot.${PLOT_FORMAT}
+    fi
     # Push data to AWS -if configured
   else
     # Analysis did not complete successfully, no outputs to copy
     echo "WARNING: controller analysis did not complete successfully, ignoring outputs"
   fi
+  if [[ "${ENABLE_DATA_ANALYSIS,,}" = "1" ]] || [[ "${ENABLE_DATA_ANALYSIS,,}" = "enabled" ]] || [[ "${ENABLE_DATA_ANALYSIS,,}" = "yes" ]]; then
+    # Analyse temperature data log with same date range
+    DATA_ARGS=
+    if [[ ! -z ${HYTERESIS} ]]; then
+      DATA_ARGS+=" -t ${HYTERESIS}"
+    fi
+    "${SCRIPTDIR}/data_analyse.py" ${DATA_ARGS} "${DATA_LOGFILE}" ${START_ARG} ${END_ARG} ${ANALYSIS_OUTDIR}
+    if [[ ${?} -eq 0 ]]; then
+      LATEST_DATA_CSV=$(find "${ANALYSIS_OUTDIR}" -name "????????_??????_data_analysis.csv" | sort -n | tail -n1)
+      cp "${LATEST_DATA_CSV}" "${ANALYSIS_OUTDIR}"/data_analysis.csv
+    else
+      echo "WARNING: data log analysis did not complete successfully, ignoring outputs"
+    fi
+  fi
+  if [[ -n "${ROLLUP_DIR}" ]]; then
+    # Add new data log rows to rollup for plotting
+    "${SCRIPTDIR}/data_rollup.py" update "${DATA_LOGFILE}" "${ROLLUP_DIR}"
+  fi
   sync_to_s3
 elif [[ "${1,,}" = "sync" ]]; then
   sync_to_s3
@@ -0,0 +1,62 @@
+# Regression tests of controller log analysis (scripts/controller_analyse.py) - run with: python3 -m pytest tests
+# Baseline CSVs in tests/data were written by the original controller_analyse.py from examples/control_temp.log
+
+import os
+import sys
+import glob
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_LOG = os.path.join(REPO_DIR, "examples", "control_temp.log")
+DATA_DIR = os.path.join(REPO_DIR, "tests", "data")
+
+# Analysis ranges [start, end, baseline CSV] - whole log, range starting before log and range ending after log
+RANGES = [["", "", "controller_analysis_all.csv"],
+          ["2020-06-26", "2020-07-05", "controller_analysis_20200626_20200705.csv"],
+          ["2020-07-01", "2020-07-12", "controller_analysis_20200701_20200712.csv"]]
+
+class ControllerAnalyseTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    # Log copied so index / checkpoint files are not written to examples
+    self.log_file = os.path.join(self.directory.name, "control_temp.log")
+    shutil.copyfile(EXAMPLE_LOG, self.log_file)
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  # Run controller_analyse.py and return CSV of results written
+  def analyse(self, start, end, options=[]):
+    output_dir = tempfile.mkdtemp(dir=self.directory.name)
+    subprocess.run([sys.executable, os.path.join(REPO_DIR, "scripts", "controller_analyse.py"), "--no-plots"] + options + [self.log_file, start, end, output_dir],
+                   cwd=output_dir, check=True, stdout=subprocess.DEVNULL)
+    csv_files = glob.glob(os.path.join(output_dir, "*_controller_analysis.csv"))
+    self.assertEqual(len(csv_files), 1)
+    with open(csv_files[0], 'rb') as f:
+      return f.read()
+
+  def assert_baseline(self, options=[]):
+    for start, end, baseline in RANGES:
+      with self.subTest(start=start, end=end):
+        with open(os.path.join(DATA_DIR, baseline), 'rb') as f:
+          self.assertEqual(self.analyse(start, end, options), f.read())
+
+  def test_full_parse(self):
+    self.assert_baseline(["--no-index"])
+
+  # Index is built on first run and used on second
+  def test_index(self):
+    self.assert_baseline()
+    self.assert_baseline()
+
+  # Checkpoint is created on first run and resumed on second
+  def test_checkpoint(self):
+    checkpoint = os.path.join(self.directory.name, "analysis.checkpoint")
+    self.assert_baseline(["--checkpoint", checkpoint])
+    self.assert_baseline(["--checkpoint", checkpoint])
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,77 @@
+# Tests of data log writer (scripts/data_log.py) - run with: python3 -m pytest tests
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import data_log
+
+class BinaryDataLogTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.filename = os.path.join(self.directory.name, "temperature_data.bin")
+    self.header = data_log.binary_header(["Current", "Outside"])
+    self.warnings = []
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def write_records(self, records):
+    writer = data_log.DataLogWriter(self.filename, self.header, binary=True, warn=self.warnings.append)
+    for record in records:
+      writer.write(data_log.binary_record(*record))
+    writer.close()
+
+  def test_records_read_back(self):
+    records = [(1593377909, 27.0, [26.5, 12.25], 1), (1593377919, 27.0, [26.625, 12.0], 0)]
+    self.write_records(records)
+    labels, read = data_log.read_binary_log(self.filename)
+    self.assertEqual(labels, ["Current", "Outside"])
+    self.assertEqual(list(read), [(timestamp, setpoint, temps, demand) for timestamp, setpoint, temps, demand in records])
+    self.assertEqual(self.warnings, [])
+
+  # Partial record left by power loss during write must not misalign records appended after it
+  def test_partial_record_removed_on_open(self):
+    records = [(1593377909, 27.0, [26.5, 12.25], 1), (1593377919, 27.0, [26.625, 12.0], 0)]
+    self.write_records(records[0:1])
+    with open(self.filename, 'ab') as f:
+      f.write(data_log.binary_record(*records[1])[0:3])
+    self.write_records(records[1:])
+    self.assertEqual(len(self.warnings), 1)
+    self.assertTrue(self.warnings[0].startswith("WARNING: Removed partial record (3 bytes)"))
+    self.assertEqual(os.path.getsize(self.filename), len(self.header) + 2 * data_log.binary_record_size(2))
+    self.assertEqual(list(data_log.read_binary_log(self.filename)[1]), records)
+
+class BufferedDataLogTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    # Log directory does not exist yet, so rows cannot be written
+    self.log_dir = os.path.join(self.directory.name, "log")
+    self.filename = os.path.join(self.log_dir, "temperature_data.csv")
+    self.warnings = []
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  # Oldest rows are discarded once buffer is full while log cannot be written, and number discarded is reported when log is written again
+  def test_discarded_rows_reported(self):
+    writer = data_log.DataLogWriter(self.filename, "Timestamp,Setpoint (C),Current Temperature (C),Demand Status (0/1)\n", warn=self.warnings.append)
+    with mock.patch.object(data_log, "MAX_BUFFER_ROWS", 3):
+      for row in range(5):
+        with self.assertRaises(OSError):
+          writer.write("2020-06-28 21:58:%02d,27.0,26.5,%d\n" % (row, row % 2))
+      self.assertEqual(len(self.warnings), 1)
+      self.assertTrue(self.warnings[0].startswith("WARNING: Data log buffer full (3 rows)"))
+      os.mkdir(self.log_dir)
+      writer.write("2020-06-28 21:58:05,27.0,26.5,1\n")
+    writer.close()
+    self.assertEqual(len(self.warnings), 2)
+    self.assertTrue(self.warnings[1].startswith("WARNING: Discarded 3 data log row(s)"))
+    with open(self.filename, 'r') as f:
+      self.assertEqual([line[17:19] for line in f.readlines()[1:]], ["03", "04", "05"])
+
+if __name__ == '__main__':
+  unittest.main()
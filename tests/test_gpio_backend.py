@@ -0,0 +1,72 @@
+# Tests of GPIO backends (scripts/gpio_backend.py) - run with: python3 -m pytest tests
+
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import gpio_backend
+
+# Line of libgpiod v1 Python bindings - event_wait() only accepts integer sec/nsec keywords, as the C extension does
+class Line:
+  def __init__(self, offset):
+    self.offset = offset
+    self.value = 0
+    self.waits = []
+
+  def request(self, consumer, type, default_vals=None):
+    self.type = type
+
+  def release(self):
+    pass
+
+  def get_value(self):
+    return self.value
+
+  def set_value(self, value):
+    self.value = value
+
+  def event_wait(self, *args, sec=0, nsec=0):
+    if args or not isinstance(sec, int) or not isinstance(nsec, int) or not 0 <= nsec < 1000000000:
+      raise TypeError("event_wait() takes integer sec and nsec keywords")
+    self.waits.append(sec + nsec / 1e9)
+    # Relay feedback contact closes on first edge
+    self.value = 1
+    return True
+
+  def event_read(self):
+    return None
+
+class Chip:
+  def __init__(self, name):
+    self.line_objects = {}
+
+  def get_line(self, offset):
+    return self.line_objects.setdefault(offset, Line(offset))
+
+  def close(self):
+    pass
+
+gpiod = types.SimpleNamespace(Chip=Chip, LINE_REQ_DIR_OUT=1, LINE_REQ_DIR_IN=2, LINE_REQ_EV_BOTH_EDGES=3)
+
+class GpiodGPIOTest(unittest.TestCase):
+  def setUp(self):
+    with mock.patch.dict(sys.modules, {"gpiod": gpiod}):
+      self.gpio = gpio_backend.open_backend("gpiod")
+
+  # Feedback input with edge events is confirmed by waiting for an edge with libgpiod v1 event_wait() signature
+  def test_wait_for_edge(self):
+    self.assertEqual(self.gpio.set_direction(5, "in"), 0)
+    self.assertEqual(self.gpio.enable_events(5), 0)
+    result = self.gpio.wait_for(5, 1, 1.5)
+    self.assertNotEqual(result, None)
+    self.assertEqual(result[1], 1)
+    waits = self.gpio.chip.get_line(5).waits
+    self.assertTrue(waits)
+    self.assertLessEqual(waits[0], 1.5)
+    self.assertGreater(waits[0], 1)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,72 @@
+# Tests of rollup store (scripts/rollup_store.py) - run with: python3 -m pytest tests
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from time import gmtime, strftime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import numpy as np
+import rollup_store
+
+START = 1577836800
+INTERVAL = 10
+
+class RollupStoreTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.data_file = os.path.join(self.directory.name, "temperature_data.csv")
+    with open(self.data_file, 'w') as f:
+      f.write("Timestamp,Setpoint (C),Current Temperature (C),Demand Status (0/1)\n")
+    self.rows = 0
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  # Append rows to data log, one every INTERVAL seconds
+  def append_rows(self, rows):
+    with open(self.data_file, 'a') as f:
+      for ii in range(self.rows, self.rows + rows):
+        f.write("%s,20.0,%.3f,%d\n" % (strftime("%Y-%m-%d %H:%M:%S", gmtime(START + ii * INTERVAL)), 19.5 + (ii % 17) * 0.0625, ii % 2))
+    self.rows += rows
+
+  def store(self, name):
+    return os.path.join(self.directory.name, name)
+
+  def level_files(self, store_dir):
+    files = {}
+    for bucket_size in rollup_store.LEVELS:
+      with open(rollup_store.level_file(store_dir, bucket_size), 'rb') as f:
+        files[bucket_size] = f.read()
+    return files
+
+  # Update interrupted after level files were written but before position in data log was saved must not add samples twice
+  def test_interrupted_update(self):
+    self.append_rows(1000)
+    rollup_store.update(self.store("reference"), self.data_file, chunk_rows=300)
+    rollup_store.update(self.store("interrupted"), self.data_file, chunk_rows=300)
+    self.append_rows(1000)
+    rollup_store.update(self.store("reference"), self.data_file, chunk_rows=300)
+    with mock.patch.object(rollup_store, "save_meta", side_effect=OSError("power loss")):
+      with self.assertRaises(OSError):
+        rollup_store.update(self.store("interrupted"), self.data_file, chunk_rows=300)
+    self.assertEqual(rollup_store.update(self.store("interrupted"), self.data_file, chunk_rows=300), 1000)
+    self.assertEqual(self.level_files(self.store("interrupted")), self.level_files(self.store("reference")))
+    for bucket_size in rollup_store.LEVELS:
+      records = rollup_store.read_level(self.store("interrupted"), bucket_size, 3)
+      self.assertEqual(int(np.sum(records['count'][:, 1])), 2000)
+
+  # First update interrupted before metadata was saved - level files are emptied and rebuilt
+  def test_interrupted_first_update(self):
+    self.append_rows(1000)
+    rollup_store.update(self.store("reference"), self.data_file, chunk_rows=300)
+    with mock.patch.object(rollup_store, "save_meta", side_effect=OSError("power loss")):
+      with self.assertRaises(OSError):
+        rollup_store.update(self.store("interrupted"), self.data_file, chunk_rows=300)
+    rollup_store.update(self.store("interrupted"), self.data_file, chunk_rows=300)
+    self.assertEqual(self.level_files(self.store("interrupted")), self.level_files(self.store("reference")))
+
+if __name__ == '__main__':
+  unittest.main()